@@ -0,0 +1,40 @@
+// Built by `flask --app app assets-build` (see README, "Assets").
+// The theme lives in theme.json so the Play CDN fallback in base.html uses it too.
+const theme = require("./theme.json");
+const { colors } = theme;
+
+module.exports = {
+  content: ["./templates/**/*.html", "./talkonpaper/**/*.py"],
+  // Flash categories end up in `alert-{{ category }}`.
+  safelist: ["alert-success", "alert-error", "alert-warning", "alert-info"],
+  theme: { extend: theme },
+  plugins: [require("daisyui")],
+  daisyui: {
+    themes: [
+      {
+        talkonpaper: {
+          primary: colors.primary.DEFAULT,
+          "primary-content": colors.primary.content,
+          secondary: colors.secondary.DEFAULT,
+          "secondary-content": colors.secondary.content,
+          accent: colors.accent.DEFAULT,
+          "accent-content": colors.accent.content,
+          neutral: colors.neutral.DEFAULT,
+          "neutral-content": colors.neutral.content,
+          "base-100": colors.base["100"],
+          "base-200": colors.base["200"],
+          "base-300": colors.base["300"],
+          "base-content": colors.base.content,
+          info: colors.info,
+          success: colors.success.DEFAULT,
+          "success-content": colors.success.content,
+          warning: colors.warning,
+          error: colors.error,
+          "--rounded-box": theme.borderRadius.box,
+          "--rounded-btn": theme.borderRadius.btn,
+        },
+      },
+    ],
+    logs: false,
+  },
+};
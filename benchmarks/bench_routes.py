@@ -0,0 +1,319 @@
+"""
+Route-level benchmarks with latency, query-count and memory regression gates.
+
+    python -m benchmarks.bench_routes --talks 10000 --write-baseline benchmarks/baseline-10k.json
+    python -m benchmarks.bench_routes --talks 10000 --compare benchmarks/baseline-10k.json
+
+Every blueprint route is driven through the Flask test client against a
+synthetic SQLite catalog built with `seed.generate_synthetic_catalog`.
+Query counts come from the app's own SQL instrumentation (Server-Timing).
+A comparison run exits non-zero when a route got slower than the allowed
+ratio, issues more queries than the baseline, or allocates much more memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from talkonpaper import create_app
+from talkonpaper.extensions import db
+from talkonpaper.models import Paper, Speaker, Talk, User
+from talkonpaper.seed import generate_synthetic_catalog
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+BENCH_EMAIL = "bench@example.org"
+BENCH_PASSWORD = "bench-password"
+
+
+@dataclass
+class RouteCase:
+    name: str
+    path: str
+    client: str = "anon"  # anon | user | admin
+    method: str = "GET"
+    data: Optional[Dict[str, str]] = None
+    expect: int = 200
+
+
+@dataclass
+class RouteResult:
+    p50_ms: float
+    p95_ms: float
+    queries: int
+    peak_kb: float
+    status: int
+    n_plus_one: bool = False
+
+
+class _NPlusOneRecorder(logging.Handler):
+    """Collects the instrumentation's N+1 warnings instead of printing them."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.flagged = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if "n_plus_one" in record.getMessage():
+            self.flagged = True
+
+
+_recorder = _NPlusOneRecorder()
+
+
+def build_app(talks: int, transcript_words: int, workdir: Path):
+    sql_logger = logging.getLogger("talkonpaper.sql")
+    sql_logger.addHandler(_recorder)
+    sql_logger.propagate = False
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{workdir / 'bench.db'}",
+            "TESTING": True,
+            "SECRET_KEY": "bench",
+            "SQL_INSTRUMENTATION": True,
+            # Measure the real work, not cache hits.
+            "PAGE_CACHE_ENABLED": False,
+            "RATELIMIT_ENABLED": False,
+            # Nothing reaches the network or the instance folder.
+            "STORAGE_BACKEND": "local",
+            "LOCAL_MEDIA_ROOT": str(workdir / "media"),
+            "SITEMAP_DIR": str(workdir / "sitemaps"),
+            "IMAGE_CACHE_DIR": str(workdir / "image_cache"),
+            "STATIC_EXPORT_DIR": str(workdir / "static_export"),
+            "STATIC_EXPORT_SERVE": False,
+            "BLOG_CACHE_FILE": str(workdir / "blog_cache.json"),
+            "CONTACT_EXPORT_PATH": str(workdir / "contact_submissions.jsonl"),
+            "CONTACT_WORKER_ENABLED": False,
+        }
+    )
+    with app.app_context():
+        generate_synthetic_catalog(talks=talks, transcript_words=transcript_words)
+        user = User(email=BENCH_EMAIL, role="viewer", subscription_level="registered")
+        user.set_password(BENCH_PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def route_cases(app) -> List[RouteCase]:
+    with app.app_context():
+        talk = Talk.query.order_by(Talk.id.desc()).first()
+        paper = db.session.get(Paper, talk.paper_id)
+        # The busiest speaker is where an N+1 would hurt the most.
+        speaker_id = (
+            db.session.query(Talk.speaker_id)
+            .group_by(Talk.speaker_id)
+            .order_by(db.func.count().desc())
+            .limit(1)
+            .scalar()
+        )
+        speaker = db.session.get(Speaker, speaker_id)
+        word = talk.title.split()[0]
+
+    with app.test_request_context():
+        from talkonpaper.blog import load_posts
+
+        posts = load_posts()
+    post_slug = posts[0]["slug"] if posts else "missing"
+
+    return [
+        RouteCase("home", "/"),
+        RouteCase("talks_archive", "/talks"),
+        RouteCase("talks_search", f"/talks?q={word}"),
+        RouteCase("talk_detail", f"/talks/{talk.slug}"),
+        RouteCase("papers_archive", "/papers"),
+        RouteCase("paper_detail", f"/papers/{paper.id}"),
+        RouteCase("speakers_directory", "/speakers"),
+        RouteCase("speaker_profile", f"/speakers/{speaker.id}"),
+        RouteCase("blog_index", "/blog/"),
+        RouteCase("blog_post", f"/blog/{post_slug}"),
+        RouteCase("about", "/about"),
+        RouteCase("auth_login_form", "/login"),
+        RouteCase(
+            "auth_login_submit",
+            "/login",
+            method="POST",
+            data={"email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+            expect=302,
+        ),
+        RouteCase("auth_register_form", "/register"),
+        RouteCase("auth_account", "/account", client="user"),
+        RouteCase("talk_detail_member", f"/talks/{talk.slug}", client="user"),
+        RouteCase("admin_dashboard", "/admin/", client="admin"),
+    ]
+
+
+def _clients(app) -> Dict[str, Callable]:
+    anon = app.test_client
+
+    def user():
+        client = app.test_client()
+        client.post("/login", data={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        return client
+
+    def admin():
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["admin_authed"] = True
+        return client
+
+    return {"anon": anon, "user": user, "admin": admin}
+
+
+def _issue(client, case: RouteCase):
+    if case.method == "POST":
+        return client.post(case.path, data=case.data)
+    return client.get(case.path)
+
+
+def measure(app, case: RouteCase, client, iterations: int, warmup: int) -> RouteResult:
+    # Each POST login must start logged out, otherwise it short-circuits.
+    fresh = case.method == "POST"
+    make_client = app.test_client if fresh else (lambda: client)
+
+    for _ in range(warmup):
+        _issue(make_client(), case)
+    _recorder.flagged = False
+
+    timings: List[float] = []
+    queries = 0
+    status = 0
+    for _ in range(iterations):
+        current = make_client()
+        started = time.perf_counter()
+        response = _issue(current, case)
+        timings.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+        match = _QUERIES_RE.search(response.headers.get("Server-Timing", ""))
+        queries = max(queries, int(match.group(1)) if match else 0)
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    _issue(make_client(), case)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    p95_index = max(0, int(round(0.95 * len(timings))) - 1)
+    return RouteResult(
+        p50_ms=round(statistics.median(timings), 3),
+        p95_ms=round(timings[p95_index], 3),
+        queries=queries,
+        peak_kb=round(peak / 1024, 1),
+        status=status,
+        n_plus_one=_recorder.flagged,
+    )
+
+
+def run(talks: int, iterations: int, warmup: int, transcript_words: int, only: List[str]) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(talks, transcript_words, Path(tmp))
+        clients = _clients(app)
+        cached_clients = {kind: factory() for kind, factory in clients.items()}
+        results: Dict[str, Dict] = {}
+        for case in route_cases(app):
+            if only and case.name not in only:
+                continue
+            result = measure(app, case, cached_clients[case.client], iterations, warmup)
+            if result.status != case.expect:
+                raise SystemExit(f"{case.name}: expected HTTP {case.expect}, got {result.status}")
+            results[case.name] = asdict(result)
+            print(
+                f"{case.name:<22} p50 {result.p50_ms:>8.2f} ms  p95 {result.p95_ms:>8.2f} ms  "
+                f"queries {result.queries:>3}  peak {result.peak_kb:>9.1f} KiB"
+                + ("  [N+1]" if result.n_plus_one else "")
+            )
+        with app.app_context():
+            db.engine.dispose()
+
+    return {
+        "meta": {
+            "talks": talks,
+            "iterations": iterations,
+            "transcript_words": transcript_words,
+            "python": platform.python_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "routes": results,
+    }
+
+
+def compare(
+    current: Dict,
+    baseline: Dict,
+    latency_ratio: float,
+    memory_ratio: float,
+    noise_ms: float,
+) -> List[str]:
+    """Return human-readable regressions; an empty list means the gate passed."""
+    failures: List[str] = []
+    if current["meta"]["talks"] != baseline["meta"]["talks"]:
+        failures.append(
+            f"catalog size differs: {current['meta']['talks']} vs baseline {baseline['meta']['talks']}"
+        )
+    for name, base in baseline["routes"].items():
+        now = current["routes"].get(name)
+        if now is None:
+            continue
+        if now["queries"] > base["queries"]:
+            failures.append(f"{name}: {now['queries']} queries (baseline {base['queries']}) - possible N+1")
+        if now.get("n_plus_one") and not base.get("n_plus_one"):
+            failures.append(f"{name}: repeated statement shapes flagged as N+1")
+        if now["p50_ms"] > base["p50_ms"] * latency_ratio and now["p50_ms"] - base["p50_ms"] > noise_ms:
+            failures.append(f"{name}: p50 {now['p50_ms']:.2f} ms (baseline {base['p50_ms']:.2f} ms)")
+        if now["peak_kb"] > base["peak_kb"] * memory_ratio and now["peak_kb"] - base["peak_kb"] > 256:
+            failures.append(f"{name}: peak {now['peak_kb']:.0f} KiB (baseline {base['peak_kb']:.0f} KiB)")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--talks", type=int, default=1000, help="Synthetic catalog size (e.g. 1000, 10000, 100000).")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--transcript-words", type=int, default=600)
+    parser.add_argument("--only", nargs="*", default=[], help="Limit to these route names.")
+    parser.add_argument("--write-baseline", type=Path, help="Write results as the new baseline.")
+    parser.add_argument("--output", type=Path, help="Write results JSON without comparing.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to gate against.")
+    parser.add_argument("--latency-ratio", type=float, default=1.5, help="Allowed p50 slowdown factor.")
+    parser.add_argument("--memory-ratio", type=float, default=2.0, help="Allowed peak-memory growth factor.")
+    parser.add_argument("--noise-ms", type=float, default=1.0, help="Ignore p50 changes smaller than this.")
+    args = parser.parse_args(argv)
+
+    results = run(args.talks, args.iterations, args.warmup, args.transcript_words, args.only)
+
+    for target in (args.write_baseline, args.output):
+        if target:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            print(f"Wrote {target}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.latency_ratio, args.memory_ratio, args.noise_ms)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print(f"  - {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
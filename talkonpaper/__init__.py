@@ -1,14 +1,33 @@
-import os
 from pathlib import Path
 
 from flask import Flask
 
 from .config import Config
 from .extensions import db, login_manager, register_sqlite_pragmas
+from .identity import load_user  # noqa: F401  (registers the Flask-Login user_loader)
+from .assets import assets_build_command, assets_bp, init_assets
+from .compression import init_compression
+from .contact import contact_drain_command, init_contact_queue
+from .images import images_bp, init_images
+from .importer import import_catalog_command
+from .media import media_bp
+from .instrumentation import init_instrumentation
+from .ratelimit import init_rate_limits
 from .routes import main_bp
 from .admin import admin_bp
 from .auth import auth_bp
 from .blog import blog_bp
+from .feeds import feeds_bp
+from .search import ensure_search_index, reindex_command
+from .seed import seed_cli
+from .sitemap import sitemap_bp, sitemap_build_command
+from .slugs import talk_slugs_command
+from .stats import ensure_stats, stats_reconcile_command
+from .static_export import export_static_command, init_static_export
+from .transcripts import transcript_segments_command, transcripts_bp
+from .upgrade import upgrade_schema
+from .uploads import uploads_bp, uploads_expire_command
+from .verification import verify_papers_command
 
 
 def create_app(test_config: dict | None = None) -> Flask:
@@ -31,11 +50,17 @@ def create_app(test_config: dict | None = None) -> Flask:
 
     _configure_extensions(app)
     _register_blueprints(app)
+    init_static_export(app)
     _register_template_globals(app)
+    _register_cli(app)
+    init_compression(app)
 
     with app.app_context():
         # Create tables if they do not exist; production should use Alembic migrations.
         db.create_all()
+    upgrade_schema(app)
+    ensure_stats(app)
+    ensure_search_index(app)
 
     return app
 
@@ -45,6 +70,11 @@ def _configure_extensions(app: Flask) -> None:
     register_sqlite_pragmas(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
+    init_instrumentation(app)
+    init_rate_limits(app)
+    init_contact_queue(app)
+    init_images(app)
+    init_assets(app)
 
 
 def _register_blueprints(app: Flask) -> None:
@@ -52,6 +82,28 @@ def _register_blueprints(app: Flask) -> None:
     app.register_blueprint(admin_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(blog_bp)
+    app.register_blueprint(feeds_bp)
+    app.register_blueprint(sitemap_bp)
+    app.register_blueprint(transcripts_bp)
+    app.register_blueprint(media_bp)
+    app.register_blueprint(uploads_bp)
+    app.register_blueprint(images_bp)
+    app.register_blueprint(assets_bp)
+
+
+def _register_cli(app: Flask) -> None:
+    app.cli.add_command(reindex_command)
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(export_static_command)
+    app.cli.add_command(sitemap_build_command)
+    app.cli.add_command(stats_reconcile_command)
+    app.cli.add_command(import_catalog_command)
+    app.cli.add_command(verify_papers_command)
+    app.cli.add_command(talk_slugs_command)
+    app.cli.add_command(contact_drain_command)
+    app.cli.add_command(transcript_segments_command)
+    app.cli.add_command(uploads_expire_command)
+    app.cli.add_command(assets_build_command)
 
 
 def _register_template_globals(app: Flask) -> None:
@@ -60,5 +112,5 @@ def _register_template_globals(app: Flask) -> None:
         return {
             "site_name": "TalkOnPaper",
             "site_tagline": "Cross-border academic visibility without visas, language, or geography barriers",
-            "cdn_base_url": os.environ.get("CDN_BASE_URL", ""),
+            "cdn_base_url": app.config.get("CDN_BASE_URL", ""),
         }
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import os
 from datetime import date
 from functools import wraps
@@ -8,7 +9,10 @@ from typing import Optional
 from flask import Blueprint, redirect, render_template, request, session, url_for, flash
 
 from .extensions import db
+from .importer import REQUIRED_FIELDS, detect_format, import_catalog
 from .models import Paper, Speaker, Talk
+from .stats import site_stats
+from .storage import media_meta_many
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -45,18 +49,16 @@ def logout():
 @admin_bp.route("/")
 @admin_required
 def dashboard():
-    stats = {
-        "talks": Talk.query.count(),
-        "papers": Paper.query.count(),
-        "speakers": Speaker.query.count(),
-    }
+    stats = site_stats()
     latest_talks = Talk.query.order_by(Talk.created_at.desc()).limit(5).all()
     latest_papers = Paper.query.order_by(Paper.created_at.desc()).limit(5).all()
+    media = media_meta_many(t.video_object_key for t in latest_talks)
     return render_template(
         "admin/dashboard.html",
         stats=stats,
         latest_talks=latest_talks,
         latest_papers=latest_papers,
+        media=media,
     )
 
 
@@ -64,17 +66,7 @@ def dashboard():
 @admin_required
 def create_talk():
     form = request.form
-    required = [
-        "speaker_name",
-        "speaker_affiliation",
-        "paper_title",
-        "paper_authors",
-        "paper_doi",
-        "paper_year",
-        "talk_title",
-        "video_object_key",
-    ]
-    missing = [r for r in required if not form.get(r)]
+    missing = [r for r in REQUIRED_FIELDS if not form.get(r)]
     if missing:
         flash(f"Eksik alanlar: {', '.join(missing)}", "error")
         return redirect(url_for("admin.dashboard"))
@@ -87,6 +79,7 @@ def create_talk():
             country=form.get("speaker_country") or None,
             bio_short=form.get("speaker_bio") or None,
             website_or_profile=form.get("speaker_site") or None,
+            photo_object_key=form.get("speaker_photo_object_key") or None,
         )
         db.session.add(speaker)
 
@@ -137,3 +130,31 @@ def create_talk():
     db.session.commit()
     flash("Yeni konuşma eklendi.", "success")
     return redirect(url_for("admin.dashboard"))
+
+
+@admin_bp.route("/talks/import", methods=["POST"])
+@admin_required
+def import_talks():
+    upload = request.files.get("catalog")
+    if not upload or not upload.filename:
+        flash("Bir CSV veya JSONL dosyası seçin.", "error")
+        return redirect(url_for("admin.dashboard"))
+    try:
+        fmt = detect_format(upload.filename)
+    except ValueError:
+        flash("Dosya uzantısı .csv veya .jsonl olmalı.", "error")
+        return redirect(url_for("admin.dashboard"))
+
+    # Read straight from the upload stream; the file is never held in memory.
+    stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    report = import_catalog(stream, fmt)
+    flash(
+        f"{report.rows} satır işlendi: {report.talks_created} yeni, "
+        f"{report.talks_updated} güncellenen konuşma.",
+        "success" if report.imported else "warning",
+    )
+    for line, message in sorted(report.errors)[:10]:
+        flash(f"Satır {line}: {message}", "error")
+    if len(report.errors) > 10:
+        flash(f"... ve {len(report.errors) - 10} hata daha (tam liste için `flask import-catalog --errors`).", "error")
+    return redirect(url_for("admin.dashboard"))
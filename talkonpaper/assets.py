@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import click
+from flask import Blueprint, Flask, abort, current_app, request, send_file, url_for
+from flask.cli import with_appcontext
+from werkzeug.security import safe_join
+
+try:  # Optional: brotli variants are written only when the module is installed.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+assets_bp = Blueprint("assets", __name__)
+
+_MANIFEST = "manifest.json"
+_EXTENSION_KEY = "talkonpaper.assets"
+ONE_YEAR = 365 * 24 * 3600
+# Top-level files of static/ that get fingerprinted next to the compiled CSS.
+_STATIC_SUFFIXES = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".ico", ".woff2"}
+# Only text formats shrink; images are already compressed.
+_COMPRESSIBLE = {".css", ".js", ".svg"}
+
+
+def _project_root(app: Flask) -> Path:
+    return Path(app.root_path).parent
+
+
+def _assets_dir(app: Flask) -> Path:
+    return Path(app.config.get("ASSETS_DIR") or Path(app.static_folder) / "dist")
+
+
+def manifest_path(app: Flask) -> Path:
+    return _assets_dir(app) / _MANIFEST
+
+
+def tailwind_theme() -> Dict:
+    """The `theme.extend` block shared by the build and the Play CDN fallback."""
+    app = current_app._get_current_object()
+    theme = app.extensions.get(f"{_EXTENSION_KEY}.theme")
+    if theme is None:
+        path = _project_root(app) / "assets" / "theme.json"
+        theme = app.extensions[f"{_EXTENSION_KEY}.theme"] = json.loads(path.read_text(encoding="utf-8"))
+    return theme
+
+
+# --- build ------------------------------------------------------------------
+
+
+def _compile_css(app: Flask) -> bytes:
+    """Run the Tailwind CLI over assets/app.css; only classes found in templates are kept."""
+    root = _project_root(app)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "app.css"
+        command = shlex.split(app.config.get("ASSETS_TAILWIND_CMD") or "npx tailwindcss") + [
+            "--config", str(root / "assets" / "tailwind.config.js"),
+            "--input", str(root / "assets" / "app.css"),
+            "--output", str(out),
+            "--minify",
+        ]
+        try:
+            subprocess.run(command, cwd=root, check=True, capture_output=True, timeout=300)
+        except FileNotFoundError as exc:
+            raise click.ClickException(f"{command[0]} not found; install Node and run `npm ci` first") from exc
+        except subprocess.CalledProcessError as exc:
+            raise click.ClickException(f"Tailwind build failed:\n{exc.stderr.decode(errors='replace')}") from exc
+        return out.read_bytes()
+
+
+def _atomic_write(target: Path, data: bytes) -> None:
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def _write_asset(out_dir: Path, logical: str, body: bytes) -> str:
+    """Write `body` under a content-hashed name with .gz/.br variants; returns that name."""
+    stem, suffix = Path(logical).stem, Path(logical).suffix
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}{suffix}"
+    target = out_dir / name
+    if not target.exists():
+        _atomic_write(target, body)
+    if suffix in _COMPRESSIBLE:
+        if not target.with_name(name + ".gz").exists():
+            _atomic_write(target.with_name(name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None and not target.with_name(name + ".br").exists():
+            _atomic_write(target.with_name(name + ".br"), brotli.compress(body, quality=11))
+    return name
+
+
+def build_assets(skip_css: bool = False) -> Dict[str, str]:
+    """
+    Compile the purged Tailwind/daisyUI stylesheet, fingerprint it and the
+    top-level static files, and write a manifest of logical → hashed names.
+    Files of the previous build stay until the next one, so pages cached
+    with old URLs keep their styles through a deploy.
+    """
+    app = current_app._get_current_object()
+    out_dir = _assets_dir(app)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = manifest_path(app)
+    previous: Dict[str, Dict[str, str]] = {}
+    if manifest.exists():
+        previous = json.loads(manifest.read_text(encoding="utf-8"))
+
+    assets: Dict[str, str] = {}
+    if not skip_css:
+        assets["app.css"] = _write_asset(out_dir, "app.css", _compile_css(app))
+    elif "app.css" in previous.get("assets", {}):
+        assets["app.css"] = previous["assets"]["app.css"]
+    for path in sorted(Path(app.static_folder).iterdir()):
+        if path.is_file() and path.suffix.lower() in _STATIC_SUFFIXES:
+            assets[path.name] = _write_asset(out_dir, path.name, path.read_bytes())
+
+    keep = set(assets.values()) | set(previous.get("assets", {}).values())
+    for path in out_dir.iterdir():
+        name = path.name
+        for variant in (".gz", ".br"):
+            name = name.removesuffix(variant)
+        if path.name != _MANIFEST and name not in keep:
+            path.unlink(missing_ok=True)
+
+    _atomic_write(manifest, json.dumps({"assets": assets}, indent=1, sort_keys=True).encode("utf-8"))
+    return assets
+
+
+@click.command("assets-build")
+@click.option("--skip-css", is_flag=True, help="Only re-fingerprint static files (no Node needed).")
+@with_appcontext
+def assets_build_command(skip_css: bool) -> None:
+    """Compile, fingerprint and precompress CSS and static assets."""
+    assets = build_assets(skip_css=skip_css)
+    for logical, name in sorted(assets.items()):
+        click.echo(f"  {logical} -> {name}")
+    click.echo(f"Wrote {len(assets)} assets to {_assets_dir(current_app)}.")
+
+
+# --- lookup and serving -----------------------------------------------------
+
+
+class _AssetManifest:
+    """Manifest reader that reloads whenever the assets are rebuilt."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._assets: Dict[str, str] = {}
+
+    def lookup(self, logical: str) -> Optional[str]:
+        try:
+            mtime = (self.root / _MANIFEST).stat().st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    payload = json.loads((self.root / _MANIFEST).read_text(encoding="utf-8"))
+                    self._assets = payload.get("assets", {})
+                    self._mtime = mtime
+        return self._assets.get(logical)
+
+
+def asset_url(logical: str) -> Optional[str]:
+    """
+    URL of the fingerprinted build of `logical` (e.g. "app.css"), under
+    CDN_BASE_URL when set. Before `assets-build` has run it falls back to
+    the plain static file, or None when there is none.
+    """
+    name = current_app.extensions[_EXTENSION_KEY].lookup(logical)
+    if name is None:
+        if (Path(current_app.static_folder) / logical).is_file():
+            return url_for("static", filename=logical)
+        return None
+    cdn = current_app.config.get("CDN_BASE_URL") or ""
+    return f"{cdn.rstrip('/')}{url_for('assets.serve_asset', filename=name)}"
+
+
+def init_assets(app: Flask) -> None:
+    app.extensions[_EXTENSION_KEY] = _AssetManifest(_assets_dir(app))
+    app.add_template_global(asset_url)
+    app.add_template_global(tailwind_theme)
+
+
+@assets_bp.route("/assets/<path:filename>")
+def serve_asset(filename: str):
+    """A fingerprinted asset, as .br/.gz when accepted, cacheable forever."""
+    if filename == _MANIFEST or filename.endswith((".gz", ".br")):
+        abort(404)
+    joined = safe_join(str(_assets_dir(current_app)), filename)
+    if joined is None or not Path(joined).is_file():
+        abort(404)
+
+    path, encoding = Path(joined), None
+    for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+        variant = path.with_name(path.name + suffix)
+        if candidate in request.accept_encodings and variant.exists():
+            path, encoding = variant, candidate
+            break
+
+    response = send_file(path, download_name=Path(filename).name, etag=False, max_age=ONE_YEAR)
+    # The hash in the name is the ETag; encodings get their own.
+    response.set_etag(filename + (f"-{encoding}" if encoding else ""))
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
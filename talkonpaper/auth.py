@@ -94,17 +94,20 @@ def logout():
 def account():
     if request.method == "POST":
         action = request.form.get("action")
+        # current_user is a cached read-only identity; write through the row.
+        # Committing the change drops the cached identity (see identity.py).
+        user = db.session.get(User, current_user.id)
 
         if action == "upgrade_registered":
-            current_user.subscription_level = "registered"
+            user.subscription_level = "registered"
             db.session.commit()
             flash("Upgraded to Registered tier! You now have access to registered content.", "success")
         elif action == "upgrade_premium":
-            current_user.subscription_level = "academic_premium"
+            user.subscription_level = "academic_premium"
             db.session.commit()
             flash("Upgraded to Premium tier! You now have full access to all content.", "success")
         elif action == "downgrade":
-            current_user.subscription_level = "public"
+            user.subscription_level = "public"
             db.session.commit()
             flash("Downgraded to Public tier.", "success")
 
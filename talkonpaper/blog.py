@@ -1,19 +1,22 @@
 from __future__ import annotations
 
+import json
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import frontmatter
 import markdown
-from flask import Blueprint, current_app, render_template, request
+from flask import Blueprint, abort, current_app, render_template, request
 
 blog_bp = Blueprint("blog", __name__, url_prefix="/blog")
 
-# In-memory cache for blog posts
-_posts_cache: Dict[str, Dict] = {}
-_cache_timestamp: Optional[float] = None
+_EXTENSION_KEY = "talkonpaper.blog"
+_CACHE_VERSION = 1
+_RELATED_LIMIT = 3
 
 
 def get_blog_posts_dir() -> Path:
@@ -21,109 +24,226 @@ def get_blog_posts_dir() -> Path:
     return Path(current_app.root_path).parent / "blog_posts"
 
 
-def load_posts(force_reload: bool = False) -> List[Dict]:
-    """
-    Load all blog posts from markdown files.
-    Uses in-memory caching for performance.
-    """
-    global _posts_cache, _cache_timestamp
+def _parse_date(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        # YAML frontmatter turns `2025-01-10` into a date, not a string.
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            pass
+    return datetime.now()
 
-    blog_dir = get_blog_posts_dir()
 
-    # Check if cache is still valid (refresh every 5 minutes in production)
-    if not force_reload and _cache_timestamp:
-        cache_age = datetime.now().timestamp() - _cache_timestamp
-        if cache_age < 300:  # 5 minutes
-            return list(_posts_cache.values())
+def render_post(md_file: Path) -> Dict:
+    """Parse frontmatter and render markdown for one post file."""
+    with open(md_file, "r", encoding="utf-8") as f:
+        post = frontmatter.load(f)
+
+    html_content = markdown.markdown(
+        post.content,
+        extensions=["fenced_code", "tables", "nl2br", "sane_lists"],
+    )
+
+    return {
+        # Slug is the filename without the .md suffix.
+        "slug": md_file.stem,
+        "title": post.get("title", md_file.stem),
+        "date": _parse_date(post.get("date", "")),
+        "author": post.get("author", "TalkOnPaper Team"),
+        "summary": post.get("summary", ""),
+        "tags": list(post.get("tags", []) or []),
+        "content": html_content,
+        "raw_content": post.content,
+    }
 
-    if not blog_dir.exists():
-        return []
 
-    posts = []
-    for md_file in blog_dir.glob("*.md"):
+class BlogIndex:
+    """
+    Incrementally maintained index of blog posts.
+
+    Files are re-parsed only when their (mtime, size) signature changes;
+    rendered posts persist in a JSON cache under the instance folder so a
+    restart does not re-render everything. Lookups by slug and tag are
+    dictionary hits and related posts are precomputed on each rebuild.
+    """
+
+    def __init__(self, posts_dir: Path, cache_file: Optional[Path], rescan_interval: float):
+        self.posts_dir = posts_dir
+        self.cache_file = cache_file
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._last_scan = 0.0
+        self._files: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        self.posts: List[Dict] = []
+        self.by_slug: Dict[str, Dict] = {}
+        self.by_tag: Dict[str, List[Dict]] = {}
+        self.related: Dict[str, List[Dict]] = {}
+        self.tags: List[str] = []
+        # Incremented whenever the set or content of posts changes.
+        self.version = 0
+        self._load_disk_cache()
+
+    # -- persistence -------------------------------------------------------
+
+    def _load_disk_cache(self) -> None:
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            payload = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if payload.get("version") != _CACHE_VERSION:
+            return
+        for name, entry in payload.get("files", {}).items():
+            post = dict(entry["post"])
+            post["date"] = datetime.fromisoformat(post["date"])
+            self._files[name] = (tuple(entry["signature"]), post)
+
+    def _save_disk_cache(self) -> None:
+        if not self.cache_file:
+            return
+        files = {}
+        for name, (signature, post) in self._files.items():
+            stored = dict(post)
+            stored["date"] = post["date"].isoformat()
+            files[name] = {"signature": list(signature), "post": stored}
+        tmp = self.cache_file.with_suffix(".tmp")
         try:
-            with open(md_file, "r", encoding="utf-8") as f:
-                post = frontmatter.load(f)
-
-            # Parse frontmatter
-            title = post.get("title", md_file.stem)
-            date_str = post.get("date", "")
-            author = post.get("author", "TalkOnPaper Team")
-            summary = post.get("summary", "")
-            tags = post.get("tags", [])
-
-            # Convert date string to datetime
-            if isinstance(date_str, str):
-                try:
-                    post_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except ValueError:
-                    post_date = datetime.now()
-            elif isinstance(date_str, datetime):
-                post_date = date_str
-            else:
-                post_date = datetime.now()
-
-            # Convert markdown to HTML
-            html_content = markdown.markdown(
-                post.content,
-                extensions=["fenced_code", "tables", "nl2br", "sane_lists"],
-            )
-
-            # Create slug from filename (remove .md and date prefix if present)
-            slug = md_file.stem
-
-            post_dict = {
-                "slug": slug,
-                "title": title,
-                "date": post_date,
-                "author": author,
-                "summary": summary,
-                "tags": tags,
-                "content": html_content,
-                "raw_content": post.content,
-            }
-
-            posts.append(post_dict)
-            _posts_cache[slug] = post_dict
-
-        except Exception as e:
-            current_app.logger.error(f"Error loading blog post {md_file}: {e}")
-            continue
-
-    # Sort by date (newest first)
-    posts.sort(key=lambda p: p["date"], reverse=True)
-
-    _cache_timestamp = datetime.now().timestamp()
-    return posts
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"version": _CACHE_VERSION, "files": files}), encoding="utf-8")
+            os.replace(tmp, self.cache_file)
+        except OSError as exc:
+            current_app.logger.warning("Could not persist blog cache: %s", exc)
+
+    # -- scanning ----------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> None:
+        if not force and self._fresh():
+            return
+        with self._lock:
+            if not force and self._fresh():
+                return
+            first_scan = not self._last_scan
+            changed = self._scan()
+            if changed or first_scan:
+                self._rebuild_views()
+            if changed:
+                self._save_disk_cache()
+            self._last_scan = time.monotonic()
+
+    def _fresh(self) -> bool:
+        return bool(self._last_scan) and time.monotonic() - self._last_scan < self.rescan_interval
+
+    def _scan(self) -> bool:
+        seen: Dict[str, Tuple[int, int]] = {}
+        if self.posts_dir.exists():
+            with os.scandir(self.posts_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        stat = entry.stat()
+                        seen[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = False
+        for name in list(self._files):
+            if name not in seen:
+                del self._files[name]
+                changed = True
+
+        for name, signature in seen.items():
+            cached = self._files.get(name)
+            if cached and cached[0] == signature:
+                continue
+            try:
+                self._files[name] = (signature, render_post(self.posts_dir / name))
+            except Exception as e:
+                current_app.logger.error(f"Error loading blog post {name}: {e}")
+                self._files.pop(name, None)
+            changed = True
+        return changed
+
+    def _rebuild_views(self) -> None:
+        posts = sorted(
+            (post for _, post in self._files.values()),
+            key=lambda p: (p["date"], p["slug"]),
+            reverse=True,
+        )
+        by_tag: Dict[str, List[Dict]] = {}
+        for post in posts:
+            for tag in post.get("tags", []):
+                by_tag.setdefault(tag, []).append(post)
+
+        related: Dict[str, List[Dict]] = {}
+        for post in posts:
+            tags = set(post.get("tags", []))
+            related[post["slug"]] = [
+                p for p in posts if p["slug"] != post["slug"] and tags.intersection(p.get("tags", []))
+            ][:_RELATED_LIMIT]
+
+        # Swap in complete views at once so readers never see a half-built index.
+        self.posts = posts
+        self.by_slug = {p["slug"]: p for p in posts}
+        self.by_tag = by_tag
+        self.related = related
+        self.tags = sorted(by_tag)
+        self.version += 1
+
+
+def blog_index() -> BlogIndex:
+    app = current_app._get_current_object()
+    index = app.extensions.get(_EXTENSION_KEY)
+    if index is None:
+        cache_file = app.config.get("BLOG_CACHE_FILE")
+        index = app.extensions.setdefault(
+            _EXTENSION_KEY,
+            BlogIndex(
+                posts_dir=get_blog_posts_dir(),
+                cache_file=Path(cache_file) if cache_file else None,
+                rescan_interval=float(app.config.get("BLOG_RESCAN_INTERVAL", 10)),
+            ),
+        )
+    index.refresh()
+    return index
+
+
+def load_posts(force_reload: bool = False) -> List[Dict]:
+    """
+    Load all blog posts from markdown files, newest first.
+    Only files whose mtime or size changed since the last scan are re-rendered.
+    """
+    index = blog_index()
+    if force_reload:
+        index.refresh(force=True)
+    return list(index.posts)
 
 
 def get_post_by_slug(slug: str) -> Optional[Dict]:
     """Get a single post by its slug."""
-    posts = load_posts()
-    for post in posts:
-        if post["slug"] == slug:
-            return post
-    return None
+    return blog_index().by_slug.get(slug)
+
+
+def get_posts_by_tag(tag: str) -> List[Dict]:
+    return list(blog_index().by_tag.get(tag, []))
+
+
+def get_related_posts(slug: str) -> List[Dict]:
+    return list(blog_index().related.get(slug, []))
 
 
 @blog_bp.route("/")
 def index():
     """Blog post listing page."""
-    posts = load_posts()
+    blog = blog_index()
     tag_filter = request.args.get("tag")
-
-    if tag_filter:
-        posts = [p for p in posts if tag_filter in p.get("tags", [])]
-
-    # Get all unique tags for filter UI
-    all_tags = set()
-    for post in load_posts():
-        all_tags.update(post.get("tags", []))
+    posts = blog.by_tag.get(tag_filter, []) if tag_filter else blog.posts
 
     return render_template(
         "blog/index.html",
         posts=posts,
-        all_tags=sorted(all_tags),
+        all_tags=blog.tags,
         current_tag=tag_filter,
     )
 
@@ -133,24 +253,10 @@ def post(slug: str):
     """Single blog post page."""
     post = get_post_by_slug(slug)
     if not post:
-        from flask import abort
-
         abort(404)
 
-    # Get related posts (same tags)
-    all_posts = load_posts()
-    related_posts = []
-    if post.get("tags"):
-        for p in all_posts:
-            if p["slug"] != slug and any(
-                tag in p.get("tags", []) for tag in post.get("tags", [])
-            ):
-                related_posts.append(p)
-                if len(related_posts) >= 3:
-                    break
-
     return render_template(
         "blog/post.html",
         post=post,
-        related_posts=related_posts,
+        related_posts=get_related_posts(slug),
     )
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from flask import Response, current_app, g, has_app_context, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import PageCacheGeneration, Paper, Speaker, Talk
+
+_EXTENSION_KEY = "talkonpaper.page_cache"
+
+# Headers worth replaying from a cached response; everything else is rebuilt.
+_REPLAYED_HEADERS = ("Content-Type", "Content-Language", "Link")
+
+LISTING_TALKS = "listing:talks"
+LISTING_PAPERS = "listing:papers"
+LISTING_SPEAKERS = "listing:speakers"
+
+# Rows of page_cache_generations that are not tags: the stamp counter, and the
+# tag every page depends on (bumped by invalidate_all()).
+_COUNTER = "#counter"
+_ALL = "*"
+_table = PageCacheGeneration.__table__
+
+
+@dataclass
+class CachedPage:
+    body: bytes
+    headers: Tuple[Tuple[str, str], ...]
+    etag: str
+    tags: FrozenSet[str]
+    expires_at: float
+    # Counter value read before rendering; see current_stamp().
+    stamp: int
+
+    def to_response(self) -> Response:
+        response = Response(self.body, status=200, headers=list(self.headers))
+        response.set_etag(self.etag)
+        return response
+
+
+@dataclass
+class PageCache:
+    """
+    In-process LRU of rendered pages with a tag -> keys index, so a write
+    can drop exactly the pages that rendered the changed rows. Other
+    workers learn about writes through the stamps in page_cache_generations,
+    checked on every hit.
+    """
+
+    max_entries: int
+    ttl: int
+    hits: int = 0
+    misses: int = 0
+    _entries: "OrderedDict[tuple, CachedPage]" = field(default_factory=OrderedDict)
+    _by_tag: Dict[str, Set[tuple]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self, key: tuple) -> Optional[CachedPage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.time():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedPage) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def discard(self, key: tuple) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _drop(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+def page_cache() -> PageCache:
+    app = current_app._get_current_object()
+    cache = app.extensions.get(_EXTENSION_KEY)
+    if cache is None:
+        cache = app.extensions.setdefault(
+            _EXTENSION_KEY,
+            PageCache(
+                max_entries=int(app.config.get("PAGE_CACHE_MAX_ENTRIES", 1024)),
+                ttl=int(app.config.get("PAGE_CACHE_TTL", 300)),
+            ),
+        )
+    return cache
+
+
+def current_stamp() -> int:
+    """The stamp counter; read before rendering anything that will be cached."""
+    stmt = select(_table.c.generation).where(_table.c.tag == _COUNTER)
+    return db.session.execute(stmt).scalar() or 0
+
+
+def latest_stamp(tags: Iterable[str]) -> int:
+    """
+    Stamp of the last invalidation of any of `tags` (or of everything), in
+    any worker. Content built at counter value N is current while this is <= N.
+    """
+    stmt = select(func.max(_table.c.generation)).where(_table.c.tag.in_([_ALL, *tags]))
+    return db.session.execute(stmt).scalar() or 0
+
+
+def _stamp(tags: Set[str]) -> None:
+    # Its own transaction, after the write committed, so a page rendered
+    # from the old rows always carries an older counter value.
+    for attempt in range(2):
+        try:
+            with db.engine.begin() as conn:
+                bumped = conn.execute(
+                    update(_table).where(_table.c.tag == _COUNTER).values(generation=_table.c.generation + 1)
+                )
+                if bumped.rowcount == 0:
+                    conn.execute(insert(_table).values(tag=_COUNTER, generation=1))
+                stamp = conn.execute(select(_table.c.generation).where(_table.c.tag == _COUNTER)).scalar_one()
+                existing = set(conn.execute(select(_table.c.tag).where(_table.c.tag.in_(tags))).scalars())
+                if existing:
+                    conn.execute(update(_table).where(_table.c.tag.in_(existing)).values(generation=stamp))
+                if tags - existing:
+                    conn.execute(insert(_table), [{"tag": tag, "generation": stamp} for tag in tags - existing])
+            return
+        except IntegrityError:
+            # Another worker inserted the same first row; its copy now exists.
+            if attempt:
+                raise
+
+
+def invalidate(*tags: str) -> None:
+    """Drop cached pages carrying any of `tags`, in every worker (no-op outside an app)."""
+    if tags and has_app_context():
+        page_cache().invalidate(tags)
+        _stamp(set(tags))
+
+
+def invalidate_all() -> None:
+    if has_app_context():
+        page_cache().clear()
+        _stamp({_ALL})
+
+
+def cache_tags(*tags: str) -> None:
+    """Attach dependency tags to the page being rendered."""
+    if hasattr(g, "page_cache_tags"):
+        g.page_cache_tags.update(tags)
+
+
+def skip_page_cache() -> None:
+    """Mark the current response as uncacheable (e.g. it embeds signed URLs)."""
+    g.page_cache_skip = True
+
+
+def talk_tags(talk: Talk) -> Tuple[str, ...]:
+    return (f"talk:{talk.id}", f"paper:{talk.paper_id}", f"speaker:{talk.speaker_id}")
+
+
+def _access_tier() -> str:
+    if current_user.is_authenticated:
+        return current_user.subscription_level
+    return "public"
+
+
+def _cacheable_request() -> bool:
+    if not current_app.config.get("PAGE_CACHE_ENABLED", True):
+        return False
+    if request.method not in ("GET", "HEAD"):
+        return False
+    # Flashes and the navbar user menu make pages per-session.
+    if "_flashes" in session or current_user.is_authenticated:
+        return False
+    return True
+
+
+def _cache_key() -> tuple:
+    query = tuple(sorted(request.args.items(multi=True)))
+    return (request.path, query, _access_tier())
+
+
+def cached_page(*static_tags: str):
+    """
+    Serve anonymous GETs from the page cache with strong ETags.
+
+    Views add row-level dependencies through `cache_tags()`; `static_tags`
+    name the listings the page belongs to.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable_request():
+                return view(*args, **kwargs)
+
+            cache = page_cache()
+            key = _cache_key()
+            entry = cache.get(key)
+            if entry is not None and latest_stamp(entry.tags) > entry.stamp:
+                # Invalidated by a write in another worker.
+                cache.discard(key)
+                entry = None
+            if entry is not None:
+                response = entry.to_response()
+                response.headers["X-Page-Cache"] = "hit"
+                return _finalize(response)
+
+            stamp = current_stamp()
+            g.page_cache_tags = set(static_tags)
+            g.page_cache_skip = False
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or g.page_cache_skip or session.modified:
+                return response
+
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            cache.put(
+                key,
+                CachedPage(
+                    body=body,
+                    headers=tuple(
+                        (k, v) for k, v in response.headers.items() if k in _REPLAYED_HEADERS
+                    ),
+                    etag=etag,
+                    tags=frozenset(g.page_cache_tags),
+                    expires_at=time.time() + cache.ttl,
+                    stamp=stamp,
+                ),
+            )
+            response.set_etag(etag)
+            response.headers["X-Page-Cache"] = "miss"
+            return _finalize(response)
+
+        return wrapper
+
+    return decorator
+
+
+def _finalize(response: Response) -> Response:
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Cookie")
+    return response.make_conditional(request)
+
+
+# --- write-driven invalidation ---------------------------------------------
+
+
+def _tags_for(obj) -> Set[str]:
+    if isinstance(obj, Talk):
+        tags = {LISTING_TALKS, LISTING_PAPERS, LISTING_SPEAKERS, f"talk:{obj.id}"}
+        if obj.paper_id:
+            tags.add(f"paper:{obj.paper_id}")
+        if obj.speaker_id:
+            tags.add(f"speaker:{obj.speaker_id}")
+        return tags
+    if isinstance(obj, Paper):
+        return {LISTING_TALKS, LISTING_PAPERS, f"paper:{obj.id}"}
+    if isinstance(obj, Speaker):
+        return {LISTING_TALKS, LISTING_SPEAKERS, f"speaker:{obj.id}"}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_tags(session, _flush_context) -> None:
+    pending = session.info.setdefault("page_cache_tags", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        pending.update(_tags_for(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session) -> None:
+    tags = session.info.pop("page_cache_tags", None)
+    if tags:
+        invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session) -> None:
+    session.info.pop("page_cache_tags", None)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from flask import Flask, current_app
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, quote_etag, unquote_etag
+from werkzeug.wsgi import ClosingIterator
+
+try:  # Optional: without it clients asking for br get zstd or gzip.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # Optional: without it clients asking for zstd get br or gzip.
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Types worth compressing; media, images and archives are compressed already.
+_COMPRESSIBLE = re.compile(
+    r"^(text/|application/(json|javascript|xml|x-ndjson|rss\+xml|atom\+xml|feed\+json|manifest\+json)|image/svg\+xml"
+    r"|application/[\w.-]+\+(json|xml))"
+)
+# Compressed responses get "<etag>+<encoding>" so each encoding has its own
+# strong ETag; the suffix is stripped from If-None-Match before the app sees it.
+_ETAG_SUFFIX = re.compile(r'\+(br|zstd|gzip)(?="|$)')
+_DEFAULT_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+
+
+class _Encoder:
+    """One-shot and streaming compression for a content coding."""
+
+    def __init__(self, name: str, level: int):
+        self.name = name
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "br":
+            return brotli.compress(data, quality=self.level)
+        if self.name == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return zlib.compress(data, self.level, wbits=31)
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        if self.name == "br":
+            compressor = brotli.Compressor(quality=self.level)
+            process, finish = compressor.process, compressor.finish
+        elif self.name == "zstd":
+            compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+            process, finish = compressor.compress, compressor.flush
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+            process, finish = compressor.compress, compressor.flush
+        for chunk in chunks:
+            if chunk:
+                data = process(chunk)
+                if data:
+                    yield data
+        yield finish()
+
+
+def _available(name: str) -> bool:
+    return name == "gzip" or (name == "br" and brotli is not None) or (name == "zstd" and zstandard is not None)
+
+
+class CompressedBodies:
+    """LRU of compressed bodies keyed by (path, ETag, encoding), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._data[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _key, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "bytes": self.size}
+
+
+class CompressionMiddleware:
+    """
+    Compresses compressible responses with the best coding the client accepts
+    (server preference COMPRESSION_ENCODINGS). Bodies under COMPRESSION_MIN_SIZE,
+    already-encoded, media and range-capable file responses pass through
+    untouched, so `wsgi.file_wrapper` bodies keep using sendfile. Responses with an ETag and
+    a Content-Length up to COMPRESSION_MEMO_MAX_SIZE are compressed once and
+    memoized; everything else is compressed as it streams.
+    """
+
+    def __init__(self, wsgi_app: Callable, config):
+        self.wsgi_app = wsgi_app
+        levels = {**_DEFAULT_LEVELS, **(config.get("COMPRESSION_LEVELS") or {})}
+        self.encoders = [
+            _Encoder(name, int(levels.get(name, _DEFAULT_LEVELS.get(name, 6))))
+            for name in (item.strip() for item in str(config.get("COMPRESSION_ENCODINGS", "br,zstd,gzip")).split(","))
+            if name in _DEFAULT_LEVELS and _available(name)
+        ]
+        self.min_size = int(config.get("COMPRESSION_MIN_SIZE", 1024))
+        self.memo_max_size = int(config.get("COMPRESSION_MEMO_MAX_SIZE", 1024 * 1024))
+        self.memo = CompressedBodies(int(config.get("COMPRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024)))
+
+    def _negotiate(self, accept_encoding: str) -> Optional[_Encoder]:
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_header(accept_encoding)
+        for encoder in self.encoders:
+            if accepted.quality(encoder.name) > 0:
+                return encoder
+        return None
+
+    def __call__(self, environ, start_response):
+        encoder = self._negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoder is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.wsgi_app(environ, start_response)
+
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH", "")
+        revalidated = _ETAG_SUFFIX.search(if_none_match)
+        if revalidated:
+            environ["HTTP_IF_NONE_MATCH"] = _ETAG_SUFFIX.sub("", if_none_match)
+
+        started: List[tuple] = []
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is not None or started == [None]:
+                # Errors after the decision (or a late start) go straight out.
+                return start_response(status, headers, exc_info)
+            started.append((status, headers))
+            return _write_unsupported
+
+        app_iter = self.wsgi_app(environ, capture)
+        if not started:
+            started.append(None)
+            return app_iter
+        status, headers = started[0]
+        headers = Headers(headers)
+        code = int(status.split(" ", 1)[0])
+
+        if code == 304 and revalidated:
+            # The client holds the encoded variant; answer with its ETag.
+            _suffix_etag(headers, revalidated.group(1))
+            start_response(status, headers.to_wsgi_list())
+            return app_iter
+        if not self._eligible(code, headers):
+            start_response(status, headers.to_wsgi_list())
+            return app_iter
+
+        _add_vary(headers)
+        etag = headers.get("ETag")
+        length = headers.get("Content-Length")
+        memo_key = None
+        cacheable = "no-store" not in headers.get("Cache-Control", "")
+        if etag and cacheable and length is not None and int(length) <= self.memo_max_size:
+            memo_key = (environ.get("PATH_INFO", ""), etag, encoder.name)
+
+        headers["Content-Encoding"] = encoder.name
+        if etag:
+            _suffix_etag(headers, encoder.name)
+
+        if memo_key is not None:
+            body = self.memo.get(memo_key)
+            if body is None:
+                try:
+                    body = encoder.compress(b"".join(app_iter))
+                finally:
+                    _close(app_iter)
+                self.memo.set(memo_key, body)
+            else:
+                # The page was rendered anyway (its ETag comes from the body); skip re-compressing it.
+                _close(app_iter)
+            headers["Content-Length"] = str(len(body))
+            start_response(status, headers.to_wsgi_list())
+            return [body]
+
+        headers.pop("Content-Length", None)
+        start_response(status, headers.to_wsgi_list())
+        return ClosingIterator(encoder.stream(app_iter), [lambda: _close(app_iter)])
+
+    def _eligible(self, code: int, headers: Headers) -> bool:
+        if code != 200 or "Content-Encoding" in headers or "Content-Range" in headers:
+            return False
+        # Files served for byte ranges (/media, send_file) must keep their
+        # identity bytes so ranges and sendfile stay valid.
+        if headers.get("Accept-Ranges", "none") != "none":
+            return False
+        if not _COMPRESSIBLE.match(headers.get("Content-Type", "")):
+            return False
+        if "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        length = headers.get("Content-Length")
+        return length is None or int(length) >= self.min_size
+
+
+def _write_unsupported(_data: bytes) -> None:
+    raise RuntimeError("CompressionMiddleware does not support the WSGI write() callable")
+
+
+def _close(app_iter) -> None:
+    close = getattr(app_iter, "close", None)
+    if close is not None:
+        close()
+
+
+def _add_vary(headers: Headers) -> None:
+    vary = [item.strip() for item in headers.get("Vary", "").split(",") if item.strip()]
+    if "accept-encoding" not in (item.lower() for item in vary):
+        headers["Vary"] = ", ".join(vary + ["Accept-Encoding"])
+
+
+def _suffix_etag(headers: Headers, encoding: str) -> None:
+    etag, weak = unquote_etag(headers.get("ETag"))
+    if etag:
+        headers["ETag"] = quote_etag(f"{etag}+{encoding}", weak)
+
+
+def compressed_cache_stats() -> Optional[Dict[str, int]]:
+    middleware = current_app.extensions.get("talkonpaper.compression")
+    return middleware.memo.stats() if middleware is not None else None
+
+
+def init_compression(app: Flask) -> None:
+    """Wrap the WSGI app in CompressionMiddleware (COMPRESSION_ENABLED)."""
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+    middleware = CompressionMiddleware(app.wsgi_app, app.config)
+    app.extensions["talkonpaper.compression"] = middleware
+    app.wsgi_app = middleware
@@ -2,6 +2,17 @@ import os
 from pathlib import Path
 
 
+def _parse_rate_rules(value: str):
+    """"endpoint=requests/seconds,..." -> {endpoint: (requests, seconds)}."""
+    rules = {}
+    for item in value.split(","):
+        endpoint, _, limit = item.partition("=")
+        if "/" in limit:
+            requests, _, seconds = limit.partition("/")
+            rules[endpoint.strip()] = (int(requests), float(seconds))
+    return rules
+
+
 class Config:
     """
     Base configuration tuned for SQLite + Cloudflare R2.
@@ -22,12 +33,165 @@ class Config:
         self.JSON_SORT_KEYS = False
         self.TEMPLATES_AUTO_RELOAD = True
 
+        # Media storage: "r2", "local" (files under LOCAL_MEDIA_ROOT served by
+        # /media/<key> with Range support) or "module:Class".
+        self.STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "r2")
+        self.LOCAL_MEDIA_ROOT = os.environ.get("LOCAL_MEDIA_ROOT", str(Path(instance_path) / "media"))
+
+        # Resumable admin uploads (tus protocol at /admin/uploads) streamed into
+        # multipart uploads of the storage backend, UPLOAD_PART_WORKERS parts at a time.
+        self.UPLOAD_PART_SIZE = int(os.environ.get("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+        self.UPLOAD_PART_WORKERS = int(os.environ.get("UPLOAD_PART_WORKERS", "4"))
+        self.UPLOAD_MAX_SIZE = int(os.environ.get("UPLOAD_MAX_SIZE", str(20 * 1024**3)))
+        self.UPLOAD_LOCK_TIMEOUT = int(os.environ.get("UPLOAD_LOCK_TIMEOUT", "120"))
+        self.UPLOAD_KEY_PREFIX = os.environ.get("UPLOAD_KEY_PREFIX", "uploads")
+
         # Cloudflare R2 (S3-compatible) settings.
         self.R2_ENDPOINT_URL = os.environ.get("R2_ENDPOINT_URL", "https://api.cloudflare.com")
         self.R2_ACCESS_KEY_ID = os.environ.get("R2_ACCESS_KEY_ID", "")
         self.R2_SECRET_ACCESS_KEY = os.environ.get("R2_SECRET_ACCESS_KEY", "")
         self.R2_BUCKET_NAME = os.environ.get("R2_BUCKET_NAME", "talkonpaper-media")
+        # Kept short so a slow endpoint fails a request quickly instead of
+        # holding a worker; R2_MAX_ATTEMPTS counts the first try.
+        self.R2_CONNECT_TIMEOUT = float(os.environ.get("R2_CONNECT_TIMEOUT", "2"))
+        self.R2_READ_TIMEOUT = float(os.environ.get("R2_READ_TIMEOUT", "5"))
+        self.R2_MAX_ATTEMPTS = int(os.environ.get("R2_MAX_ATTEMPTS", "2"))
         self.SIGNED_URL_EXPIRATION = int(os.environ.get("SIGNED_URL_EXPIRATION", "900"))
+        # Presigned URLs are reused until this many seconds before they expire.
+        self.SIGNED_URL_REUSE_MARGIN = int(os.environ.get("SIGNED_URL_REUSE_MARGIN", "180"))
+        self.SIGNED_URL_CACHE_SIZE = int(os.environ.get("SIGNED_URL_CACHE_SIZE", "4096"))
+        # Batched HEAD lookups for media metadata (size, type, last-modified).
+        self.MEDIA_META_WORKERS = int(os.environ.get("MEDIA_META_WORKERS", "8"))
+        self.MEDIA_META_TTL = int(os.environ.get("MEDIA_META_TTL", "300"))
+        self.MEDIA_META_NEGATIVE_TTL = int(os.environ.get("MEDIA_META_NEGATIVE_TTL", "60"))
+        self.MEDIA_META_CACHE_SIZE = int(os.environ.get("MEDIA_META_CACHE_SIZE", "4096"))
+        # Seconds a page waits for a batch; slower lookups finish in the background.
+        self.MEDIA_META_WAIT = float(os.environ.get("MEDIA_META_WAIT", "3"))
+
+        # Archive pagination (keyset/cursor based).
+        self.ARCHIVE_PAGE_SIZE = int(os.environ.get("ARCHIVE_PAGE_SIZE", "24"))
+        self.ARCHIVE_MAX_PAGE_SIZE = int(os.environ.get("ARCHIVE_MAX_PAGE_SIZE", "100"))
+
+        # Blog: rendered posts persist here; the posts folder is re-stat'ed at most this often.
+        self.BLOG_CACHE_FILE = os.environ.get(
+            "BLOG_CACHE_FILE", str(Path(instance_path) / "blog_cache.json")
+        )
+        self.BLOG_RESCAN_INTERVAL = float(os.environ.get("BLOG_RESCAN_INTERVAL", "10"))
+
+        # Pre-rendered blog/evergreen pages (`flask export-static`), served to anonymous GETs.
+        self.STATIC_EXPORT_DIR = os.environ.get(
+            "STATIC_EXPORT_DIR", str(Path(instance_path) / "static_export")
+        )
+        self.STATIC_EXPORT_SERVE = os.environ.get("STATIC_EXPORT_SERVE", "1") == "1"
+        self.STATIC_EXPORT_MAX_AGE = int(os.environ.get("STATIC_EXPORT_MAX_AGE", "86400"))
+
+        # Full-text search (SQLite FTS5; other backends fall back to LIKE).
+        self.SEARCH_RESULT_LIMIT = int(os.environ.get("SEARCH_RESULT_LIMIT", "50"))
+
+        # Anonymous full-page cache (per process; invalidations reach every worker
+        # through the page_cache_generations table, checked on each hit).
+        self.PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") == "1"
+        self.PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", "300"))
+        self.PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", "1024"))
+
+        # Sitemap index + gzipped chunks (`flask sitemap-build`, or in the background on /sitemap.xml).
+        self.SITEMAP_DIR = os.environ.get("SITEMAP_DIR", str(Path(instance_path) / "sitemaps"))
+        self.SITEMAP_CHUNK_SIZE = int(os.environ.get("SITEMAP_CHUNK_SIZE", "50000"))
+        self.SITEMAP_REFRESH_INTERVAL = float(os.environ.get("SITEMAP_REFRESH_INTERVAL", "3600"))
+
+        # Atom/RSS/JSON feeds: built once per content change, re-checked after FEED_TTL.
+        self.FEED_ITEM_LIMIT = int(os.environ.get("FEED_ITEM_LIMIT", "50"))
+        self.FEED_TTL = int(os.environ.get("FEED_TTL", "300"))
+        self.FEED_MAX_AGE = int(os.environ.get("FEED_MAX_AGE", "300"))
+
+        # Transcript segments (/talks/<slug>/transcript.{json,ndjson,vtt}).
+        self.TRANSCRIPT_PAGE_SIZE = int(os.environ.get("TRANSCRIPT_PAGE_SIZE", "50"))
+        self.TRANSCRIPT_MAX_AGE = int(os.environ.get("TRANSCRIPT_MAX_AGE", "300"))
+        self.CAPTIONS_CACHE_SIZE = int(os.environ.get("CAPTIONS_CACHE_SIZE", "256"))
+
+        # Response compression middleware: the first of COMPRESSION_ENCODINGS the
+        # client accepts (br needs `brotli`, zstd needs `zstandard`). Levels trade
+        # CPU for bandwidth, e.g. "br=5,zstd=3,gzip=6".
+        self.COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+        self.COMPRESSION_ENCODINGS = os.environ.get("COMPRESSION_ENCODINGS", "br,zstd,gzip")
+        self.COMPRESSION_LEVELS = {
+            encoding.strip(): int(level)
+            for encoding, _, level in (
+                item.partition("=") for item in os.environ.get("COMPRESSION_LEVELS", "").split(",") if "=" in item
+            )
+        }
+        self.COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+        self.COMPRESSION_MEMO_MAX_SIZE = int(os.environ.get("COMPRESSION_MEMO_MAX_SIZE", str(1024 * 1024)))
+        self.COMPRESSION_CACHE_MAX_BYTES = int(os.environ.get("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+        # Compiled, fingerprinted CSS and static files (`flask assets-build`),
+        # served from /assets/ with immutable caching, under CDN_BASE_URL when set.
+        self.ASSETS_DIR = os.environ.get("ASSETS_DIR", str(base_dir / "static" / "dist"))
+        self.ASSETS_TAILWIND_CMD = os.environ.get("ASSETS_TAILWIND_CMD", "npx tailwindcss")
+        self.CDN_BASE_URL = os.environ.get("CDN_BASE_URL", "")
+
+        # Image derivatives (/img/...): thumbnails and speaker photos resized to
+        # IMAGE_WIDTHS and re-encoded (needs Pillow), kept in a size-bounded disk LRU.
+        self.IMAGE_WIDTHS = os.environ.get("IMAGE_WIDTHS", "320,640,960,1280")
+        self.IMAGE_FORMATS = os.environ.get("IMAGE_FORMATS", "avif,webp,jpeg")
+        self.IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", str(Path(instance_path) / "image_cache"))
+        self.IMAGE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.IMAGE_SOURCE_MAX_BYTES = int(os.environ.get("IMAGE_SOURCE_MAX_BYTES", str(25 * 1024 * 1024)))
+        self.IMAGE_FETCH_TIMEOUT = float(os.environ.get("IMAGE_FETCH_TIMEOUT", "10"))
+
+        # Per-worker cache of the logged-in identity (id, email, role, tier, active).
+        self.IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", "60"))
+        self.IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "4096"))
+
+        # Paper reference verification (`flask verify-papers`): "stub",
+        # "doi_registry" or an import path such as "mypkg.resolvers:Crossref".
+        self.VERIFICATION_RESOLVER = os.environ.get("VERIFICATION_RESOLVER", "stub")
+        self.VERIFICATION_WORKERS = int(os.environ.get("VERIFICATION_WORKERS", "8"))
+        self.VERIFICATION_TIMEOUT = float(os.environ.get("VERIFICATION_TIMEOUT", "10"))
+
+        # Contact form queue: submissions are rows in `contact_submissions`,
+        # handed in batches to CONTACT_HANDLER ("export", "log" or "module:Class")
+        # by a background thread per worker, or by `flask contact-drain`.
+        self.CONTACT_WORKER_ENABLED = os.environ.get("CONTACT_WORKER_ENABLED", "1") == "1"
+        self.CONTACT_HANDLER = os.environ.get("CONTACT_HANDLER", "export")
+        self.CONTACT_EXPORT_PATH = os.environ.get(
+            "CONTACT_EXPORT_PATH", str(Path(instance_path) / "contact_submissions.jsonl")
+        )
+        self.CONTACT_BATCH_SIZE = int(os.environ.get("CONTACT_BATCH_SIZE", "100"))
+        self.CONTACT_MAX_ATTEMPTS = int(os.environ.get("CONTACT_MAX_ATTEMPTS", "5"))
+        self.CONTACT_POLL_INTERVAL = float(os.environ.get("CONTACT_POLL_INTERVAL", "30"))
+        self.CONTACT_CLAIM_TIMEOUT = float(os.environ.get("CONTACT_CLAIM_TIMEOUT", "300"))
+
+        # Token-bucket throttling of expensive endpoints (429 + Retry-After).
+        # RATELIMIT_STORAGE=sqlite shares buckets between workers on one host.
+        self.RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "1") == "1"
+        self.RATELIMIT_STORAGE = os.environ.get("RATELIMIT_STORAGE", "memory")  # memory | sqlite
+        self.RATELIMIT_SQLITE_PATH = os.environ.get(
+            "RATELIMIT_SQLITE_PATH", str(Path(instance_path) / "ratelimit.db")
+        )
+        self.RATELIMIT_IP_RULES = _parse_rate_rules(
+            os.environ.get(
+                "RATELIMIT_IP_RULES",
+                "auth.login=10/60,auth.register=5/300,main.contact=5/600,main.talks_archive=60/60",
+            )
+        )
+        self.RATELIMIT_ACCOUNT_RULES = _parse_rate_rules(
+            os.environ.get("RATELIMIT_ACCOUNT_RULES", "auth.login=5/300,main.contact=3/600")
+        )
+
+        # Opt-in SQL instrumentation (Server-Timing header + per-request log line).
+        self.SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "0") == "1"
+        self.SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+        # "endpoint=max,endpoint=max", e.g. "main.talks_archive=3,main.speaker_profile=3".
+        self.SQL_QUERY_BUDGETS = {
+            endpoint.strip(): int(limit)
+            for endpoint, _, limit in (
+                item.partition("=")
+                for item in os.environ.get("SQL_QUERY_BUDGETS", "").split(",")
+                if "=" in item
+            )
+        }
+        self.SQL_BUDGET_MODE = os.environ.get("SQL_BUDGET_MODE", "warn")  # warn | raise
 
         # SEO defaults.
         self.DEFAULT_CANONICAL_HOST = os.environ.get(
@@ -37,4 +201,3 @@ class Config:
 
         # Feature flags.
         self.ENABLE_AUTODUB_STUB = os.environ.get("ENABLE_AUTODUB_STUB", "1") == "1"
-        self.ENABLE_SAMPLE_DATA = os.environ.get("ENABLE_SAMPLE_DATA", "1") == "1"
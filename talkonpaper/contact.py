@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, or_, select, update
+from werkzeug.utils import import_string
+
+from .extensions import db
+from .models import ContactSubmission
+
+logger = logging.getLogger(__name__)
+
+_table = ContactSubmission.__table__
+_FIELDS = ("id", "name", "email", "subject", "message", "remote_addr", "created_at")
+
+
+# --- handlers ---------------------------------------------------------------
+
+
+class ContactHandler:
+    """
+    Receives claimed submissions in batches, oldest first. Raising marks the
+    whole batch for a retry; returning marks it done.
+    """
+
+    name = "handler"
+
+    def handle(self, submissions: List[Dict]) -> None:
+        raise NotImplementedError
+
+
+class ExportHandler(ContactHandler):
+    """Appends each batch to a JSONL file with one fsync per batch."""
+
+    name = "export"
+
+    def __init__(self, path: Optional[str] = None, **_options):
+        self.path = Path(path or Path(current_app.instance_path) / "contact_submissions.jsonl")
+
+    def handle(self, submissions: List[Dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(item, default=str, ensure_ascii=False) + "\n" for item in submissions)
+        with open(self.path, "a", encoding="utf-8") as out:
+            out.write(lines)
+            out.flush()
+            os.fsync(out.fileno())
+
+
+class LogHandler(ContactHandler):
+    """Writes one log line per submission; for development."""
+
+    name = "log"
+
+    def __init__(self, **_options):
+        pass
+
+    def handle(self, submissions: List[Dict]) -> None:
+        for item in submissions:
+            logger.info("Contact #%s from %s: %s", item["id"], item["email"], item["subject"])
+
+
+HANDLERS = {"export": ExportHandler, "log": LogHandler}
+
+
+def get_handler(name: Optional[str] = None) -> ContactHandler:
+    """A handler by short name or "package.module:Class" import path."""
+    name = name or current_app.config.get("CONTACT_HANDLER", "export")
+    factory = HANDLERS.get(name) or import_string(name.replace(":", "."))
+    return factory(path=current_app.config.get("CONTACT_EXPORT_PATH"))
+
+
+# --- queue ------------------------------------------------------------------
+
+
+def enqueue_submission(name: str, email: str, subject: str, message: str, remote_addr: Optional[str] = None) -> int:
+    """Store a submission for the worker; one small INSERT on the request path."""
+    submission = ContactSubmission(
+        name=name, email=email, subject=subject, message=message, remote_addr=remote_addr
+    )
+    db.session.add(submission)
+    db.session.commit()
+    worker = current_app.extensions.get("talkonpaper.contact")
+    if worker is not None:
+        worker.wake()
+    return submission.id
+
+
+def _claim(batch_size: int, claim_timeout: float) -> List[Dict]:
+    """
+    Atomically move up to `batch_size` queued submissions to "processing".
+    Claims older than `claim_timeout` seconds belong to a worker that died
+    and are taken over.
+    """
+    now = datetime.utcnow()
+    claimable = (
+        select(_table.c.id)
+        .where(
+            or_(
+                _table.c.status == "queued",
+                and_(_table.c.status == "processing", _table.c.claimed_at < now - timedelta(seconds=claim_timeout)),
+            )
+        )
+        .order_by(_table.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.session.execute(
+        update(_table)
+        .where(_table.c.id.in_(claimable.scalar_subquery()))
+        .values(status="processing", claimed_at=now, attempts=_table.c.attempts + 1)
+        .returning(*(getattr(_table.c, name) for name in _FIELDS), _table.c.attempts)
+    ).all()
+    db.session.commit()
+    return sorted((row._asdict() for row in rows), key=lambda item: item["id"])
+
+
+def drain_queue(
+    handler: ContactHandler,
+    batch_size: int = 100,
+    max_attempts: int = 5,
+    claim_timeout: float = 300,
+) -> Dict[str, int]:
+    """
+    Hand queued submissions to `handler` until the queue is empty. Safe to
+    run from several processes at once: each batch is claimed atomically.
+    """
+    counts = {"done": 0, "retried": 0, "failed": 0}
+    while True:
+        batch = _claim(batch_size, claim_timeout)
+        if not batch:
+            return counts
+        ids = [item["id"] for item in batch]
+        try:
+            handler.handle([{key: item[key] for key in _FIELDS} for item in batch])
+        except Exception as exc:  # handlers talk to mail servers, disks, APIs...
+            logger.warning("Contact handler %s failed on %d submissions: %s", handler.name, len(ids), exc)
+            exhausted = [item["id"] for item in batch if item["attempts"] >= max_attempts]
+            retry = [item_id for item_id in ids if item_id not in exhausted]
+            if retry:
+                db.session.execute(
+                    update(_table).where(_table.c.id.in_(retry)).values(status="queued", last_error=str(exc))
+                )
+            if exhausted:
+                db.session.execute(
+                    update(_table).where(_table.c.id.in_(exhausted)).values(status="failed", last_error=str(exc))
+                )
+            db.session.commit()
+            counts["retried"] += len(retry)
+            counts["failed"] += len(exhausted)
+            # Leave the rest for the next wake-up instead of spinning on a broken handler.
+            return counts
+        db.session.execute(
+            update(_table)
+            .where(_table.c.id.in_(ids))
+            .values(status="done", processed_at=datetime.utcnow(), last_error=None)
+        )
+        db.session.commit()
+        counts["done"] += len(ids)
+
+
+def drain_configured(handler_name: Optional[str] = None) -> Dict[str, int]:
+    """`drain_queue` with the handler and limits from the app config."""
+    config = current_app.config
+    return drain_queue(
+        get_handler(handler_name),
+        batch_size=int(config.get("CONTACT_BATCH_SIZE", 100)),
+        max_attempts=int(config.get("CONTACT_MAX_ATTEMPTS", 5)),
+        claim_timeout=float(config.get("CONTACT_CLAIM_TIMEOUT", 300)),
+    )
+
+
+# --- background worker -----------------------------------------------------
+
+
+class ContactWorker:
+    """
+    A daemon thread per process that drains the queue whenever a submission
+    arrives and every `poll_interval` seconds otherwise. Started on the
+    first submission, so CLI commands and idle workers spawn no thread.
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.poll_interval = float(app.config.get("CONTACT_POLL_INTERVAL", 30))
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="contact-queue", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    drain_configured()
+                except Exception:
+                    logger.exception("Contact queue worker iteration failed")
+                    db.session.rollback()
+            self._wake.wait(self.poll_interval)
+
+
+def init_contact_queue(app: Flask) -> None:
+    if app.config.get("CONTACT_WORKER_ENABLED", True):
+        app.extensions["talkonpaper.contact"] = ContactWorker(app)
+
+
+@click.command("contact-drain")
+@click.option("--handler", "handler_name", default=None, help='"export", "log" or "module:Class".')
+@click.option("--retry-failed", is_flag=True, help="Requeue submissions that ran out of attempts first.")
+@with_appcontext
+def contact_drain_command(handler_name: Optional[str], retry_failed: bool) -> None:
+    """Process queued contact submissions (for cron or CONTACT_WORKER_ENABLED=0)."""
+    if retry_failed:
+        db.session.execute(update(_table).where(_table.c.status == "failed").values(status="queued", attempts=0))
+        db.session.commit()
+    counts = drain_configured(handler_name)
+    click.echo(f"Processed {counts['done']} submissions ({counts['retried']} to retry, {counts['failed']} failed).")
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from flask import Blueprint, Response, abort, current_app, request, url_for
+from sqlalchemy.orm import joinedload
+
+from .blog import blog_index
+from .caching import LISTING_TALKS, latest_stamp
+from .models import Talk
+from .routes import canonical_path
+
+feeds_bp = Blueprint("feeds", __name__)
+
+_EXTENSION_KEY = "talkonpaper.feeds"
+
+_MIMETYPES = {
+    "atom": "application/atom+xml; charset=utf-8",
+    "rss": "application/rss+xml; charset=utf-8",
+    "json": "application/feed+json; charset=utf-8",
+}
+
+
+@dataclass
+class FeedItem:
+    id: str
+    title: str
+    url: str
+    summary: str
+    published: datetime
+    updated: datetime
+    author: str
+    tags: List[str]
+    content_html: Optional[str] = None
+
+
+@dataclass
+class Feed:
+    title: str
+    home_url: str
+    feed_url: str
+    description: str
+    items: List[FeedItem]
+
+    @property
+    def updated(self) -> datetime:
+        if not self.items:
+            return datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return max(item.updated for item in self.items)
+
+
+@dataclass
+class BuiltFeed:
+    version: tuple
+    body: bytes
+    etag: str
+    last_modified: datetime
+    expires_at: float
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _iso(value: datetime) -> str:
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+# --- serializers -------------------------------------------------------------
+
+
+def to_atom(feed: Feed) -> bytes:
+    root = ET.Element("feed", xmlns="http://www.w3.org/2005/Atom")
+    ET.SubElement(root, "title").text = feed.title
+    ET.SubElement(root, "subtitle").text = feed.description
+    ET.SubElement(root, "id").text = feed.feed_url
+    ET.SubElement(root, "updated").text = _iso(feed.updated)
+    ET.SubElement(root, "link", href=feed.home_url)
+    ET.SubElement(root, "link", rel="self", href=feed.feed_url)
+    for item in feed.items:
+        entry = ET.SubElement(root, "entry")
+        ET.SubElement(entry, "title").text = item.title
+        ET.SubElement(entry, "id").text = item.id
+        ET.SubElement(entry, "link", href=item.url)
+        ET.SubElement(entry, "published").text = _iso(item.published)
+        ET.SubElement(entry, "updated").text = _iso(item.updated)
+        author = ET.SubElement(entry, "author")
+        ET.SubElement(author, "name").text = item.author
+        for tag in item.tags:
+            ET.SubElement(entry, "category", term=tag)
+        if item.summary:
+            ET.SubElement(entry, "summary").text = item.summary
+        if item.content_html:
+            ET.SubElement(entry, "content", type="html").text = item.content_html
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def to_rss(feed: Feed) -> bytes:
+    root = ET.Element("rss", version="2.0")
+    channel = ET.SubElement(root, "channel")
+    ET.SubElement(channel, "title").text = feed.title
+    ET.SubElement(channel, "link").text = feed.home_url
+    ET.SubElement(channel, "description").text = feed.description
+    ET.SubElement(channel, "lastBuildDate").text = format_datetime(_utc(feed.updated))
+    for item in feed.items:
+        node = ET.SubElement(channel, "item")
+        ET.SubElement(node, "title").text = item.title
+        ET.SubElement(node, "link").text = item.url
+        ET.SubElement(node, "guid", isPermaLink="true").text = item.url
+        ET.SubElement(node, "pubDate").text = format_datetime(_utc(item.published))
+        for tag in item.tags:
+            ET.SubElement(node, "category").text = tag
+        ET.SubElement(node, "description").text = item.content_html or item.summary
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def to_json_feed(feed: Feed) -> bytes:
+    payload = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": feed.title,
+        "home_page_url": feed.home_url,
+        "feed_url": feed.feed_url,
+        "description": feed.description,
+        "items": [
+            {
+                "id": item.id,
+                "url": item.url,
+                "title": item.title,
+                "summary": item.summary,
+                "date_published": _iso(item.published),
+                "date_modified": _iso(item.updated),
+                "authors": [{"name": item.author}],
+                "tags": item.tags,
+                **(
+                    {"content_html": item.content_html}
+                    if item.content_html
+                    else {"content_text": item.summary}
+                ),
+            }
+            for item in feed.items
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+_SERIALIZERS: Dict[str, Callable[[Feed], bytes]] = {
+    "atom": to_atom,
+    "rss": to_rss,
+    "json": to_json_feed,
+}
+
+
+# --- feed sources -----------------------------------------------------------
+
+
+def _item_limit() -> int:
+    return int(current_app.config.get("FEED_ITEM_LIMIT", 50))
+
+
+def blog_feed(tag: Optional[str], fmt: str) -> Feed:
+    blog = blog_index()
+    posts = blog.by_tag.get(tag, []) if tag else blog.posts
+    items = [
+        FeedItem(
+            id=canonical_path(url_for("blog.post", slug=post["slug"])),
+            title=post["title"],
+            url=canonical_path(url_for("blog.post", slug=post["slug"])),
+            summary=post.get("summary", ""),
+            published=post["date"],
+            updated=post["date"],
+            author=post.get("author", "TalkOnPaper Team"),
+            tags=list(post.get("tags", [])),
+            content_html=post["content"],
+        )
+        for post in posts[: _item_limit()]
+    ]
+    title = f"TalkOnPaper Blog · {tag}" if tag else "TalkOnPaper Blog"
+    feed_url = (
+        url_for("feeds.blog_tag_feed", tag=tag, fmt=fmt) if tag else url_for("feeds.blog_feed_view", fmt=fmt)
+    )
+    return Feed(
+        title=title,
+        home_url=canonical_path(url_for("blog.index", tag=tag)),
+        feed_url=canonical_path(feed_url),
+        description="News and insights about academic video dubbing.",
+        items=items,
+    )
+
+
+def talks_feed(fmt: str) -> Feed:
+    talks = (
+        Talk.query.options(joinedload(Talk.paper), joinedload(Talk.speaker))
+        .order_by(Talk.created_at.desc(), Talk.id.desc())
+        .limit(_item_limit())
+        .all()
+    )
+    items = []
+    for talk in talks:
+        url = canonical_path(url_for("main.talk_detail", slug=talk.slug))
+        items.append(
+            FeedItem(
+                id=url,
+                title=talk.title,
+                url=url,
+                summary=talk.summary or talk.paper.abstract,
+                published=talk.created_at,
+                updated=talk.updated_at,
+                author=talk.speaker.full_name,
+                tags=[k.strip() for k in (talk.paper.keywords or "").split(",") if k.strip()],
+            )
+        )
+    return Feed(
+        title="TalkOnPaper · New talks",
+        home_url=canonical_path(url_for("main.talks_archive")),
+        feed_url=canonical_path(url_for("feeds.talks_feed_view", fmt=fmt)),
+        description="Newly published English-dubbed talks tied to peer-reviewed papers.",
+        items=items,
+    )
+
+
+# --- caching and responses --------------------------------------------------
+
+
+class _FeedStore:
+    def __init__(self):
+        self.entries: Dict[Tuple, BuiltFeed] = {}
+        self.lock = threading.Lock()
+
+
+def _store() -> _FeedStore:
+    app = current_app._get_current_object()
+    return app.extensions.setdefault(_EXTENSION_KEY, _FeedStore())
+
+
+def _serve(key: Tuple, version: tuple, fmt: str, build: Callable[[], Feed]) -> Response:
+    """
+    Serialize a feed once per content version and answer conditional
+    requests from the stored ETag/Last-Modified. FEED_TTL bounds staleness
+    for sources without a shared version (the blog, per process).
+    """
+    if fmt not in _SERIALIZERS:
+        abort(404)
+
+    store = _store()
+    now = time.time()
+    built = store.entries.get(key)
+    if built is None or built.version != version or built.expires_at <= now:
+        with store.lock:
+            built = store.entries.get(key)
+            if built is None or built.version != version or built.expires_at <= now:
+                feed = build()
+                body = _SERIALIZERS[fmt](feed)
+                built = BuiltFeed(
+                    version=version,
+                    body=body,
+                    etag=hashlib.sha256(body).hexdigest()[:32],
+                    last_modified=_utc(feed.updated),
+                    expires_at=now + int(current_app.config.get("FEED_TTL", 300)),
+                )
+                store.entries[key] = built
+
+    response = Response(built.body, content_type=_MIMETYPES[fmt])
+    response.set_etag(built.etag)
+    response.last_modified = built.last_modified
+    response.headers["Cache-Control"] = f"public, max-age={int(current_app.config.get('FEED_MAX_AGE', 300))}"
+    return response.make_conditional(request)
+
+
+@feeds_bp.route("/blog/feed.<fmt>")
+def blog_feed_view(fmt: str):
+    blog = blog_index()
+    return _serve(("blog", None, fmt), (blog.version,), fmt, lambda: blog_feed(None, fmt))
+
+
+@feeds_bp.route("/blog/tag/<tag>/feed.<fmt>")
+def blog_tag_feed(tag: str, fmt: str):
+    blog = blog_index()
+    if tag not in blog.by_tag:
+        abort(404)
+    return _serve(("blog", tag, fmt), (blog.version,), fmt, lambda: blog_feed(tag, fmt))
+
+
+@feeds_bp.route("/talks/feed.<fmt>")
+def talks_feed_view(fmt: str):
+    version = (latest_stamp([LISTING_TALKS]),)
+    return _serve(("talks", None, fmt), version, fmt, lambda: talks_feed(fmt))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional, Set
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .extensions import db, login_manager
+from .models import User
+from .storage import LRUCache
+
+_EXTENSION_KEY = "talkonpaper.identity"
+_init_lock = threading.Lock()
+
+
+class Identity(UserMixin):
+    """
+    Read-only stand-in for `User` as `current_user`: just the columns that
+    access checks and the navbar need, without the ORM relationships.
+    """
+
+    def __init__(self, id: int, email: str, role: str, subscription_level: str, is_active: bool):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.subscription_level = subscription_level
+        self._active = bool(is_active)
+
+    @property
+    def is_active(self) -> bool:
+        return self._active
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+    def __repr__(self) -> str:
+        return f"<Identity {self.id} {self.role}/{self.subscription_level}>"
+
+
+def _cache() -> LRUCache:
+    app = current_app._get_current_object()
+    cache = app.extensions.get(_EXTENSION_KEY)
+    if cache is None:
+        with _init_lock:
+            cache = app.extensions.setdefault(
+                _EXTENSION_KEY, LRUCache(int(app.config.get("IDENTITY_CACHE_SIZE", 4096)))
+            )
+    return cache
+
+
+def load_identity(user_id: int) -> Optional[Identity]:
+    now = time.time()
+    cache = _cache()
+    identity = cache.get(user_id, now)
+    if identity is not None:
+        return identity
+
+    row = db.session.execute(
+        select(User.id, User.email, User.role, User.subscription_level, User.is_active).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    identity = Identity(*row)
+    cache.set(user_id, identity, now + int(current_app.config.get("IDENTITY_CACHE_TTL", 60)))
+    return identity
+
+
+def invalidate_identity(*user_ids: int) -> None:
+    """Forget cached identities (no-op outside an app)."""
+    if has_app_context():
+        cache = _cache()
+        for user_id in user_ids:
+            cache.discard(user_id)
+
+
+@login_manager.user_loader
+def load_user(user_id: str):
+    try:
+        identity = load_identity(int(user_id))
+    except ValueError:
+        return None
+    # Deactivated accounts lose their existing sessions, not just new logins.
+    if identity is None or not identity.is_active:
+        return None
+    return identity
+
+
+# --- write-driven invalidation ---------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, _flush_context) -> None:
+    pending: Set[int] = session.info.setdefault("identity_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            pending.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session) -> None:
+    user_ids = session.info.pop("identity_user_ids", None)
+    if user_ids:
+        invalidate_identity(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session) -> None:
+    session.info.pop("identity_user_ids", None)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from urllib.request import Request, urlopen
+
+from flask import Blueprint, Flask, abort, current_app, send_file, url_for
+from sqlalchemy import event, inspect, select
+
+from .models import Speaker, Talk
+from .storage import is_external_key, signed_url, storage_backend
+
+try:  # Pillow is optional; without it templates link the original images.
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover
+    Image = ImageOps = features = None
+
+logger = logging.getLogger(__name__)
+
+images_bp = Blueprint("images", __name__)
+
+_EXTENSION_KEY = "talkonpaper.images"
+ONE_YEAR = 365 * 24 * 3600
+# Preference order for <picture>: the first format the browser accepts wins.
+# Values are (Pillow format, mimetype, encoder options, Pillow feature).
+FORMATS: Dict[str, Tuple[str, str, Dict, Optional[str]]] = {
+    "avif": ("AVIF", "image/avif", {"quality": 55, "speed": 6}, "avif"),
+    "webp": ("WEBP", "image/webp", {"quality": 78, "method": 4}, "webp"),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}, None),
+}
+# Leftover partial writes from a crashed worker are removed after this long.
+_PARTIAL_MAX_AGE = 3600
+# Cache hits refresh the file's mtime (the LRU order) at most this often.
+_TOUCH_INTERVAL = 3600
+
+
+class DiskLRU:
+    """
+    Files under `root`, removed least recently used first once together they
+    exceed `max_bytes`. Recency is the file mtime, bumped on hits, so the
+    order survives restarts and is shared by every worker on the host.
+    Eviction trims to 90% of the bound, so the directory scan is rare.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def open(self, name: str) -> Optional[BinaryIO]:
+        """The cached file, opened (so eviction cannot pull it away), or None."""
+        path = self.path(name)
+        try:
+            fileobj = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - os.fstat(fileobj.fileno()).st_mtime > _TOUCH_INTERVAL:
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:  # evicted by another worker just now
+                pass
+        return fileobj
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{name}.{secrets.token_hex(4)}.part")
+        partial.write_bytes(data)
+        os.replace(partial, path)
+        with self._lock:
+            self._size = self._scan()[1] if self._size is None else self._size + len(data)
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, Path]], int]:
+        entries, now = [], time.time()
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".part":
+                if now - stat.st_mtime > _PARTIAL_MAX_AGE:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self) -> int:
+        """Drop the oldest files until the cache is under 90% of its bound."""
+        with self._lock:
+            entries, total = self._scan()
+            removed = 0
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_bytes * 0.9:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self._size = total
+        return removed
+
+
+class _ImageState:
+    def __init__(self, app: Flask):
+        cfg = app.config
+        self.secret = str(cfg.get("SECRET_KEY") or "").encode("utf-8")
+        self.widths = sorted(int(width) for width in str(cfg.get("IMAGE_WIDTHS", "")).split(",") if width.strip())
+        wanted = [name.strip() for name in str(cfg.get("IMAGE_FORMATS", "")).split(",") if name.strip()]
+        self.formats = [name for name in FORMATS if name in wanted and _supported(name)]
+        self.cache = DiskLRU(
+            Path(cfg.get("IMAGE_CACHE_DIR") or Path(app.instance_path) / "image_cache"),
+            int(cfg.get("IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+        )
+        self.source_max_bytes = int(cfg.get("IMAGE_SOURCE_MAX_BYTES", 25 * 1024 * 1024))
+        self.fetch_timeout = float(cfg.get("IMAGE_FETCH_TIMEOUT", 10))
+        # name -> [lock, holders and waiters]; dropped when the last one leaves.
+        self._pending: Dict[str, list] = {}
+        self._pending_lock = threading.Lock()
+
+    @contextmanager
+    def variant_lock(self, name: str) -> Iterator[None]:
+        with self._pending_lock:
+            entry = self._pending.setdefault(name, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._pending_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._pending[name]
+
+
+def _supported(fmt: str) -> bool:
+    if Image is None:
+        return False
+    feature = FORMATS[fmt][3]
+    return feature is None or bool(features.check(feature))
+
+
+def _state() -> _ImageState:
+    return current_app.extensions[_EXTENSION_KEY]
+
+
+def init_images(app: Flask) -> None:
+    app.extensions[_EXTENSION_KEY] = _ImageState(app)
+    app.add_template_global(image_url)
+    app.add_template_global(image_srcset)
+    app.add_template_global(image_formats)
+
+
+# --- versions ---------------------------------------------------------------
+
+# (model, image key column, version column). Versions live on the row so
+# rendering a page never asks the storage backend anything.
+_VERSIONED = (
+    (Talk, "thumbnail_object_key", "thumbnail_version"),
+    (Speaker, "photo_object_key", "photo_version"),
+)
+
+
+def _bump_on_key_change(key_column: str, version_column: str):
+    def bump(_mapper, _connection, target) -> None:
+        if inspect(target).attrs[key_column].history.has_changes():
+            setattr(target, version_column, (getattr(target, version_column) or 0) + 1)
+
+    return bump
+
+
+for _model, _key_column, _version_column in _VERSIONED:
+    event.listen(_model, "before_update", _bump_on_key_change(_key_column, _version_column))
+
+
+def bump_image_versions(conn, model, updates: List[Dict]) -> None:
+    """
+    Add the bumped image version to Core bulk UPDATE rows (dicts keyed by
+    "id") that change the image key; call it before running the UPDATE.
+    """
+    for versioned, key_column, version_column in _VERSIONED:
+        if versioned is not model:
+            continue
+        changes = {row["id"]: row for row in updates if key_column in row}
+        if not changes:
+            return
+        key, version = getattr(model, key_column), getattr(model, version_column)
+        stmt = select(model.id, key, version).where(model.id.in_(changes))
+        for row_id, old_key, old_version in conn.execute(stmt):
+            if changes[row_id][key_column] != old_key:
+                changes[row_id][version_column] = (old_version or 0) + 1
+
+
+# --- URLs -------------------------------------------------------------------
+
+
+def _digest(state: _ImageState, object_key: str, version: int) -> str:
+    message = f"{object_key}\n{version}".encode("utf-8")
+    digest = hmac.new(state.secret, message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode("ascii")
+
+
+def _encode_key(object_key: str) -> str:
+    return base64.urlsafe_b64encode(object_key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_key(token: str) -> Optional[str]:
+    try:
+        return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def image_formats() -> List[str]:
+    """Derivative formats this process can encode, best first."""
+    return _state().formats
+
+
+def _variant_url(state: _ImageState, object_key: str, version: int, width: int, fmt: str) -> str:
+    return url_for(
+        "images.serve_image",
+        digest=_digest(state, object_key, version),
+        token=_encode_key(object_key),
+        version=version,
+        width=width,
+        fmt=fmt,
+    )
+
+
+def image_url(object_key: Optional[str], width: int, fmt: str = "jpeg", version: int = 0) -> Optional[str]:
+    """
+    URL of the `width`-pixel `fmt` variant of an image (a storage key or an
+    http(s) URL) at `version`, the row's thumbnail_version/photo_version.
+    Falls back to the original when derivatives are off.
+    """
+    if not object_key:
+        return None
+    state = _state()
+    if fmt not in state.formats or not state.widths:
+        return object_key if is_external_key(object_key) else signed_url(object_key)
+    width = min((w for w in state.widths if w >= width), default=state.widths[-1])
+    return _variant_url(state, object_key, version, width, fmt)
+
+
+def image_srcset(object_key: Optional[str], fmt: str = "jpeg", version: int = 0) -> str:
+    """A `srcset` value listing every configured width of `fmt`."""
+    state = _state()
+    if not object_key or fmt not in state.formats:
+        return ""
+    return ", ".join(f"{_variant_url(state, object_key, version, width, fmt)} {width}w" for width in state.widths)
+
+
+# --- rendering --------------------------------------------------------------
+
+
+def _read_source(state: _ImageState, object_key: str) -> bytes:
+    limit = state.source_max_bytes
+    if is_external_key(object_key):
+        request = Request(object_key, headers={"User-Agent": "TalkOnPaper image derivatives"})
+        with urlopen(request, timeout=state.fetch_timeout) as response:
+            data = response.read(limit + 1)
+    else:
+        with closing(storage_backend().open(object_key)) as fileobj:
+            data = fileobj.read(limit + 1)
+    if len(data) > limit:
+        raise ValueError(f"source image is larger than {limit} bytes")
+    return data
+
+
+def render_variant(data: bytes, width: int, fmt: str) -> bytes:
+    """Decode `data`, scale it down to `width` (never up) and encode as `fmt`."""
+    pil_format, _mimetype, options, _feature = FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEG sources decode straight at 1/2, 1/4 or 1/8 scale when that is still large enough.
+        source.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(source)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        transparent = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+        if transparent and fmt != "jpeg":
+            image = image.convert("RGBA")
+        elif transparent:
+            flat = Image.new("RGB", image.size, "white")
+            rgba = image.convert("RGBA")
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+            image = flat
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, pil_format, **options)
+        return out.getvalue()
+
+
+def _variant(state: _ImageState, object_key: str, name: str, width: int, fmt: str) -> BinaryIO:
+    fileobj = state.cache.open(name)
+    if fileobj is not None:
+        return fileobj
+    # One render per variant and process; concurrent requests wait for it.
+    with state.variant_lock(name):
+        fileobj = state.cache.open(name)
+        if fileobj is None:
+            data = render_variant(_read_source(state, object_key), width, fmt)
+            state.cache.put(name, data)
+            fileobj = io.BytesIO(data)
+    return fileobj
+
+
+@images_bp.route("/img/<digest>/<token>/<int:version>/<int:width>.<fmt>")
+def serve_image(digest: str, token: str, version: int, width: int, fmt: str):
+    """
+    A resized, re-encoded variant of a thumbnail or speaker photo. The URL
+    carries the source key and version and an HMAC over both, so only images
+    the site links to are rendered; a new image bumps the version and gets
+    new URLs, so variants are immutable and cached on disk.
+    """
+    state = _state()
+    object_key = _decode_key(token)
+    if (
+        object_key is None
+        or not hmac.compare_digest(_digest(state, object_key, version), digest)
+        or width not in state.widths
+        or fmt not in state.formats
+    ):
+        abort(404)
+
+    name = f"{digest}-{width}.{fmt}"
+    try:
+        fileobj = _variant(state, object_key, name, width, fmt)
+    except Exception as exc:  # missing objects, network errors, undecodable images...
+        logger.warning("Image variant %s.%s of %s failed: %s", width, fmt, object_key, exc)
+        abort(404)
+
+    response = send_file(fileobj, mimetype=FORMATS[fmt][1], max_age=ONE_YEAR, etag=name, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
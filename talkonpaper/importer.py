@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from .caching import LISTING_PAPERS, LISTING_SPEAKERS, LISTING_TALKS, invalidate
+from .extensions import db
+from .images import bump_image_versions
+from .models import Paper, Speaker, Talk
+from .search import reindex_rows
+from .seed import bulk_insert
+from .slugs import allocate_slugs
+from .stats import apply_deltas, row_deltas, update_deltas
+from .transcripts import sync_transcripts
+from .verification import verification_fields
+
+# Column names match the admin quick-add form, so a spreadsheet export of
+# that form imports as is.
+REQUIRED_FIELDS = (
+    "speaker_name",
+    "speaker_affiliation",
+    "paper_title",
+    "paper_authors",
+    "paper_doi",
+    "paper_year",
+    "talk_title",
+    "video_object_key",
+)
+ACCESS_LEVELS = ("public", "registered", "academic_premium")
+_TRUTHY = {"1", "true", "yes", "on", "y"}
+# Filled in for new rows only; blank optional cells never overwrite stored values.
+_PAPER_DEFAULTS = {"abstract": "Abstract not provided.", "language_original": "en"}
+_TALK_DEFAULTS = {"duration_seconds": 0, "access_level": "public", "is_dubbed": False}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ParsedRow:
+    line: int
+    speaker: Dict
+    paper: Dict
+    talk: Dict
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    speakers_created: int = 0
+    papers_created: int = 0
+    papers_updated: int = 0
+    talks_created: int = 0
+    talks_updated: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def imported(self) -> int:
+        return self.talks_created + self.talks_updated
+
+
+# --- reading ----------------------------------------------------------------
+
+
+def detect_format(filename: str) -> str:
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {filename!r}; use .csv or .jsonl.")
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, raw record) without reading the whole file."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, RowError(f"invalid JSON: {exc}")
+
+
+def _text(raw: Dict, key: str) -> Optional[str]:
+    value = raw.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_row(line: int, raw: Dict) -> ParsedRow:
+    if not isinstance(raw, dict):
+        raise RowError("expected an object per line")
+    missing = [name for name in REQUIRED_FIELDS if not _text(raw, name)]
+    if missing:
+        raise RowError(f"missing {', '.join(missing)}")
+
+    try:
+        year = int(_text(raw, "paper_year"))
+        duration = _text(raw, "talk_duration")
+        duration = int(duration) if duration is not None else None
+    except ValueError:
+        raise RowError("paper_year and talk_duration must be integers") from None
+
+    talk_date: Optional[date] = None
+    if _text(raw, "talk_date"):
+        try:
+            talk_date = date.fromisoformat(_text(raw, "talk_date"))
+        except ValueError:
+            raise RowError("talk_date must be yyyy-mm-dd") from None
+
+    access_level = _text(raw, "access_level")
+    if access_level is not None and access_level not in ACCESS_LEVELS:
+        raise RowError(f"access_level must be one of {', '.join(ACCESS_LEVELS)}")
+
+    is_dubbed = raw.get("is_dubbed")
+    if not isinstance(is_dubbed, bool):
+        is_dubbed = _text(raw, "is_dubbed")
+        is_dubbed = is_dubbed.lower() in _TRUTHY if is_dubbed is not None else None
+
+    return ParsedRow(
+        line=line,
+        speaker={
+            "full_name": _text(raw, "speaker_name"),
+            "affiliation": _text(raw, "speaker_affiliation"),
+            "country": _text(raw, "speaker_country"),
+            "bio_short": _text(raw, "speaker_bio"),
+            "website_or_profile": _text(raw, "speaker_site"),
+            "photo_object_key": _text(raw, "speaker_photo_object_key"),
+        },
+        paper={
+            "title": _text(raw, "paper_title"),
+            "abstract": _text(raw, "paper_abstract"),
+            "authors": _text(raw, "paper_authors"),
+            "doi_or_url": _text(raw, "paper_doi"),
+            "journal_or_publisher": _text(raw, "paper_journal"),
+            "publication_year": year,
+            "language_original": _text(raw, "paper_language"),
+            "keywords": _text(raw, "paper_keywords"),
+            "pdf_object_key": _text(raw, "paper_pdf_key"),
+        },
+        talk={
+            "title": _text(raw, "talk_title"),
+            "summary": _text(raw, "talk_summary"),
+            "duration_seconds": duration,
+            "talk_date": talk_date,
+            "access_level": access_level,
+            "is_dubbed": is_dubbed,
+            "video_object_key": _text(raw, "video_object_key"),
+            "preview_video_key": _text(raw, "preview_video_key"),
+            "audio_object_key": _text(raw, "audio_object_key"),
+            "thumbnail_object_key": _text(raw, "thumbnail_object_key"),
+            "transcript_text": _text(raw, "transcript_text"),
+        },
+    )
+
+
+# --- writing ----------------------------------------------------------------
+
+
+def _for_insert(values: Dict, defaults: Dict) -> Dict:
+    return {**values, **{key: value for key, value in defaults.items() if values.get(key) is None}}
+
+
+def _for_update(values: Dict) -> Dict:
+    # Every parsed value is None when its cell was absent or blank.
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _speaker_ids(names: Iterable[str]) -> Dict[str, int]:
+    # Names are not unique; like the quick-add form, the oldest match wins.
+    stmt = select(Speaker.full_name, func.min(Speaker.id)).where(Speaker.full_name.in_(set(names)))
+    return dict(db.session.execute(stmt.group_by(Speaker.full_name)).all())
+
+
+def _paper_ids(dois: Iterable[str]) -> Dict[str, int]:
+    stmt = select(Paper.doi_or_url, Paper.id).where(Paper.doi_or_url.in_(set(dois)))
+    return dict(db.session.execute(stmt).all())
+
+
+def _talk_ids(paper_ids: Iterable[int]) -> Dict[int, int]:
+    stmt = select(Talk.paper_id, Talk.id).where(Talk.paper_id.in_(set(paper_ids)))
+    return dict(db.session.execute(stmt).all())
+
+
+def _chunk_tags(talk_ids: Iterable[int], paper_ids: Iterable[int], speaker_ids: Iterable[int]) -> List[str]:
+    tags = [LISTING_TALKS, LISTING_PAPERS, LISTING_SPEAKERS]
+    tags.extend(f"talk:{talk_id}" for talk_id in talk_ids)
+    tags.extend(f"paper:{paper_id}" for paper_id in paper_ids)
+    tags.extend(f"speaker:{speaker_id}" for speaker_id in speaker_ids)
+    return tags
+
+
+def _write_chunk(rows: List[ParsedRow], report: ImportReport) -> None:
+    """
+    Upsert one chunk in a single transaction: three IN lookups, then
+    executemany inserts for new rows and bulk updates for existing ones.
+    Core writes skip the mapper events, so the search rows, counters and
+    cached pages of the touched rows are refreshed here.
+    """
+    now = datetime.utcnow()
+    conn = db.session.connection()
+
+    speaker_ids = _speaker_ids(r.speaker["full_name"] for r in rows)
+    new_speakers = {}
+    for row in rows:
+        name = row.speaker["full_name"]
+        if name not in speaker_ids:
+            new_speakers.setdefault(name, row.speaker)
+    deltas = row_deltas(Speaker, new_speakers.values())
+    if new_speakers:
+        bulk_insert(Speaker, list(new_speakers.values()))
+        speaker_ids.update(_speaker_ids(new_speakers))
+
+    paper_ids = _paper_ids(r.paper["doi_or_url"] for r in rows)
+    new_papers = [
+        {**_for_insert(r.paper, _PAPER_DEFAULTS), **verification_fields(r.paper["doi_or_url"], now)}
+        for r in rows
+        if r.paper["doi_or_url"] not in paper_ids
+    ]
+    # Existing papers keep their verification: they matched on the same DOI.
+    existing_papers = [
+        {**_for_update(r.paper), "id": paper_ids[r.paper["doi_or_url"]], "updated_at": now}
+        for r in rows
+        if r.paper["doi_or_url"] in paper_ids
+    ]
+    bulk_insert(Paper, new_papers)
+    row_deltas(Paper, new_papers, deltas=deltas)
+    if existing_papers:
+        update_deltas(conn, Paper, existing_papers, deltas)
+        db.session.execute(update(Paper), existing_papers)
+    if new_papers:
+        paper_ids.update(_paper_ids(p["doi_or_url"] for p in new_papers))
+
+    talk_ids = _talk_ids(paper_ids.values())
+    new_talks, existing_talks = [], []
+    for row in rows:
+        paper_id = paper_ids[row.paper["doi_or_url"]]
+        refs = {"paper_id": paper_id, "speaker_id": speaker_ids[row.speaker["full_name"]]}
+        if paper_id in talk_ids:
+            existing_talks.append({**_for_update(row.talk), **refs, "id": talk_ids[paper_id], "updated_at": now})
+        else:
+            new_talks.append({**_for_insert(row.talk, _TALK_DEFAULTS), **refs})
+    # Existing talks keep their slug so their URLs stay put.
+    for talk, slug in zip(new_talks, allocate_slugs(db.session, [t["title"] for t in new_talks])):
+        talk["slug"] = slug
+    bulk_insert(Talk, new_talks)
+    row_deltas(Talk, new_talks, deltas=deltas)
+    # Speakers a talk moves away from list it no longer.
+    touched_speakers = set(speaker_ids.values())
+    if existing_talks:
+        moved = select(Talk.speaker_id).where(Talk.id.in_([t["id"] for t in existing_talks]))
+        touched_speakers.update(db.session.execute(moved).scalars())
+        update_deltas(conn, Talk, existing_talks, deltas)
+        bump_image_versions(conn, Talk, existing_talks)
+        db.session.execute(update(Talk), existing_talks)
+    touched_talks = list(_talk_ids(paper_ids.values()).values())
+    # Stored transcripts that were not re-sent keep their segments.
+    kept = {t["id"] for t in existing_talks if "transcript_text" not in t}
+    sync_transcripts(talk_id for talk_id in touched_talks if talk_id not in kept)
+    reindex_rows(conn, talk_ids=touched_talks, paper_ids=paper_ids.values())
+    apply_deltas(conn, deltas)
+
+    db.session.commit()
+    invalidate(*_chunk_tags(touched_talks, paper_ids.values(), touched_speakers))
+    report.speakers_created += len(new_speakers)
+    report.papers_created += len(new_papers)
+    report.papers_updated += len(existing_papers)
+    report.talks_created += len(new_talks)
+    report.talks_updated += len(existing_talks)
+
+
+def _import_chunk(rows: List[ParsedRow], report: ImportReport) -> None:
+    try:
+        _write_chunk(rows, report)
+    except IntegrityError as exc:
+        db.session.rollback()
+        if len(rows) == 1:
+            report.errors.append((rows[0].line, f"database rejected row: {exc.orig}"))
+            return
+        # Isolate the offending rows; the rest of the chunk still lands.
+        for row in rows:
+            _import_chunk([row], report)
+
+
+def import_catalog(
+    stream: IO[str],
+    fmt: str,
+    batch_size: int = 1000,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Stream speaker/paper/talk rows from CSV or JSONL and upsert them in
+    chunked transactions. Papers match on DOI/URL, talks on their paper and
+    speakers on full name; invalid rows are reported, not fatal. Blank or
+    missing optional cells leave the stored values of matched rows alone.
+    """
+    report = ImportReport()
+    chunk: Dict[str, ParsedRow] = {}
+    for line, raw in iter_records(stream, fmt):
+        report.rows += 1
+        try:
+            if isinstance(raw, RowError):
+                raise raw
+            row = parse_row(line, raw)
+        except RowError as exc:
+            report.errors.append((line, str(exc)))
+            continue
+        # A paper has one talk, so a later row for the same DOI wins.
+        doi = row.paper["doi_or_url"]
+        if doi in chunk:
+            report.errors.append((chunk[doi].line, f"superseded by line {line} (same paper_doi)"))
+        chunk[doi] = row
+        if len(chunk) >= batch_size:
+            _import_chunk(list(chunk.values()), report)
+            chunk = {}
+            if progress:
+                progress(report)
+    if chunk:
+        _import_chunk(list(chunk.values()), report)
+        if progress:
+            progress(report)
+    return report
+
+
+@click.command("import-catalog")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None, help="Defaults to the file extension.")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--errors", "errors_path", type=click.Path(dir_okay=False, path_type=Path), default=None, help="Write per-row errors as CSV.")
+@with_appcontext
+def import_catalog_command(path: Path, fmt: Optional[str], batch_size: int, errors_path: Optional[Path]) -> None:
+    """Bulk-import talks with their speakers and papers from CSV or JSONL."""
+    started = time.perf_counter()
+    if fmt is None:
+        try:
+            fmt = detect_format(path.name)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc), param_hint="--format") from None
+
+    def progress(report: ImportReport) -> None:
+        click.echo(f"  {report.rows} rows read, {report.imported} talks written, {len(report.errors)} errors")
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as stream:
+        report = import_catalog(stream, fmt, batch_size=batch_size, progress=progress)
+
+    click.echo(
+        f"Imported {report.talks_created} new and {report.talks_updated} updated talks "
+        f"({report.papers_created} new papers, {report.speakers_created} new speakers) "
+        f"from {report.rows} rows in {time.perf_counter() - started:.1f}s."
+    )
+    if errors_path and report.errors:
+        with open(errors_path, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["line", "error"])
+            writer.writerows(sorted(report.errors))
+    for line, message in sorted(report.errors)[:20]:
+        click.echo(f"  line {line}: {message}", err=True)
+    if len(report.errors) > 20:
+        click.echo(f"  ... and {len(report.errors) - 20} more errors", err=True)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from flask import Flask, g, has_app_context, request
+from sqlalchemy import event
+
+from .extensions import db
+
+logger = logging.getLogger("talkonpaper.sql")
+
+_IN_LIST_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WS_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in budget mode when a request or block issues too many queries."""
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL string so the same query with different parameters
+    (including expanded IN lists and inlined literals) maps to one key.
+    """
+    shape = _IN_LIST_RE.sub("(?)", statement)
+    shape = _LITERAL_RE.sub("?", shape)
+    return _WS_RE.sub(" ", shape).strip()
+
+
+def _active_stats() -> List[QueryStats]:
+    if not has_app_context():
+        return []
+    return getattr(g, "_sql_stats_stack", [])
+
+
+# The start time rides on the execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind.
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    if context is not None:
+        context._sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, statement, _parameters, context, _executemany):
+    started = getattr(context, "_sql_started", None)
+    if started is None:
+        return
+    stack = _active_stats()
+    if not stack:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    shape = statement_shape(statement)
+    for stats in stack:
+        stats.count += 1
+        stats.duration_ms += elapsed_ms
+        stats.shapes[shape] += 1
+
+
+def _ensure_listeners(engine) -> None:
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect query stats for the enclosed block (nests with request tracking)."""
+    _ensure_listeners(db.engine)
+    stats = QueryStats()
+    if not hasattr(g, "_sql_stats_stack"):
+        g._sql_stats_stack = []
+    g._sql_stats_stack.append(stats)
+    try:
+        yield stats
+    finally:
+        g._sql_stats_stack.remove(stats)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """
+    Fail loudly when the enclosed block issues more than `max_queries`.
+    Intended for tests and benchmarks.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label} issued {stats.count} queries (budget {max_queries}); "
+            f"repeated shapes: {stats.repeated(2)}"
+        )
+
+
+def _request_stats() -> Optional[QueryStats]:
+    return getattr(g, "_sql_request_stats", None)
+
+
+def init_instrumentation(app: Flask) -> None:
+    """
+    Opt-in per-request SQL accounting: query count, DB time and repeated
+    statement shapes, reported via Server-Timing and one log line per request.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION", False):
+        return
+
+    with app.app_context():
+        _ensure_listeners(db.engine)
+
+    threshold = int(app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 5))
+    budgets: Dict[str, int] = dict(app.config.get("SQL_QUERY_BUDGETS") or {})
+    budget_mode = app.config.get("SQL_BUDGET_MODE", "warn")
+
+    @app.before_request
+    def _start_sql_tracking():
+        stats = QueryStats()
+        g._sql_request_stats = stats
+        g._sql_stats_stack = [stats]
+
+    @app.after_request
+    def _report_sql_tracking(response):
+        stats = _request_stats()
+        if stats is None:
+            return response
+
+        suspects = stats.repeated(threshold)
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"',
+        )
+        record = {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.duration_ms, 2),
+        }
+        if suspects:
+            record["n_plus_one"] = suspects
+            logger.warning("sql %s", json.dumps(record))
+        else:
+            logger.info("sql %s", json.dumps(record))
+
+        budget = budgets.get(request.endpoint or "")
+        if budget is not None and stats.count > budget:
+            message = (
+                f"{request.endpoint} issued {stats.count} queries (budget {budget}); "
+                f"repeated shapes: {stats.repeated(2)}"
+            )
+            if budget_mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning("sql budget exceeded: %s", message)
+        return response
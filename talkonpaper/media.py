@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, Response, abort, request
+from werkzeug.http import http_date, quote_etag
+from werkzeug.wsgi import wrap_file
+
+from .storage import LocalBackend, storage_backend
+
+media_bp = Blueprint("media", __name__)
+
+# More ranges than this are answered with the whole file (RFC 9110 allows
+# ignoring Range); it stops tiny-range requests from multiplying the work.
+MAX_RANGES = 16
+_CHUNK = 256 * 1024
+
+
+class _FileSlice:
+    """
+    A file object limited to `length` bytes from its current offset. Servers
+    with a sendfile-capable `wsgi.file_wrapper` (gunicorn, for example) send
+    from `fileno()` at the current offset up to Content-Length without
+    copying through Python; other servers call `read`, which stops at the
+    slice end.
+    """
+
+    def __init__(self, fileobj: BinaryIO, start: int, length: int):
+        fileobj.seek(start)
+        self._file = fileobj
+        self._remaining = length
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        size = self._remaining if size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _satisfiable_ranges(size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    [(start, stop)] for the request's byte ranges, None to send the whole
+    file, or [] when no range overlaps the file (416).
+    """
+    header = request.range
+    if header is None or header.units != "bytes" or len(header.ranges) > MAX_RANGES:
+        return None
+    ranges = []
+    for start, stop in header.ranges:
+        if start < 0:  # suffix range: the last -start bytes
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges
+
+
+def _if_range_matches(etag: str, last_modified: datetime) -> bool:
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    if if_range.date:
+        return if_range.date == last_modified
+    return True
+
+
+def _part_header(boundary: str, content_type: str, start: int, stop: int, size: int) -> bytes:
+    return (
+        f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\n"
+        f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n"
+    ).encode("latin-1")
+
+
+def _multipart(path: str, ranges: List[Tuple[int, int]], size: int, content_type: str, boundary: str) -> Iterator[bytes]:
+    with open(path, "rb") as fileobj:
+        for start, stop in ranges:
+            yield _part_header(boundary, content_type, start, stop, size)
+            fileobj.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                data = fileobj.read(min(_CHUNK, remaining))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+        yield _closing_delimiter(boundary)
+
+
+def _closing_delimiter(boundary: str) -> bytes:
+    return f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+
+@media_bp.route("/media/<path:object_key>")
+def serve_media(object_key: str):
+    """
+    Serve an object of the local storage backend through a signed URL, with
+    conditional requests, single and multiple byte ranges, and If-Range.
+    """
+    backend = storage_backend()
+    if not isinstance(backend, LocalBackend):
+        abort(404)
+    expires = request.args.get("expires", "")
+    if not expires.isdigit() or not backend.verify(object_key, int(expires), request.args.get("signature", "")):
+        abort(403)
+    path = backend.path(object_key)
+    try:
+        stat = os.stat(path) if path else None
+    except OSError:
+        stat = None
+    if stat is None or not os.path.isfile(path):
+        abort(404)
+
+    size = stat.st_size
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    etag = f"{stat.st_mtime_ns:x}-{size:x}"
+    content_type = mimetypes.guess_type(object_key)[0] or "application/octet-stream"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": quote_etag(etag),
+        "Last-Modified": http_date(last_modified),
+        # The URL expires, so shared caches must not hand it to other users.
+        "Cache-Control": f"private, max-age={max(int(expires) - int(time.time()), 0)}",
+    }
+
+    if request.if_none_match.contains(etag) or (
+        not request.if_none_match and request.if_modified_since and request.if_modified_since >= last_modified
+    ):
+        return Response(status=304, headers=headers)
+
+    ranges = _satisfiable_ranges(size)
+    if ranges is not None and not _if_range_matches(etag, last_modified):
+        ranges = None
+
+    if ranges == []:
+        return Response(status=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if ranges is None or len(ranges) == 1:
+        start, stop = ranges[0] if ranges else (0, size)
+        body = wrap_file(request.environ, _FileSlice(open(path, "rb"), start, stop - start), _CHUNK)
+        response = Response(
+            body, status=206 if ranges else 200, mimetype=content_type, headers=headers, direct_passthrough=True
+        )
+        response.content_length = stop - start
+        if ranges:
+            response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+        return response
+
+    # Several ranges: multipart/byteranges, copied in chunks (no sendfile for these).
+    boundary = secrets.token_hex(16)
+    length = len(_closing_delimiter(boundary)) + sum(
+        len(_part_header(boundary, content_type, start, stop, size)) + stop - start for start, stop in ranges
+    )
+    response = Response(
+        _multipart(str(path), ranges, size, content_type, boundary),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+        direct_passthrough=True,
+    )
+    response.content_length = length
+    return response
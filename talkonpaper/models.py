@@ -7,7 +7,24 @@ from flask_login import UserMixin
 from sqlalchemy import Enum, UniqueConstraint, func
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from .extensions import db, login_manager
+from .extensions import db
+
+
+# Reference formats accepted without contacting a registry.
+DOI_RE = re.compile(r"^10\.\d{4,9}/[-._;()/:A-Z0-9]+$", re.IGNORECASE)
+URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+
+VERIFICATION_STATUSES = ("pending", "verified", "needs_review")
+
+
+SLUG_MAX_LENGTH = 200
+# Characters of transcript the talk page shows; stored so the page never loads the full text.
+TRANSCRIPT_EXCERPT_LENGTH = 800
+
+
+def slugify(title: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+    return slug[: SLUG_MAX_LENGTH - 10].rstrip("-") or "talk"
 
 
 class TimestampMixin:
@@ -60,12 +77,21 @@ class Speaker(TimestampMixin, db.Model):
     country = db.Column(db.String(100), nullable=True, index=True)
     bio_short = db.Column(db.Text, nullable=True)
     website_or_profile = db.Column(db.String(255), nullable=True)
+    photo_object_key = db.Column(db.String(255), nullable=True)
+    # Bumped by images.py whenever the photo key changes; part of the variant URLs.
+    photo_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     talks = db.relationship("Talk", back_populates="speaker", lazy="selectin")
 
 
 class Paper(TimestampMixin, db.Model):
     __tablename__ = "papers"
+    __table_args__ = (
+        db.Index("ix_papers_year_id", "publication_year", "id"),
+        db.Index("ix_papers_created_id", "created_at", "id"),
+        # Serves "verified only" listings in the archive's keyset order.
+        db.Index("ix_papers_verification_year_id", "verification_status", "publication_year", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False, index=True)
@@ -77,24 +103,29 @@ class Paper(TimestampMixin, db.Model):
     language_original = db.Column(db.String(50), nullable=False, default="en")
     keywords = db.Column(db.String(255), nullable=True)
     pdf_object_key = db.Column(db.String(255), nullable=True)
+    # Maintained by verification.py: set from the reference format on write,
+    # then confirmed or rejected by `flask verify-papers` through a resolver.
+    verification_status = db.Column(
+        Enum(*VERIFICATION_STATUSES, name="verification_statuses"),
+        nullable=False,
+        default="pending",
+    )
+    verification_method = db.Column(db.String(50), nullable=True)
+    verified_at = db.Column(db.DateTime, nullable=True)
 
     talk = db.relationship(
         "Talk", back_populates="paper", uselist=False, cascade="all, delete-orphan"
     )
 
     def verified_reference(self) -> bool:
-        """
-        Minimal DOI/URL gate: ensure a DOI-like string or valid URL exists.
-        """
-        doi_like = re.compile(r"^10\\.\\d{4,9}/[-._;()/:A-Z0-9]+$", re.IGNORECASE)
-        url_like = re.compile(r"^https?://")
-        return bool(doi_like.match(self.doi_or_url) or url_like.match(self.doi_or_url))
+        return self.verification_status == "verified"
 
 
 class Talk(TimestampMixin, db.Model):
     __tablename__ = "talks"
     __table_args__ = (
         UniqueConstraint("paper_id", name="uq_talks_paper"),
+        db.Index("ix_talks_created_id", "created_at", "id"),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -103,6 +134,8 @@ class Talk(TimestampMixin, db.Model):
     speaker_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
 
     title = db.Column(db.String(500), nullable=False, index=True)
+    # Assigned from the title on write by slugs.py; unique across talks.
+    slug = db.Column(db.String(SLUG_MAX_LENGTH), nullable=False, unique=True, index=True)
     summary = db.Column(db.Text, nullable=True)
     duration_seconds = db.Column(db.Integer, nullable=False, default=0)
     talk_date = db.Column(db.Date, nullable=True)
@@ -116,7 +149,12 @@ class Talk(TimestampMixin, db.Model):
     preview_video_key = db.Column(db.String(255), nullable=True)
     audio_object_key = db.Column(db.String(255), nullable=True)
     thumbnail_object_key = db.Column(db.String(255), nullable=True)
-    transcript_text = db.Column(db.Text, nullable=True)
+    # Bumped by images.py whenever the thumbnail key changes; part of the variant URLs.
+    thumbnail_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Plain text for search; deferred because it can run to hundreds of KB.
+    # Timings live in TranscriptSegment, both maintained by transcripts.py.
+    transcript_text = db.deferred(db.Column(db.Text, nullable=True))
+    transcript_excerpt = db.Column(db.String(TRANSCRIPT_EXCERPT_LENGTH + 1), nullable=True)
 
     paper = db.relationship("Paper", back_populates="talk", lazy="joined")
     speaker = db.relationship("Speaker", back_populates="talks", lazy="joined")
@@ -126,11 +164,105 @@ class Talk(TimestampMixin, db.Model):
     def duration_minutes(self) -> int:
         return int(self.duration_seconds / 60) if self.duration_seconds else 0
 
-    @property
-    def slug(self) -> str:
-        return re.sub(r"[^a-z0-9]+", "-", self.title.lower()).strip("-")
 
+class TranscriptSegment(db.Model):
+    """One caption cue of a talk's transcript, in milliseconds from the start."""
+
+    __tablename__ = "transcript_segments"
+    __table_args__ = (db.Index("ix_transcript_segments_talk_start", "talk_id", "start_ms", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    talk_id = db.Column(db.Integer, db.ForeignKey("talks.id", ondelete="CASCADE"), nullable=False)
+    start_ms = db.Column(db.Integer, nullable=False)
+    end_ms = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+
+class TalkSlugRedirect(db.Model):
+    """A slug a talk used to have, kept so old links can 301 to the new one."""
+
+    __tablename__ = "talk_slug_redirects"
+
+    slug = db.Column(db.String(SLUG_MAX_LENGTH), primary_key=True)
+    talk_id = db.Column(db.Integer, db.ForeignKey("talks.id", ondelete="CASCADE"), nullable=False, index=True)
+
+
+class MediaUpload(TimestampMixin, db.Model):
+    """
+    A resumable upload streamed into a multipart upload of the storage
+    backend. `offset` only advances once the parts below it are stored, so
+    it is always a safe place for the client to resume from.
+    """
+
+    __tablename__ = "media_uploads"
+
+    id = db.Column(db.String(32), primary_key=True)
+    object_key = db.Column(db.String(255), nullable=False, unique=True)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False, default=0)
+    part_size = db.Column(db.Integer, nullable=False)
+    backend_upload_id = db.Column(db.String(1024), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="uploading")  # uploading | completed | aborted
+    # One PATCH at a time per upload; a crashed request's lock lapses.
+    locked_until = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+
+class MediaUploadPart(db.Model):
+    __tablename__ = "media_upload_parts"
+
+    upload_id = db.Column(db.String(32), db.ForeignKey("media_uploads.id", ondelete="CASCADE"), primary_key=True)
+    part_number = db.Column(db.Integer, primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    etag = db.Column(db.String(255), nullable=False)
+
+
+CONTACT_STATUSES = ("queued", "processing", "done", "failed")
+
+
+class ContactSubmission(db.Model):
+    """A contact-form message waiting for (or done with) the `contact.py` worker."""
+
+    __tablename__ = "contact_submissions"
+    __table_args__ = (db.Index("ix_contact_submissions_status_id", "status", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    remote_addr = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    claimed_at = db.Column(db.DateTime)
+    processed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+
+class SiteStat(db.Model):
+    """
+    Denormalized counter maintained by `stats.py`; `bucket` is "" for plain
+    totals and the grouping value (access level, year, country...) otherwise.
+    """
+
+    __tablename__ = "site_stats"
+
+    name = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.String(100), primary_key=True, default="")
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class PageCacheGeneration(db.Model):
+    """
+    Shared page-cache invalidation state maintained by `caching.py`: the
+    stamp of the last write that touched `tag`, or the counter those stamps
+    are drawn from.
+    """
+
+    __tablename__ = "page_cache_generations"
 
-@login_manager.user_loader
-def load_user(user_id: str):
-    return User.query.get(int(user_id))
+    tag = db.Column(db.String(120), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination token cannot be decoded."""
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    per_page: int = 0
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        try:
+            if "dt" in value:
+                return datetime.fromisoformat(value["dt"])
+            if "d" in value:
+                return date.fromisoformat(value["d"])
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursor(str(exc)) from exc
+        raise InvalidCursor("unknown cursor value type")
+    if isinstance(value, list):
+        raise InvalidCursor("unknown cursor value type")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Serialize the sort key of a row into an opaque, URL-safe token.
+    """
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, width: int) -> List[Any]:
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+    if not isinstance(values, list) or len(values) != width:
+        raise InvalidCursor("cursor width mismatch")
+    return [_decode_value(v) for v in values]
+
+
+def _seek(columns: Sequence[Any], values: Sequence[Any], forward: bool):
+    """
+    Build `(c1, c2, ...) < (v1, v2, ...)` (or `>`) with plain AND/OR so it
+    works on every backend and stays index-friendly on SQLite.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if forward else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def page_size(default_key: str = "ARCHIVE_PAGE_SIZE") -> int:
+    """
+    Resolve the page size from `?per_page=`, clamped to the configured max.
+    """
+    cfg = current_app.config
+    default = int(cfg.get(default_key, 24))
+    upper = int(cfg.get("ARCHIVE_MAX_PAGE_SIZE", 100))
+    raw = request.args.get("per_page", "")
+    size = int(raw) if raw.isdigit() else default
+    return max(1, min(size, upper))
+
+
+def keyset_paginate(
+    query,
+    columns: Sequence[Any],
+    per_page: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> KeysetPage:
+    """
+    Seek-based pagination over `columns`, all ordered descending.
+
+    `after` continues towards older rows, `before` walks back towards newer
+    ones. Each page costs one indexed range scan of `per_page + 1` rows no
+    matter how deep the cursor is.
+    """
+    width = len(columns)
+    backwards = bool(before) and not after
+
+    if after:
+        query = query.filter(_seek(columns, decode_cursor(after, width), forward=True))
+    elif before:
+        query = query.filter(_seek(columns, decode_cursor(before, width), forward=False))
+
+    ordering = [c.asc() if backwards else c.desc() for c in columns]
+    rows = query.order_by(None).order_by(*ordering).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row) -> List[Any]:
+        return [getattr(row, c.key) for c in columns]
+
+    page = KeysetPage(items=rows, per_page=per_page)
+    if not rows:
+        return page
+
+    if backwards:
+        # We arrived from an older page, so there is always a "next" one.
+        page.next_cursor = encode_cursor(key_of(rows[-1]))
+        page.prev_cursor = encode_cursor(key_of(rows[0])) if has_more else None
+    else:
+        page.next_cursor = encode_cursor(key_of(rows[-1])) if has_more else None
+        page.prev_cursor = encode_cursor(key_of(rows[0])) if after else None
+    return page
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Flask, request
+from flask_login import current_user
+from werkzeug.exceptions import TooManyRequests
+
+logger = logging.getLogger(__name__)
+
+# Which requests of a limited endpoint actually count: the GET forms are
+# cheap, the POSTs hash passwords or write files, and only searches scan.
+# Endpoints with a rule but no entry here count every request.
+_COUNTED: Dict[str, Callable[[], bool]] = {
+    "auth.login": lambda: request.method == "POST",
+    "auth.register": lambda: request.method == "POST",
+    "main.contact": lambda: request.method == "POST",
+    "main.talks_archive": lambda: bool(request.args.get("q")),
+}
+
+
+class MemoryBuckets:
+    """Token buckets held in this process; fine for a single worker."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, period: float, now: float) -> Tuple[bool, float]:
+        """Spend one token; returns (allowed, seconds until a token is available)."""
+        rate = capacity / period
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # Without period information per key, drop the stalest half.
+        stale = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _ in stale[: len(stale) // 2]:
+            del self._buckets[key]
+
+
+class SQLiteBuckets:
+    """
+    Token buckets in a small SQLite file shared by every worker on the host.
+    Each decision is a single UPSERT ... RETURNING statement.
+    """
+
+    _DDL = (
+        "CREATE TABLE IF NOT EXISTS buckets ("
+        " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL"
+        ") WITHOUT ROWID"
+    )
+    # SET expressions see the old row, so `allowed` and `tokens` agree.
+    _TAKE = """
+        INSERT INTO buckets (key, tokens, updated, allowed) VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT(key) DO UPDATE SET
+            allowed = min(:capacity, tokens + (:now - updated) * :rate) >= 1,
+            tokens = min(:capacity, tokens + (:now - updated) * :rate)
+                     - (min(:capacity, tokens + (:now - updated) * :rate) >= 1),
+            updated = :now
+        RETURNING allowed, tokens
+    """
+
+    # Every this many decisions, drop buckets idle for a day.
+    _PURGE_EVERY = 1000
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(self._DDL)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=1, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def take(self, key: str, capacity: int, period: float, now: float) -> Tuple[bool, float]:
+        rate = capacity / period
+        conn = self._conn()
+        allowed, tokens = conn.execute(
+            self._TAKE, {"key": key, "capacity": float(capacity), "now": now, "rate": rate}
+        ).fetchone()
+        self._calls += 1
+        if self._calls % self._PURGE_EVERY == 0:
+            conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 86400,))
+        return bool(allowed), 0.0 if allowed else (1 - tokens) / rate
+
+
+def _account_key() -> Optional[str]:
+    email = request.form.get("email", "").strip().lower()
+    if email:
+        return email
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    return None
+
+
+def _check(store, key: str, rule: Tuple[int, float], now: float) -> Optional[float]:
+    capacity, period = rule
+    try:
+        allowed, wait = store.take(key, capacity, period, now)
+    except sqlite3.Error as exc:
+        # A broken limiter store must not take the site down with it.
+        logger.warning("Rate limiter store unavailable: %s", exc)
+        return None
+    return None if allowed else wait
+
+
+def init_rate_limits(app: Flask) -> None:
+    """
+    Throttle CPU-expensive endpoints with token buckets per client IP and
+    per account (submitted email, else the logged-in user). Rules map an
+    endpoint to (requests, seconds); a request over either limit gets 429
+    with Retry-After. `_COUNTED` narrows which requests of an endpoint count.
+    """
+    if not app.config.get("RATELIMIT_ENABLED", True):
+        return
+    ip_rules: Dict[str, Tuple[int, float]] = app.config.get("RATELIMIT_IP_RULES", {})
+    account_rules: Dict[str, Tuple[int, float]] = app.config.get("RATELIMIT_ACCOUNT_RULES", {})
+    if app.config.get("RATELIMIT_STORAGE", "memory") == "sqlite":
+        store = SQLiteBuckets(Path(app.config.get("RATELIMIT_SQLITE_PATH") or Path(app.instance_path) / "ratelimit.db"))
+    else:
+        store = MemoryBuckets()
+    app.extensions["talkonpaper.ratelimit"] = store
+
+    @app.before_request
+    def _throttle():
+        endpoint = request.endpoint
+        if endpoint not in ip_rules and endpoint not in account_rules:
+            return None
+        counted = _COUNTED.get(endpoint)
+        if counted is not None and not counted():
+            return None
+        now = time.time()
+        waits = []
+        if endpoint in ip_rules:
+            waits.append(_check(store, f"ip:{endpoint}:{request.remote_addr}", ip_rules[endpoint], now))
+        if endpoint in account_rules:
+            account = _account_key()
+            if account:
+                waits.append(_check(store, f"acct:{endpoint}:{account}", account_rules[endpoint], now))
+        waits = [wait for wait in waits if wait is not None]
+        if waits:
+            retry_after = max(1, math.ceil(max(waits)))
+            logger.info("Rate limited %s for %s (retry in %ss)", endpoint, request.remote_addr, retry_after)
+            raise TooManyRequests(retry_after=retry_after)
+        return None
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from markupsafe import Markup, escape
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.exc import OperationalError
+
+from .extensions import db
+from .models import Paper, Talk
+
+logger = logging.getLogger(__name__)
+
+# Engines (by URL) that have the FTS5 tables installed; mapper events only
+# write to the index for these so non-SQLite databases are left untouched.
+_indexed_engines: set = set()
+
+_HIGHLIGHT_OPEN = "\x02"
+_HIGHLIGHT_CLOSE = "\x03"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_IDS = bindparam("ids", expanding=True)
+
+_TALK_COLUMNS = ("title", "summary", "transcript_text")
+_PAPER_COLUMNS = ("title", "abstract", "authors", "keywords")
+
+_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS talks_fts USING fts5(
+        title, summary, transcript_text,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+        title, abstract, authors, keywords,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+)
+
+# Lower bm25 is better; weights favour titles over long transcript bodies.
+# Ranking runs over every match, snippets only for the rows that survive LIMIT.
+_RANK_SQL = """
+    SELECT talk_id, MIN(score) AS score FROM (
+        SELECT rowid AS talk_id, bm25(talks_fts, 10.0, 4.0, 1.0) AS score
+        FROM talks_fts WHERE talks_fts MATCH :q
+        UNION ALL
+        SELECT t.id AS talk_id, bm25(papers_fts, 6.0, 3.0, 2.0, 2.0) AS score
+        FROM papers_fts JOIN talks t ON t.paper_id = papers_fts.rowid
+        WHERE papers_fts MATCH :q
+    )
+    GROUP BY talk_id
+    ORDER BY score
+    LIMIT :limit
+"""
+
+_TALK_SNIPPET_SQL = f"""
+    SELECT rowid AS talk_id,
+           snippet(talks_fts, -1, '{_HIGHLIGHT_OPEN}', '{_HIGHLIGHT_CLOSE}', '…', 16) AS snip
+    FROM talks_fts WHERE talks_fts MATCH :q AND rowid IN ({{ids}})
+"""
+
+_PAPER_SNIPPET_SQL = f"""
+    SELECT t.id AS talk_id,
+           snippet(papers_fts, -1, '{_HIGHLIGHT_OPEN}', '{_HIGHLIGHT_CLOSE}', '…', 16) AS snip
+    FROM papers_fts JOIN talks t ON t.paper_id = papers_fts.rowid
+    WHERE papers_fts MATCH :q AND t.id IN ({{ids}})
+"""
+
+
+def _engine_key(bind) -> str:
+    return str(bind.engine.url)
+
+
+def fts_available() -> bool:
+    return _engine_key(db.engine) in _indexed_engines
+
+
+def ensure_search_index(app) -> None:
+    """
+    Create the FTS5 tables on SQLite and backfill them when first created.
+    Other backends keep using the ilike fallback in `main.talks_archive`.
+    """
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+
+    with app.app_context():
+        engine = db.engine
+        try:
+            with engine.begin() as conn:
+                existed = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = 'talks_fts'")
+                ).first()
+                for ddl in _DDL:
+                    conn.execute(text(ddl))
+                if not existed:
+                    _rebuild(conn)
+        except OperationalError as exc:
+            logger.warning("FTS5 unavailable, falling back to LIKE search: %s", exc)
+            return
+        _indexed_engines.add(_engine_key(engine))
+
+
+_FILL_TALKS = (
+    "INSERT INTO talks_fts(rowid, title, summary, transcript_text) "
+    "SELECT id, title, coalesce(summary, ''), coalesce(transcript_text, '') FROM talks"
+)
+_FILL_PAPERS = (
+    "INSERT INTO papers_fts(rowid, title, abstract, authors, keywords) "
+    "SELECT id, title, abstract, authors, coalesce(keywords, '') FROM papers"
+)
+
+
+def _rebuild(conn) -> None:
+    conn.execute(text("DELETE FROM talks_fts"))
+    conn.execute(text("DELETE FROM papers_fts"))
+    conn.execute(text(_FILL_TALKS))
+    conn.execute(text(_FILL_PAPERS))
+
+
+def _upsert(conn, table: str, columns: Tuple[str, ...], target) -> None:
+    conn.execute(text(f"DELETE FROM {table} WHERE rowid = :id"), {"id": target.id})
+    params = {c: getattr(target, c) or "" for c in columns}
+    params["id"] = target.id
+    cols = ", ".join(columns)
+    binds = ", ".join(f":{c}" for c in columns)
+    conn.execute(text(f"INSERT INTO {table}(rowid, {cols}) VALUES (:id, {binds})"), params)
+
+
+def _delete(conn, table: str, target) -> None:
+    conn.execute(text(f"DELETE FROM {table} WHERE rowid = :id"), {"id": target.id})
+
+
+def _listen(model, table: str, columns: Tuple[str, ...]) -> None:
+    def on_write(_mapper, connection, target):
+        if _engine_key(connection) in _indexed_engines:
+            _upsert(connection, table, columns, target)
+
+    def on_delete(_mapper, connection, target):
+        if _engine_key(connection) in _indexed_engines:
+            _delete(connection, table, target)
+
+    event.listen(model, "after_insert", on_write)
+    event.listen(model, "after_update", on_write)
+    event.listen(model, "after_delete", on_delete)
+
+
+_listen(Talk, "talks_fts", _TALK_COLUMNS)
+_listen(Paper, "papers_fts", _PAPER_COLUMNS)
+
+
+def build_match_query(raw: str) -> Optional[str]:
+    """
+    Turn free-form user input into a safe FTS5 expression: every word is
+    quoted (no operator injection) and prefix-matched, all terms required.
+    """
+    tokens = _TOKEN_RE.findall(raw or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens[:12])
+
+
+def highlight(snippet: str) -> Markup:
+    escaped = str(escape(snippet or ""))
+    return Markup(
+        escaped.replace(_HIGHLIGHT_OPEN, "<mark>").replace(_HIGHLIGHT_CLOSE, "</mark>")
+    )
+
+
+def search_talks(raw: str, limit: Optional[int] = None) -> Tuple[List[Talk], Dict[int, Markup]]:
+    """
+    BM25-ranked talk search across talk and paper text.
+    Returns talks in rank order plus highlighted snippets keyed by talk id.
+    """
+    match = build_match_query(raw)
+    if not match:
+        return [], {}
+
+    limit = limit or current_app.config.get("SEARCH_RESULT_LIMIT", 50)
+    ranked = db.session.execute(text(_RANK_SQL), {"q": match, "limit": limit}).all()
+    if not ranked:
+        return [], {}
+
+    order = {row.talk_id: i for i, row in enumerate(ranked)}
+    ids = ", ".join(str(int(talk_id)) for talk_id in order)
+    snippets: Dict[int, Markup] = {}
+    for row in db.session.execute(text(_TALK_SNIPPET_SQL.format(ids=ids)), {"q": match}):
+        snippets[row.talk_id] = highlight(row.snip)
+    missing = [talk_id for talk_id in order if talk_id not in snippets]
+    if missing:
+        ids = ", ".join(str(int(talk_id)) for talk_id in missing)
+        for row in db.session.execute(text(_PAPER_SNIPPET_SQL.format(ids=ids)), {"q": match}):
+            snippets.setdefault(row.talk_id, highlight(row.snip))
+
+    talks = Talk.query.filter(Talk.id.in_(order.keys())).all()
+    talks.sort(key=lambda t: order[t.id])
+    return talks, snippets
+
+
+def rebuild_index() -> bool:
+    """
+    Repopulate the FTS tables from scratch, e.g. after Core bulk inserts
+    that bypass the mapper events. Returns False when FTS is not in use.
+    """
+    if not fts_available():
+        return False
+    with db.engine.begin() as conn:
+        _rebuild(conn)
+    return True
+
+
+def reindex_rows(conn, talk_ids: Iterable[int] = (), paper_ids: Iterable[int] = (), batch_size: int = 500) -> None:
+    """
+    Refresh the FTS rows of the given talks and papers from their tables,
+    for Core writes that bypass the mapper events. Runs on `conn`, so the
+    index changes commit or roll back with the rows.
+    """
+    if _engine_key(conn) not in _indexed_engines:
+        return
+    for table, fill, ids in (("talks_fts", _FILL_TALKS, talk_ids), ("papers_fts", _FILL_PAPERS, paper_ids)):
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), batch_size):
+            params = {"ids": ids[start : start + batch_size]}
+            conn.execute(text(f"DELETE FROM {table} WHERE rowid IN :ids").bindparams(_IDS), params)
+            conn.execute(text(f"{fill} WHERE id IN :ids").bindparams(_IDS), params)
+
+
+@click.command("search-reindex")
+@with_appcontext
+def reindex_command() -> None:
+    """Rebuild the FTS5 search tables from talks and papers."""
+    if rebuild_index():
+        click.echo("Search index rebuilt.")
+    else:
+        click.echo("Full-text index is not available for this database.")
@@ -0,0 +1,607 @@
+from __future__ import annotations
+
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert
+
+from .caching import invalidate_all
+from .extensions import db
+from .models import Paper, Speaker, Talk
+from .search import rebuild_index
+from .slugs import allocate_slugs
+from .transcripts import prepare_transcript, write_segments
+from .stats import reconcile_stats
+from .verification import verification_fields
+
+SAMPLE_MEDIA = "https://storage.googleapis.com/gtv-videos-bucket/sample/BigBuckBunny.mp4"
+SAMPLE_THUMB = "https://images.pexels.com/photos/1181675/pexels-photo-1181675.jpeg?auto=compress&cs=tinysrgb&w=1200"
+
+SAMPLE_CATALOG = [
+    {
+        "speaker": {
+            "full_name": "Dr. Amina Patel",
+            "affiliation": "University of Cape Town",
+            "country": "South Africa",
+            "bio_short": "Climate resilience researcher focusing on adaptive water systems.",
+            "website_or_profile": "https://example.org/amina-patel",
+        },
+        "paper": {
+            "title": "Adaptive Water Infrastructure for Semi-Arid Regions",
+            "abstract": "Modular water systems enabling resilience against droughts.",
+            "authors": "Amina Patel, Javier Ruiz",
+            "doi_or_url": "10.1234/adapt-water.2025",
+            "journal_or_publisher": "Journal of Climate Adaptation",
+            "publication_year": 2025,
+            "language_original": "en",
+            "keywords": "climate,water,infrastructure",
+        },
+        "talk": {
+            "title": "Adaptive Water Infrastructure for Semi-Arid Regions",
+            "summary": "Design choices and long-term sustainability outcomes.",
+            "duration_seconds": 780,
+            "talk_date": date(2025, 3, 12),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": SAMPLE_THUMB,
+            "transcript_text": "Transcript placeholder for demonstration.",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Prof. Mei Lin",
+            "affiliation": "Nanyang Technological University",
+            "country": "Singapore",
+            "bio_short": "AI for low-resource languages and speech synthesis.",
+            "website_or_profile": "https://example.org/mei-lin",
+        },
+        "paper": {
+            "title": "Cross-lingual Speech Synthesis with Minimal Pairs",
+            "abstract": "A framework for dubbing academic talks across languages.",
+            "authors": "Mei Lin, Carlos Alvarez",
+            "doi_or_url": "10.2345/speech.2024.77",
+            "journal_or_publisher": "Transactions on Speech Processing",
+            "publication_year": 2024,
+            "language_original": "zh",
+            "keywords": "speech,ai,dubbing",
+        },
+        "talk": {
+            "title": "Cross-lingual Speech Synthesis for Researchers",
+            "summary": "How to retain speaker intent when dubbing to English.",
+            "duration_seconds": 640,
+            "talk_date": date(2024, 11, 2),
+            "access_level": "academic_premium",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181316/pexels-photo-1181316.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "We describe a cross-lingual pipeline...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Dr. Javier Ruiz",
+            "affiliation": "Universidad de los Andes",
+            "country": "Colombia",
+            "bio_short": "Hydrology and climate adaptation in Latin America.",
+            "website_or_profile": "https://example.org/javier-ruiz",
+        },
+        "paper": {
+            "title": "River Basin Modeling Under Rapid Urbanization",
+            "abstract": "Simulation of flood risks in growing cities.",
+            "authors": "Javier Ruiz, Ana Gómez",
+            "doi_or_url": "10.5678/river.2023.44",
+            "journal_or_publisher": "Urban Hydrology",
+            "publication_year": 2023,
+            "language_original": "es",
+            "keywords": "hydrology,urban,flood",
+        },
+        "talk": {
+            "title": "Protecting River Basins Amid Urban Growth",
+            "summary": "Modeling flood risks and mitigation strategies.",
+            "duration_seconds": 910,
+            "talk_date": date(2024, 2, 14),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181243/pexels-photo-1181243.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "We analyze river basin pressures...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Dr. Laila Haddad",
+            "affiliation": "American University of Beirut",
+            "country": "Lebanon",
+            "bio_short": "Public health policy for displaced communities.",
+            "website_or_profile": "https://example.org/laila-haddad",
+        },
+        "paper": {
+            "title": "Telehealth Protocols for Refugee Health Networks",
+            "abstract": "Operational playbook for cross-border telehealth delivery.",
+            "authors": "Laila Haddad, Omar Darwish",
+            "doi_or_url": "10.7890/telehealth.2024",
+            "journal_or_publisher": "Global Public Health",
+            "publication_year": 2024,
+            "language_original": "ar",
+            "keywords": "health,telemedicine,refugee",
+        },
+        "talk": {
+            "title": "Telehealth for Displaced Communities",
+            "summary": "Protocol design, data stewardship, and clinician training.",
+            "duration_seconds": 720,
+            "talk_date": date(2024, 9, 1),
+            "access_level": "registered",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181449/pexels-photo-1181449.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Telehealth playbook overview...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Prof. Adeola Ogun",
+            "affiliation": "University of Lagos",
+            "country": "Nigeria",
+            "bio_short": "Solar microgrids and community energy finance.",
+            "website_or_profile": "https://example.org/adeola-ogun",
+        },
+        "paper": {
+            "title": "Financing Solar Microgrids for Rural Clinics",
+            "abstract": "Economic model for resilient clinic power.",
+            "authors": "Adeola Ogun, Fatima Bello",
+            "doi_or_url": "10.4455/microgrid.2022",
+            "journal_or_publisher": "Energy Policy Letters",
+            "publication_year": 2022,
+            "language_original": "en",
+            "keywords": "energy,finance,health",
+        },
+        "talk": {
+            "title": "Solar Microgrids That Keep Clinics Online",
+            "summary": "Financing, reliability, and maintenance insights.",
+            "duration_seconds": 840,
+            "talk_date": date(2023, 11, 5),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181467/pexels-photo-1181467.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Community energy financing models...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Dr. Sofia Mendes",
+            "affiliation": "University of São Paulo",
+            "country": "Brazil",
+            "bio_short": "Marine conservation and reef restoration.",
+            "website_or_profile": "https://example.org/sofia-mendes",
+        },
+        "paper": {
+            "title": "AI-Assisted Coral Reef Monitoring",
+            "abstract": "Using computer vision to track reef recovery.",
+            "authors": "Sofia Mendes, Thiago Costa",
+            "doi_or_url": "10.9134/coral.2025",
+            "journal_or_publisher": "Marine Ecology Reports",
+            "publication_year": 2025,
+            "language_original": "pt",
+            "keywords": "coral,ai,conservation",
+        },
+        "talk": {
+            "title": "AI for Coral Reef Restoration",
+            "summary": "How remote sensing accelerates conservation.",
+            "duration_seconds": 690,
+            "talk_date": date(2025, 4, 22),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181459/pexels-photo-1181459.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Reef monitoring pipeline...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Prof. Elena Kovač",
+            "affiliation": "University of Zagreb",
+            "country": "Croatia",
+            "bio_short": "Climate modeling and policy impact assessment.",
+            "website_or_profile": "https://example.org/elena-kovac",
+        },
+        "paper": {
+            "title": "Climate Models and European Policy Implications",
+            "abstract": "Analysis of climate projection uncertainty and policy decisions.",
+            "authors": "Elena Kovač, Martin Schneider",
+            "doi_or_url": "10.3456/climate-policy.2024",
+            "journal_or_publisher": "Environmental Science & Policy",
+            "publication_year": 2024,
+            "language_original": "en",
+            "keywords": "climate,policy,europe",
+        },
+        "talk": {
+            "title": "Climate Models and Policy Implications",
+            "summary": "Understanding projection uncertainty in climate policy.",
+            "duration_seconds": 820,
+            "talk_date": date(2024, 10, 15),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181695/pexels-photo-1181695.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Climate policy requires robust models...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Dr. Rajesh Kumar",
+            "affiliation": "All India Institute of Medical Sciences",
+            "country": "India",
+            "bio_short": "mRNA vaccine development and immunology.",
+            "website_or_profile": "https://example.org/rajesh-kumar",
+        },
+        "paper": {
+            "title": "mRNA Vaccine Development: From Lab to Clinic",
+            "abstract": "Comprehensive review of mRNA vaccine technology and clinical trials.",
+            "authors": "Rajesh Kumar, Sarah Chen, Ahmed Hassan",
+            "doi_or_url": "10.5567/mrna-vaccines.2024",
+            "journal_or_publisher": "Nature Medicine",
+            "publication_year": 2024,
+            "language_original": "en",
+            "keywords": "vaccines,mrna,immunology",
+        },
+        "talk": {
+            "title": "mRNA Vaccine Development: From Lab to Clinic",
+            "summary": "The science behind mRNA vaccines and their rapid deployment.",
+            "duration_seconds": 950,
+            "talk_date": date(2024, 8, 20),
+            "access_level": "registered",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181690/pexels-photo-1181690.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "mRNA technology represents a paradigm shift...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Dr. Yuki Tanaka",
+            "affiliation": "Tokyo Institute of Technology",
+            "country": "Japan",
+            "bio_short": "Neural architecture search and low-resource NLP.",
+            "website_or_profile": "https://example.org/yuki-tanaka",
+        },
+        "paper": {
+            "title": "Neural Architecture Search for Low-Resource Languages",
+            "abstract": "Automated model design for under-resourced language processing.",
+            "authors": "Yuki Tanaka, Maria Gonzalez",
+            "doi_or_url": "10.7788/nas-lowres.2025",
+            "journal_or_publisher": "Computational Linguistics",
+            "publication_year": 2025,
+            "language_original": "ja",
+            "keywords": "nlp,neural-architecture,low-resource",
+        },
+        "talk": {
+            "title": "Neural Architecture Search for Low-Resource Languages",
+            "summary": "Democratizing NLP for languages with limited training data.",
+            "duration_seconds": 880,
+            "talk_date": date(2025, 1, 10),
+            "access_level": "academic_premium",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181671/pexels-photo-1181671.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Neural architecture search enables efficient model discovery...",
+        },
+    },
+    {
+        "speaker": {
+            "full_name": "Prof. Kwame Mensah",
+            "affiliation": "University of Ghana",
+            "country": "Ghana",
+            "bio_short": "Digital pedagogy and post-pandemic education.",
+            "website_or_profile": "https://example.org/kwame-mensah",
+        },
+        "paper": {
+            "title": "Digital Pedagogy in Post-Pandemic Academia",
+            "abstract": "Lessons learned from emergency remote teaching and hybrid models.",
+            "authors": "Kwame Mensah, Lisa Anderson",
+            "doi_or_url": "10.6789/digital-pedagogy.2024",
+            "journal_or_publisher": "Higher Education Research",
+            "publication_year": 2024,
+            "language_original": "en",
+            "keywords": "education,pedagogy,digital",
+        },
+        "talk": {
+            "title": "Digital Pedagogy in Post-Pandemic Academia",
+            "summary": "Effective strategies for hybrid and online teaching.",
+            "duration_seconds": 750,
+            "talk_date": date(2024, 6, 5),
+            "access_level": "public",
+            "is_dubbed": True,
+            "video_object_key": SAMPLE_MEDIA,
+            "preview_video_key": SAMPLE_MEDIA,
+            "audio_object_key": SAMPLE_MEDIA,
+            "thumbnail_object_key": "https://images.pexels.com/photos/1181406/pexels-photo-1181406.jpeg?auto=compress&cs=tinysrgb&w=1200",
+            "transcript_text": "Post-pandemic education requires new pedagogical approaches...",
+        },
+    },
+]
+
+_WORDS = (
+    "adaptive climate model urban river basin flood policy health network "
+    "protocol energy solar grid finance clinic coral reef monitoring vision "
+    "speech synthesis language dubbing corpus neural architecture search "
+    "vaccine immune response trial cohort pedagogy hybrid learning outcome "
+    "infrastructure resilience drought sensor survey regression estimate "
+    "sample variance bias uncertainty projection scenario impact community"
+).split()
+_COUNTRIES = (
+    "South Africa", "Singapore", "Colombia", "Lebanon", "Nigeria", "Brazil",
+    "Croatia", "India", "Japan", "Ghana", "Kenya", "Indonesia", "Turkey", "Peru",
+)
+_LANGUAGES = ("en", "es", "pt", "ar", "zh", "ja", "tr", "fr")
+_ACCESS_LEVELS = ("public", "public", "registered", "academic_premium")
+
+
+def _next_id(model) -> int:
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def bulk_insert(model, rows: List[Dict]) -> None:
+    """One Core INSERT executed as executemany; bypasses ORM unit-of-work."""
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+def _prepare_transcripts(talks: List[Dict]) -> Dict[int, List]:
+    """Fill in plain text and excerpts in place; returns segments by talk id."""
+    segments = {}
+    for talk in talks:
+        text, short, talk_segments = prepare_transcript(talk.get("transcript_text"), talk["duration_seconds"])
+        talk["transcript_text"], talk["transcript_excerpt"] = text, short
+        segments[talk["id"]] = talk_segments
+    return segments
+
+
+def finish_bulk_load() -> None:
+    # Core inserts skip the mapper events that maintain derived state.
+    rebuild_index()
+    reconcile_stats()
+    invalidate_all()
+
+
+def seed_sample_data() -> int:
+    """
+    Insert the demo catalog used for local UI previews.
+    Returns the number of talks inserted (0 if the database already has talks).
+    """
+    if db.session.query(Talk.id).first() is not None:
+        return 0
+
+    speaker_id, paper_id, talk_id = _next_id(Speaker), _next_id(Paper), _next_id(Talk)
+    now = datetime.utcnow()
+    speakers, papers, talks = [], [], []
+    for offset, item in enumerate(SAMPLE_CATALOG):
+        # Later entries are "newer" so the archive order matches the list order.
+        stamp = {"created_at": now + timedelta(seconds=offset), "updated_at": now + timedelta(seconds=offset)}
+        speakers.append({"id": speaker_id + offset, **item["speaker"], **stamp})
+        papers.append(
+            {
+                "id": paper_id + offset,
+                **item["paper"],
+                **verification_fields(item["paper"]["doi_or_url"], now),
+                **stamp,
+            }
+        )
+        talks.append(
+            {
+                "id": talk_id + offset,
+                "paper_id": paper_id + offset,
+                "speaker_id": speaker_id + offset,
+                **item["talk"],
+                **stamp,
+            }
+        )
+
+    for talk, slug in zip(talks, allocate_slugs(db.session, [t["title"] for t in talks])):
+        talk["slug"] = slug
+    segments = _prepare_transcripts(talks)
+
+    bulk_insert(Speaker, speakers)
+    bulk_insert(Paper, papers)
+    bulk_insert(Talk, talks)
+    write_segments(db.session.connection(), segments)
+    db.session.commit()
+    finish_bulk_load()
+    return len(talks)
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(_WORDS, k=rng.randint(low, high))).capitalize()
+
+
+def _transcript(rng: random.Random, mean_words: int) -> str:
+    words = max(1, int(rng.gauss(mean_words, mean_words / 3)))
+    chunks: List[str] = []
+    remaining = words
+    while remaining > 0:
+        n = min(remaining, rng.randint(8, 24))
+        chunks.append(_sentence(rng, n, n) + ".")
+        remaining -= n
+    return " ".join(chunks)
+
+
+def _batches(total: int, size: int) -> Iterator[range]:
+    for start in range(0, total, size):
+        yield range(start, min(start + size, total))
+
+
+def generate_synthetic_catalog(
+    talks: int,
+    speakers: Optional[int] = None,
+    extra_papers: int = 0,
+    transcript_words: int = 1500,
+    batch_size: int = 5000,
+    seed: int = 1,
+    progress=None,
+) -> Dict[str, int]:
+    """
+    Append a reproducible synthetic catalog: `talks` talks, each with its own
+    paper (the schema is 1:1), `extra_papers` papers without talks, and
+    `speakers` speakers shared between talks. Rows are streamed in batches
+    and committed per batch so memory stays flat at any scale.
+    """
+    rng = random.Random(seed)
+    speakers = speakers or max(1, talks // 5)
+    total_papers = talks + extra_papers
+
+    speaker_base, paper_base, talk_base = _next_id(Speaker), _next_id(Paper), _next_id(Talk)
+    epoch = datetime.utcnow() - timedelta(days=5 * 365)
+    span_seconds = 5 * 365 * 24 * 3600
+
+    def stamp(index: int, total: int) -> Dict[str, datetime]:
+        moment = epoch + timedelta(seconds=span_seconds * index // max(total, 1))
+        return {"created_at": moment, "updated_at": moment}
+
+    for batch in _batches(speakers, batch_size):
+        bulk_insert(
+            Speaker,
+            [
+                {
+                    "id": speaker_base + i,
+                    "full_name": f"Dr. {_sentence(rng, 2, 2).title()} {speaker_base + i}",
+                    "affiliation": f"University of {_sentence(rng, 1, 2).title()}",
+                    "country": rng.choice(_COUNTRIES),
+                    "bio_short": _sentence(rng, 8, 20) + ".",
+                    "website_or_profile": f"https://example.org/speaker-{speaker_base + i}",
+                    **stamp(i, speakers),
+                }
+                for i in batch
+            ],
+        )
+        db.session.commit()
+        if progress:
+            progress("speakers", batch.stop, speakers)
+
+    for batch in _batches(total_papers, batch_size):
+        bulk_insert(
+            Paper,
+            [
+                {
+                    "id": paper_base + i,
+                    "title": _sentence(rng, 5, 12),
+                    "abstract": " ".join(_sentence(rng, 12, 24) + "." for _ in range(rng.randint(3, 6))),
+                    "authors": ", ".join(_sentence(rng, 2, 2).title() for _ in range(rng.randint(1, 5))),
+                    "doi_or_url": f"10.9999/synthetic.{paper_base + i}",
+                    "journal_or_publisher": f"Journal of {_sentence(rng, 1, 3).title()}",
+                    "publication_year": rng.randint(2000, date.today().year),
+                    "language_original": rng.choice(_LANGUAGES),
+                    "keywords": ",".join(rng.sample(_WORDS, 3)),
+                    **verification_fields(f"10.9999/synthetic.{paper_base + i}"),
+                    **stamp(i, total_papers),
+                }
+                for i in batch
+            ],
+        )
+        db.session.commit()
+        if progress:
+            progress("papers", batch.stop, total_papers)
+
+    for batch in _batches(talks, batch_size):
+        rows = []
+        for i in batch:
+            duration = rng.randint(300, 3600)
+            rows.append(
+                {
+                    "id": talk_base + i,
+                    "paper_id": paper_base + i,
+                    "speaker_id": speaker_base + rng.randrange(speakers),
+                    "title": _sentence(rng, 4, 10),
+                    "summary": _sentence(rng, 10, 25) + ".",
+                    "duration_seconds": duration,
+                    "talk_date": (epoch + timedelta(days=rng.randrange(5 * 365))).date(),
+                    "access_level": rng.choice(_ACCESS_LEVELS),
+                    "is_dubbed": rng.random() < 0.7,
+                    "video_object_key": f"talks/{talk_base + i}/full.mp4",
+                    "preview_video_key": f"talks/{talk_base + i}/preview.mp4",
+                    "audio_object_key": f"talks/{talk_base + i}/audio.mp3",
+                    "thumbnail_object_key": f"talks/{talk_base + i}/thumb.jpg",
+                    "transcript_text": _transcript(rng, transcript_words),
+                    **stamp(i, talks),
+                }
+            )
+        for row, slug in zip(rows, allocate_slugs(db.session, [row["title"] for row in rows])):
+            row["slug"] = slug
+        segments = _prepare_transcripts(rows)
+        bulk_insert(Talk, rows)
+        write_segments(db.session.connection(), segments)
+        db.session.commit()
+        if progress:
+            progress("talks", batch.stop, talks)
+
+    finish_bulk_load()
+    return {"speakers": speakers, "papers": total_papers, "talks": talks}
+
+
+@click.group("seed")
+def seed_cli() -> None:
+    """Load demo or synthetic catalog data."""
+
+
+@seed_cli.command("sample")
+@with_appcontext
+def seed_sample_command() -> None:
+    """Insert the demo catalog if the database has no talks yet."""
+    inserted = seed_sample_data()
+    if inserted:
+        click.echo(f"Inserted {inserted} sample talks.")
+    else:
+        click.echo("Database already has talks; nothing to do.")
+
+
+@seed_cli.command("synthetic")
+@click.option("--talks", type=int, default=10_000, show_default=True)
+@click.option("--speakers", type=int, default=None, help="Defaults to talks / 5.")
+@click.option("--extra-papers", type=int, default=0, show_default=True, help="Papers without a talk.")
+@click.option("--transcript-words", type=int, default=1500, show_default=True, help="Mean transcript length.")
+@click.option("--batch-size", type=int, default=5000, show_default=True)
+@click.option("--seed", "rng_seed", type=int, default=1, show_default=True)
+@with_appcontext
+def seed_synthetic_command(talks, speakers, extra_papers, transcript_words, batch_size, rng_seed) -> None:
+    """Append a synthetic catalog of arbitrary size for load testing."""
+    started = time.perf_counter()
+
+    def progress(table: str, done: int, total: int) -> None:
+        click.echo(f"  {table}: {done}/{total}")
+
+    counts = generate_synthetic_catalog(
+        talks=talks,
+        speakers=speakers,
+        extra_papers=extra_papers,
+        transcript_words=transcript_words,
+        batch_size=batch_size,
+        seed=rng_seed,
+        progress=progress,
+    )
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Inserted {counts['talks']} talks, {counts['papers']} papers and "
+        f"{counts['speakers']} speakers in {elapsed:.1f}s."
+    )
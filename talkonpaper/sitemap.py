@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+import click
+from flask import Blueprint, Flask, abort, current_app, send_from_directory
+from flask.cli import with_appcontext
+from werkzeug.exceptions import ServiceUnavailable
+from sqlalchemy import func, select
+
+from .blog import blog_index
+from .extensions import db
+from .models import Paper, Speaker, Talk
+from .routes import canonical_path
+
+logger = logging.getLogger(__name__)
+
+sitemap_bp = Blueprint("sitemap", __name__)
+
+_EXTENSION_KEY = "talkonpaper.sitemap"
+_MANIFEST = "manifest.json"
+_INDEX = "sitemap.xml"
+_YIELD_PER = 2000
+# Suggested wait for crawlers that arrive before the first build finishes.
+_RETRY_AFTER = 120
+_STATIC_PAGES = ("/", "/talks", "/papers", "/speakers", "/premium", "/about", "/blog/")
+
+_URLSET_OPEN = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+_URLSET_CLOSE = b"</urlset>\n"
+
+
+def _sitemap_dir(app: Flask) -> Path:
+    return Path(app.config.get("SITEMAP_DIR") or Path(app.instance_path) / "sitemaps")
+
+
+def _lastmod(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.replace(microsecond=0).isoformat() + ("" if value.tzinfo else "+00:00")
+
+
+def _url_entry(loc: str, lastmod: Optional[datetime]) -> bytes:
+    stamp = _lastmod(lastmod)
+    tail = f"<lastmod>{stamp}</lastmod>" if stamp else ""
+    return f"<url><loc>{escape(loc)}</loc>{tail}</url>\n".encode("utf-8")
+
+
+# Each table is split into fixed id ranges of SITEMAP_CHUNK_SIZE ids, so a
+# chunk holds at most that many URLs and its membership never shifts when
+# rows elsewhere are inserted or deleted.
+_SOURCES: Dict[str, Tuple[type, Tuple[str, ...], Callable]] = {
+    "talks": (Talk, ("id", "slug", "updated_at"), lambda row: f"/talks/{row.slug}"),
+    "papers": (Paper, ("id", "updated_at"), lambda row: f"/papers/{row.id}"),
+    "speakers": (Speaker, ("id", "updated_at"), lambda row: f"/speakers/{row.id}"),
+}
+
+
+def _chunk_signatures(model, chunk_size: int) -> Dict[int, Dict]:
+    """
+    One grouped aggregate per table: (count, max updated_at, sum of ids)
+    changes whenever a row in the range is inserted, updated or deleted.
+    """
+    bucket = ((model.id - 1) // chunk_size).label("bucket")
+    stmt = (
+        select(bucket, func.count(), func.max(model.updated_at), func.sum(model.id))
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    signatures = {}
+    for number, count, last_updated, id_sum in db.session.execute(stmt):
+        signatures[int(number)] = {
+            "signature": f"{count}:{last_updated.isoformat() if last_updated else ''}:{id_sum}",
+            "lastmod": last_updated,
+        }
+    return signatures
+
+
+def _stream_rows(model, columns: Iterable[str], lo: int, hi: int) -> Iterator:
+    stmt = (
+        select(*(getattr(model, name) for name in columns))
+        .where(model.id.between(lo, hi))
+        .order_by(model.id)
+        .execution_options(yield_per=_YIELD_PER)
+    )
+    yield from db.session.execute(stmt)
+
+
+def _write_chunk(target: Path, entries: Iterable[bytes]) -> int:
+    """Stream `entries` into a gzipped urlset without holding them in memory."""
+    tmp = target.with_name(target.name + ".tmp")
+    count = 0
+    with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as out:
+        out.write(_URLSET_OPEN)
+        for entry in entries:
+            out.write(entry)
+            count += 1
+        out.write(_URLSET_CLOSE)
+    os.replace(tmp, target)
+    return count
+
+
+def _static_entries() -> Tuple[List[bytes], Optional[datetime]]:
+    blog = blog_index()
+    newest_post = blog.posts[0]["date"] if blog.posts else None
+    entries = [_url_entry(canonical_path(path), newest_post if path == "/blog/" else None) for path in _STATIC_PAGES]
+    entries += [_url_entry(canonical_path(f"/blog/{p['slug']}"), p["date"]) for p in blog.posts]
+    return entries, newest_post
+
+
+def build_sitemaps(out_dir: Optional[Path] = None, force: bool = False) -> Dict[str, int]:
+    """
+    Write gzipped sitemap chunks and a sitemap index into `out_dir`.
+
+    Chunks whose id range is unchanged since the last build are kept as is;
+    rows are streamed with a server-side cursor, so memory stays flat no
+    matter how large the catalog is.
+    """
+    app = current_app._get_current_object()
+    out_dir = out_dir or _sitemap_dir(app)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    chunk_size = int(app.config.get("SITEMAP_CHUNK_SIZE", 50000))
+    manifest_path = out_dir / _MANIFEST
+
+    previous: Dict[str, Dict] = {}
+    if manifest_path.exists() and not force:
+        payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if payload.get("chunk_size") == chunk_size and payload.get("host") == canonical_path(""):
+            previous = payload.get("chunks", {})
+
+    chunks: Dict[str, Dict] = {}
+    counts = {"written": 0, "unchanged": 0, "removed": 0, "urls": 0}
+
+    static, newest_post = _static_entries()
+    static_signature = hashlib.sha256(b"".join(static)).hexdigest()
+    name = "sitemap-pages.xml.gz"
+    if previous.get(name, {}).get("signature") != static_signature or not (out_dir / name).exists():
+        _write_chunk(out_dir / name, static)
+        counts["written"] += 1
+    else:
+        counts["unchanged"] += 1
+    chunks[name] = {"signature": static_signature, "lastmod": _lastmod(newest_post), "urls": len(static)}
+    counts["urls"] += len(static)
+
+    for source, (model, columns, path_for) in _SOURCES.items():
+        for number, info in _chunk_signatures(model, chunk_size).items():
+            name = f"sitemap-{source}-{number:05d}.xml.gz"
+            old = previous.get(name)
+            if old and old["signature"] == info["signature"] and (out_dir / name).exists():
+                chunks[name] = old
+                counts["unchanged"] += 1
+                counts["urls"] += old["urls"]
+                continue
+            lo, hi = number * chunk_size + 1, (number + 1) * chunk_size
+            written = _write_chunk(
+                out_dir / name,
+                (
+                    _url_entry(canonical_path(path_for(row)), row.updated_at)
+                    for row in _stream_rows(model, columns, lo, hi)
+                ),
+            )
+            chunks[name] = {"signature": info["signature"], "lastmod": _lastmod(info["lastmod"]), "urls": written}
+            counts["written"] += 1
+            counts["urls"] += written
+
+    for name in previous:
+        if name not in chunks:
+            (out_dir / name).unlink(missing_ok=True)
+            counts["removed"] += 1
+
+    _write_index(out_dir, chunks)
+    _atomic_write(
+        manifest_path,
+        json.dumps(
+            {"chunk_size": chunk_size, "host": canonical_path(""), "chunks": chunks},
+            indent=1,
+            sort_keys=True,
+        ).encode("utf-8"),
+    )
+    return counts
+
+
+def _write_index(out_dir: Path, chunks: Dict[str, Dict]) -> None:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for name in sorted(chunks):
+        loc = escape(canonical_path(f"/sitemaps/{name}"))
+        lastmod = chunks[name].get("lastmod")
+        tail = f"<lastmod>{lastmod}</lastmod>" if lastmod else ""
+        lines.append(f"<sitemap><loc>{loc}</loc>{tail}</sitemap>")
+    lines.append("</sitemapindex>")
+    _atomic_write(out_dir / _INDEX, ("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _atomic_write(target: Path, data: bytes) -> None:
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+class _RefreshState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+
+
+def _refresh_if_stale(app: Flask) -> bool:
+    """
+    Start a background rebuild of the changed chunks at most once per
+    SITEMAP_REFRESH_INTERVAL; requests never wait for it and keep serving
+    the previous files. Returns whether a built index exists.
+    """
+    state = app.extensions.setdefault(_EXTENSION_KEY, _RefreshState())
+    interval = float(app.config.get("SITEMAP_REFRESH_INTERVAL", 3600))
+    index_exists = (_sitemap_dir(app) / _INDEX).exists()
+    if index_exists and time.monotonic() - state.checked_at < interval:
+        return True
+    if not state.lock.acquire(blocking=False):
+        return index_exists
+
+    def build() -> None:
+        try:
+            with app.app_context():
+                build_sitemaps()
+        except Exception:
+            logger.exception("Sitemap build failed")
+        finally:
+            state.checked_at = time.monotonic()
+            state.lock.release()
+
+    threading.Thread(target=build, name="sitemap-build", daemon=True).start()
+    return index_exists
+
+
+@sitemap_bp.route("/sitemap.xml")
+def sitemap_index():
+    app = current_app._get_current_object()
+    if not _refresh_if_stale(app):
+        # Nothing built yet (run `flask sitemap-build` at deploy to skip this).
+        raise ServiceUnavailable("The sitemap is being built.", retry_after=_RETRY_AFTER)
+    response = send_from_directory(_sitemap_dir(app), _INDEX, mimetype="application/xml")
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+@sitemap_bp.route("/sitemaps/<name>")
+def sitemap_chunk(name: str):
+    if not (name.startswith("sitemap-") and name.endswith(".xml.gz")):
+        abort(404)
+    app = current_app._get_current_object()
+    if not _refresh_if_stale(app):
+        raise ServiceUnavailable("The sitemap is being built.", retry_after=_RETRY_AFTER)
+    response = send_from_directory(_sitemap_dir(app), name, mimetype="application/gzip")
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+@click.command("sitemap-build")
+@click.option("--out", "out_dir", type=click.Path(file_okay=False, path_type=Path), default=None)
+@click.option("--force", is_flag=True, help="Rewrite every chunk even if its id range is unchanged.")
+@with_appcontext
+def sitemap_build_command(out_dir: Optional[Path], force: bool) -> None:
+    """Write the sitemap index and gzipped 50k-URL chunks."""
+    counts = build_sitemaps(out_dir, force=force)
+    click.echo(
+        f"{counts['urls']} URLs: wrote {counts['written']} chunks, "
+        f"unchanged {counts['unchanged']}, removed {counts['removed']}."
+    )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Set
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import Talk, TalkSlugRedirect, slugify
+
+
+def _taken_slugs(session: Session, bases: Set[str]) -> Set[str]:
+    """Existing slugs equal to a base or of the form "<base>-<anything>"."""
+    if not bases:
+        return set()
+    taken = set(session.execute(select(Talk.slug).where(Talk.slug.in_(bases))).scalars())
+    contested = [base for base in bases if base in taken]
+    # Index range scans: "-" sorts right before ".", so [base-, base.) covers base-*.
+    for start in range(0, len(contested), 200):
+        chunk = contested[start : start + 200]
+        ranges = [(Talk.slug >= f"{base}-") & (Talk.slug < f"{base}.") for base in chunk]
+        taken.update(session.execute(select(Talk.slug).where(or_(*ranges))).scalars())
+    return taken
+
+
+def allocate_slugs(session: Session, titles: Iterable[str], reserved: Optional[Set[str]] = None) -> List[str]:
+    """
+    Unique slugs for `titles`, in order. Collisions with stored talks, with
+    `reserved` and within the batch get "-2", "-3", ... suffixes.
+    """
+    bases = [slugify(title) for title in titles]
+    taken = _taken_slugs(session, set(bases)) | (reserved or set())
+    slugs = []
+    for base in bases:
+        slug, n = base, 2
+        while slug in taken:
+            slug, n = f"{base}-{n}", n + 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def _slug_fits(slug: Optional[str], title: str) -> bool:
+    base = slugify(title)
+    return bool(slug) and (slug == base or (slug.startswith(f"{base}-") and slug[len(base) + 1 :].isdigit()))
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_slugs(session, _flush_context, _instances) -> None:
+    pending: List[Talk] = []
+    for obj in session.new:
+        if isinstance(obj, Talk) and not obj.slug:
+            pending.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Talk) and inspect(obj).attrs.title.history.has_changes():
+            if not _slug_fits(obj.slug, obj.title):
+                pending.append(obj)
+    if not pending:
+        return
+
+    with session.no_autoflush:
+        slugs = allocate_slugs(session, [talk.title for talk in pending])
+        for talk, slug in zip(pending, slugs):
+            old = talk.slug
+            talk.slug = slug
+            if talk.id is not None and old and old != slug:
+                # Old links keep working through a 301 (see main.talk_detail).
+                session.merge(TalkSlugRedirect(slug=old, talk_id=talk.id))
+
+
+def assign_missing_slugs(batch_size: int = 1000) -> int:
+    """Give slugs to talks stored before the column was populated."""
+    assigned = 0
+    while True:
+        rows = db.session.execute(
+            select(Talk.id, Talk.title).where(or_(Talk.slug.is_(None), Talk.slug == "")).limit(batch_size)
+        ).all()
+        if not rows:
+            return assigned
+        slugs = allocate_slugs(db.session, [title for _, title in rows])
+        db.session.execute(update(Talk), [{"id": talk_id, "slug": slug} for (talk_id, _), slug in zip(rows, slugs)])
+        db.session.commit()
+        assigned += len(rows)
+
+
+@click.command("talk-slugs")
+@with_appcontext
+def talk_slugs_command() -> None:
+    """Assign slugs to talks that do not have one yet."""
+    click.echo(f"Assigned {assign_missing_slugs()} slugs.")
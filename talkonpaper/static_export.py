@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import Flask, current_app, request, send_file, session
+from flask.cli import with_appcontext
+
+try:  # Optional: brotli variants are written only when the module is installed.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+from .assets import manifest_path
+from .blog import blog_index
+
+_MANIFEST = "manifest.json"
+_EXPORT_MARKER = "talkonpaper.static_export"
+_EVERGREEN = (
+    ("/about", "about.html"),
+    ("/privacy", "privacy.html"),
+    ("/terms", "terms.html"),
+    ("/premium", "premium.html"),
+)
+
+
+def _export_dir(app: Flask) -> Path:
+    return Path(app.config.get("STATIC_EXPORT_DIR") or Path(app.instance_path) / "static_export")
+
+
+def _fingerprint(paths: Iterable[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(set(paths)):
+        try:
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+        except OSError:
+            digest.update(f"{path}:missing\n".encode())
+    return digest.hexdigest()
+
+
+def _page_plan(app: Flask) -> List[Tuple[str, str, List[Path]]]:
+    """
+    (url, output file, source files) for every exportable page. A page is
+    re-rendered only when the fingerprint of its sources changes.
+    """
+    templates = Path(app.root_path).parent / "templates"
+    # Pages link the fingerprinted CSS, so a new `assets-build` re-renders them.
+    base = [templates / "base.html", manifest_path(app)]
+    plan: List[Tuple[str, str, List[Path]]] = [
+        (url, f"{url.strip('/')}/index.html", base + [templates / template])
+        for url, template in _EVERGREEN
+    ]
+
+    blog = blog_index()
+    posts_dir = blog.posts_dir
+    all_sources = [posts_dir / f"{p['slug']}.md" for p in blog.posts]
+    index_templates = base + [templates / "blog" / "index.html"]
+    plan.append(("/blog/", "blog/index.html", index_templates + all_sources))
+    for tag in blog.tags:
+        sources = [posts_dir / f"{p['slug']}.md" for p in blog.by_tag[tag]]
+        # The tag bar lists every tag, so any post can change a tag page.
+        plan.append((f"/blog/?tag={tag}", f"blog/tag/{_safe_name(tag)}/index.html", index_templates + all_sources + sources))
+    for post in blog.posts:
+        related = [posts_dir / f"{p['slug']}.md" for p in blog.related.get(post["slug"], [])]
+        plan.append(
+            (
+                f"/blog/{post['slug']}",
+                f"blog/{post['slug']}/index.html",
+                base + [templates / "blog" / "post.html", posts_dir / f"{post['slug']}.md"] + related,
+            )
+        )
+    return plan
+
+
+def _safe_name(value: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in value) or "_"
+
+
+def _write_variants(target: Path, body: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(target, body)
+    _atomic_write(target.with_name(target.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _atomic_write(target.with_name(target.name + ".br"), brotli.compress(body, quality=11))
+
+
+def _atomic_write(target: Path, data: bytes) -> None:
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def export_static(out_dir: Optional[Path] = None, force: bool = False) -> Dict[str, int]:
+    """
+    Pre-render evergreen and blog pages into `out_dir` with .gz/.br
+    variants and a manifest mapping URLs to files.
+    """
+    app = current_app._get_current_object()
+    out_dir = out_dir or _export_dir(app)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / _MANIFEST
+    previous: Dict[str, Dict] = {}
+    if manifest_path.exists() and not force:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8")).get("pages", {})
+
+    client = app.test_client()
+    pages: Dict[str, Dict] = {}
+    counts = {"rendered": 0, "written": 0, "skipped": 0, "removed": 0}
+    for url, relpath, sources in _page_plan(app):
+        fingerprint = _fingerprint(sources)
+        old = previous.get(url)
+        if old and old["sources"] == fingerprint and (out_dir / old["file"]).exists():
+            pages[url] = old
+            counts["skipped"] += 1
+            continue
+
+        response = client.get(url, environ_overrides={_EXPORT_MARKER: True})
+        counts["rendered"] += 1
+        if response.status_code != 200:
+            current_app.logger.warning("Static export skipped %s: HTTP %s", url, response.status_code)
+            continue
+        body = response.get_data()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        if not old or old["etag"] != etag or not (out_dir / relpath).exists():
+            _write_variants(out_dir / relpath, body)
+            counts["written"] += 1
+        pages[url] = {
+            "file": relpath,
+            "etag": etag,
+            "sources": fingerprint,
+            "content_type": response.headers.get("Content-Type", "text/html; charset=utf-8"),
+        }
+
+    for url, entry in previous.items():
+        if url not in pages:
+            for suffix in ("", ".gz", ".br"):
+                (out_dir / (entry["file"] + suffix)).unlink(missing_ok=True)
+            counts["removed"] += 1
+
+    _atomic_write(manifest_path, json.dumps({"pages": pages}, indent=1, sort_keys=True).encode("utf-8"))
+    return counts
+
+
+class _ExportedPages:
+    """Manifest reader that reloads whenever the export is rebuilt."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._pages: Dict[str, Dict] = {}
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        try:
+            mtime = (self.root / _MANIFEST).stat().st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    payload = json.loads((self.root / _MANIFEST).read_text(encoding="utf-8"))
+                    self._pages = payload.get("pages", {})
+                    self._mtime = mtime
+        return self._pages.get(key)
+
+
+def _request_key() -> Optional[str]:
+    if not request.args:
+        return request.path
+    if request.path == "/blog/" and list(request.args) == ["tag"]:
+        return f"/blog/?tag={request.args['tag']}"
+    return None
+
+
+def init_static_export(app: Flask) -> None:
+    """
+    Serve pre-rendered pages to anonymous GETs straight from disk, picking
+    the .br/.gz variant the client accepts.
+    """
+    if not app.config.get("STATIC_EXPORT_SERVE", True):
+        return
+    exported = _ExportedPages(_export_dir(app))
+    max_age = int(app.config.get("STATIC_EXPORT_MAX_AGE", 86400))
+
+    @app.before_request
+    def _serve_exported_page():
+        if request.method not in ("GET", "HEAD") or request.environ.get(_EXPORT_MARKER):
+            return None
+        # Exports are rendered logged-out; per-session chrome must not be replaced.
+        if "_user_id" in session or "_flashes" in session:
+            return None
+        key = _request_key()
+        entry = exported.lookup(key) if key else None
+        if entry is None:
+            return None
+
+        path = exported.root / entry["file"]
+        encoding = None
+        for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+            variant = path.with_name(path.name + suffix)
+            if candidate in request.accept_encodings and variant.exists():
+                path, encoding = variant, candidate
+                break
+        if not path.exists():
+            return None
+
+        response = send_file(path, mimetype=entry["content_type"], conditional=False, etag=False)
+        response.set_etag(entry["etag"] + (f"-{encoding}" if encoding else ""))
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.vary.add("Cookie")
+        response.headers["Cache-Control"] = f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+        response.headers["X-Static-Export"] = "hit"
+        return response.make_conditional(request)
+
+
+@click.command("export-static")
+@click.option("--out", "out_dir", type=click.Path(file_okay=False, path_type=Path), default=None)
+@click.option("--force", is_flag=True, help="Re-render every page even if its sources are unchanged.")
+@with_appcontext
+def export_static_command(out_dir: Optional[Path], force: bool) -> None:
+    """Pre-render blog and evergreen pages to static, precompressed files."""
+    counts = export_static(out_dir, force=force)
+    click.echo(
+        f"Rendered {counts['rendered']}, wrote {counts['written']}, "
+        f"unchanged {counts['skipped']}, removed {counts['removed']}."
+    )
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import Paper, SiteStat, Speaker, Talk
+
+_MARKER = "_reconciled_at"
+_table = SiteStat.__table__
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _dubbing(value) -> str:
+    return "dubbed" if value else "original"
+
+
+# model -> (counter name, grouping column or None for a plain total, bucket formatter)
+_COUNTERS: Dict[type, List[Tuple[str, Optional[str], Callable]]] = {
+    Talk: [
+        ("talks", None, _text),
+        ("talks_by_access", "access_level", _text),
+        ("talks_by_dubbing", "is_dubbed", _dubbing),
+    ],
+    Paper: [
+        ("papers", None, _text),
+        ("papers_by_year", "publication_year", _text),
+    ],
+    Speaker: [
+        ("speakers", None, _text),
+        ("speakers_by_country", "country", _text),
+    ],
+}
+
+
+def _track_previous_value(_target, _value, _oldvalue, _initiator) -> None:
+    pass
+
+
+# An active-history listener makes assignments to an expired attribute load
+# the committed value first, so a flush can tell which bucket to decrement.
+for _model, _counters in _COUNTERS.items():
+    for _name, _column, _fmt in _counters:
+        if _column:
+            event.listen(getattr(_model, _column), "set", _track_previous_value, active_history=True)
+
+
+def _old_value(obj, column: str):
+    history = inspect(obj).attrs[column].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, column)
+
+
+# --- incremental maintenance -----------------------------------------------
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deltas(session, _flush_context, _instances) -> None:
+    deltas: Counter = session.info.setdefault("stat_deltas", Counter())
+    with session.no_autoflush:
+        for obj in session.new:
+            for name, column, fmt in _COUNTERS.get(type(obj), ()):
+                deltas[(name, fmt(getattr(obj, column)) if column else "")] += 1
+        for obj in session.deleted:
+            for name, column, fmt in _COUNTERS.get(type(obj), ()):
+                deltas[(name, fmt(_old_value(obj, column)) if column else "")] -= 1
+        for obj in session.dirty:
+            for name, column, fmt in _COUNTERS.get(type(obj), ()):
+                if column is None or not inspect(obj).attrs[column].history.has_changes():
+                    continue
+                old, new = fmt(_old_value(obj, column)), fmt(getattr(obj, column))
+                if old != new:
+                    deltas[(name, old)] -= 1
+                    deltas[(name, new)] += 1
+
+
+def row_deltas(model, rows: Iterable[Dict], sign: int = 1, deltas: Optional[Counter] = None) -> Counter:
+    """
+    Counter deltas for rows written with Core, which skip the flush hooks:
+    `rows` are dicts holding the grouping columns; `sign=-1` takes them away
+    (an updated row counts its old values with -1 and its new ones with +1).
+    """
+    deltas = Counter() if deltas is None else deltas
+    counters = _COUNTERS.get(model, ())
+    for row in rows:
+        for name, column, fmt in counters:
+            deltas[(name, fmt(row.get(column)) if column else "")] += sign
+    return deltas
+
+
+def update_deltas(conn, model, updates: List[Dict], deltas: Optional[Counter] = None) -> Counter:
+    """
+    Counter deltas for a Core bulk UPDATE of `updates` (dicts keyed by
+    "id"); call it before running the UPDATE so the old values are read.
+    """
+    deltas = Counter() if deltas is None else deltas
+    columns = [column for _name, column, _fmt in _COUNTERS.get(model, ()) if column]
+    if not updates or not columns:
+        return deltas
+    changes = {row["id"]: row for row in updates}
+    stmt = select(model.id, *(getattr(model, column) for column in columns)).where(model.id.in_(changes))
+    old = [dict(row._mapping) for row in conn.execute(stmt)]
+    row_deltas(model, old, sign=-1, deltas=deltas)
+    row_deltas(model, [{**row, **changes[row["id"]]} for row in old], deltas=deltas)
+    return deltas
+
+
+def apply_deltas(conn, deltas: Counter) -> None:
+    for (name, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        result = conn.execute(
+            update(_table)
+            .where(_table.c.name == name, _table.c.bucket == bucket)
+            .values(value=_table.c.value + delta)
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(_table).values(name=name, bucket=bucket, value=delta))
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session, _flush_context) -> None:
+    deltas = session.info.pop("stat_deltas", None)
+    if deltas:
+        # Same transaction as the rows themselves, so a rollback undoes both.
+        apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session) -> None:
+    session.info.pop("stat_deltas", None)
+
+
+# --- reads and reconciliation ---------------------------------------------
+
+
+def site_stats() -> Dict:
+    """
+    All counters from one small-table read: plain totals as ints, rollups as
+    {bucket: count} dicts with empty buckets dropped.
+    """
+    stats: Dict = {"talks": 0, "papers": 0, "speakers": 0}
+    for name, bucket, value in db.session.execute(select(_table.c.name, _table.c.bucket, _table.c.value)):
+        if name.startswith("_"):
+            continue
+        if name in stats and not bucket:
+            stats[name] = value
+        elif value:
+            stats.setdefault(name, {})[bucket] = value
+    return stats
+
+
+def _recount(conn) -> Dict[Tuple[str, str], int]:
+    counts: Dict[Tuple[str, str], int] = {}
+    for model, counters in _COUNTERS.items():
+        for name, column, fmt in counters:
+            if column is None:
+                counts[(name, "")] = conn.execute(select(func.count()).select_from(model)).scalar()
+                continue
+            col = getattr(model, column)
+            for value, count in conn.execute(select(col, func.count()).group_by(col)):
+                key = (name, fmt(value))
+                counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def reconcile_stats() -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """
+    Recompute every counter with GROUP BY queries and replace the table.
+    Returns {(name, bucket): (stored, actual)} for counters that had drifted.
+    """
+    with db.engine.begin() as conn:
+        stored = {
+            (name, bucket): value
+            for name, bucket, value in conn.execute(select(_table.c.name, _table.c.bucket, _table.c.value))
+            if not name.startswith("_")
+        }
+        actual = _recount(conn)
+        conn.execute(delete(_table))
+        rows = [{"name": n, "bucket": b, "value": v} for (n, b), v in actual.items()]
+        rows.append({"name": _MARKER, "bucket": "", "value": int(time.time())})
+        conn.execute(insert(_table), rows)
+
+    drift = {}
+    for key in set(stored) | set(actual):
+        if stored.get(key, 0) != actual.get(key, 0):
+            drift[key] = (stored.get(key, 0), actual.get(key, 0))
+    return drift
+
+
+def ensure_stats(app) -> None:
+    """Backfill the counters once for databases created before they existed."""
+    with app.app_context():
+        marker = db.session.execute(select(_table.c.value).where(_table.c.name == _MARKER)).first()
+        if marker is None:
+            reconcile_stats()
+
+
+@click.command("stats-reconcile")
+@with_appcontext
+def stats_reconcile_command() -> None:
+    """Recompute dashboard counters from scratch and report any drift."""
+    drift = reconcile_stats()
+    if not drift:
+        click.echo("Counters were already accurate.")
+        return
+    for (name, bucket), (stored, actual) in sorted(drift.items()):
+        label = f"{name}[{bucket}]" if bucket else name
+        click.echo(f"{label}: {stored} -> {actual}")
+    click.echo(f"Corrected {len(drift)} counters.")
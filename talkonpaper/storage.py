@@ -1,26 +1,352 @@
+import base64
+import hashlib
+import hmac
 import logging
-from typing import Any, Dict, Optional
+import mimetypes
+import os
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Hashable, Iterable, List, Optional, Tuple
 
 import boto3
 from botocore.client import Config
-from botocore.exceptions import BotoCoreError, NoCredentialsError
-from flask import current_app
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+from flask import current_app, url_for
+from werkzeug.security import safe_join
+from werkzeug.utils import import_string
 
 logger = logging.getLogger(__name__)
 
+_EXTENSION_KEY = "talkonpaper.storage"
+_init_lock = threading.Lock()
 
-def r2_client():
+
+class LRUCache:
     """
-    Lazily create an S3-compatible client for Cloudflare R2.
+    Small thread-safe LRU with absolute per-entry deadlines and hit/miss counters.
     """
-    cfg = current_app.config
-    return boto3.client(
-        "s3",
-        endpoint_url=cfg.get("R2_ENDPOINT_URL"),
-        aws_access_key_id=cfg.get("R2_ACCESS_KEY_ID"),
-        aws_secret_access_key=cfg.get("R2_SECRET_ACCESS_KEY"),
-        config=Config(signature_version="s3v4"),
-    )
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Any:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+class StorageBackend:
+    """
+    Where media objects live. `presign` returns a time-limited URL a browser
+    can fetch directly; `head` returns (metadata, definitive) where a missing
+    object is a definitive negative and other failures are transient.
+    """
+
+    name = "backend"
+
+    def presign(self, object_key: str, expires_in: int) -> Optional[str]:
+        raise NotImplementedError
+
+    def head(self, object_key: str) -> Tuple[Dict[str, Any], bool]:
+        raise NotImplementedError
+
+    def open(self, object_key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def save(self, object_key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    # Multipart uploads, S3 semantics: parts are numbered from 1, every part
+    # but the last must meet the store's minimum size, and re-uploading a
+    # part number replaces it. `upload_part` may run on worker threads.
+
+    def create_multipart(self, object_key: str, content_type: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    def upload_part(self, object_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        raise NotImplementedError
+
+    def complete_multipart(self, object_key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        raise NotImplementedError
+
+    def abort_multipart(self, object_key: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+
+class R2Backend(StorageBackend):
+    """Cloudflare R2 (or any S3-compatible store) through boto3."""
+
+    name = "r2"
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.bucket = cfg.get("R2_BUCKET_NAME")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # boto3 clients are thread-safe once constructed; construction itself
+        # is serialized because the default session is not.
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = boto3.session.Session().client(
+                        "s3",
+                        endpoint_url=self.cfg.get("R2_ENDPOINT_URL"),
+                        aws_access_key_id=self.cfg.get("R2_ACCESS_KEY_ID"),
+                        aws_secret_access_key=self.cfg.get("R2_SECRET_ACCESS_KEY"),
+                        config=Config(
+                            signature_version="s3v4",
+                            connect_timeout=float(self.cfg.get("R2_CONNECT_TIMEOUT", 2)),
+                            read_timeout=float(self.cfg.get("R2_READ_TIMEOUT", 5)),
+                            retries={"total_max_attempts": int(self.cfg.get("R2_MAX_ATTEMPTS", 2)), "mode": "standard"},
+                        ),
+                    )
+        return self._client
+
+    def presign(self, object_key: str, expires_in: int) -> Optional[str]:
+        try:
+            return self.client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": object_key},
+                ExpiresIn=expires_in,
+            )
+        except (BotoCoreError, NoCredentialsError) as exc:
+            logger.warning("Signed URL generation failed: %s", exc)
+            return None
+
+    def head(self, object_key: str) -> Tuple[Dict[str, Any], bool]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=object_key)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "")
+            logger.debug("Failed to fetch media metadata for %s: %s", object_key, exc)
+            return {}, code in ("404", "NoSuchKey", "NotFound")
+        except (BotoCoreError, NoCredentialsError) as exc:
+            logger.debug("Failed to fetch media metadata for %s: %s", object_key, exc)
+            return {}, False
+        return {
+            "size": head.get("ContentLength"),
+            "content_type": head.get("ContentType"),
+            "last_modified": head.get("LastModified"),
+        }, True
+
+    def open(self, object_key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=object_key)["Body"]
+
+    def save(self, object_key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, self.bucket, object_key, ExtraArgs=extra)
+
+    def create_multipart(self, object_key: str, content_type: Optional[str] = None) -> str:
+        extra = {"ContentType": content_type} if content_type else {}
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=object_key, **extra)["UploadId"]
+
+    def upload_part(self, object_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=object_key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        return response["ETag"]
+
+    def complete_multipart(self, object_key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": number, "ETag": etag} for number, etag in parts]},
+        )
+
+    def abort_multipart(self, object_key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+
+
+class LocalBackend(StorageBackend):
+    """
+    Objects as files under LOCAL_MEDIA_ROOT, for development, tests and small
+    on-prem installs. Presigned URLs point at `media.serve_media`, which checks
+    an HMAC over (key, expiry) and streams the file with Range support.
+    """
+
+    name = "local"
+
+    def __init__(self, cfg):
+        self.root = Path(cfg.get("LOCAL_MEDIA_ROOT") or Path(current_app.instance_path) / "media")
+        self.secret = str(cfg.get("SECRET_KEY") or "").encode("utf-8")
+
+    def path(self, object_key: str) -> Optional[Path]:
+        """Absolute path of an object, or None for keys escaping the root."""
+        joined = safe_join(str(self.root), object_key)
+        return Path(joined) if joined else None
+
+    def signature(self, object_key: str, expires: int) -> str:
+        digest = hmac.new(self.secret, f"{object_key}\n{expires}".encode("utf-8"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:18]).decode("ascii")
+
+    def verify(self, object_key: str, expires: int, signature: str) -> bool:
+        return expires > time.time() and hmac.compare_digest(self.signature(object_key, expires), signature)
+
+    def presign(self, object_key: str, expires_in: int) -> Optional[str]:
+        expires = int(time.time()) + expires_in
+        return url_for(
+            "media.serve_media", object_key=object_key, expires=expires, signature=self.signature(object_key, expires)
+        )
+
+    def head(self, object_key: str) -> Tuple[Dict[str, Any], bool]:
+        path = self.path(object_key)
+        try:
+            stat = path.stat() if path else None
+        except OSError:
+            stat = None
+        if stat is None or not path.is_file():
+            return {}, True
+        return {
+            "size": stat.st_size,
+            "content_type": mimetypes.guess_type(object_key)[0],
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        }, True
+
+    def open(self, object_key: str) -> BinaryIO:
+        path = self.path(object_key)
+        if path is None:
+            raise FileNotFoundError(object_key)
+        return open(path, "rb")
+
+    def save(self, object_key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> None:
+        path = self.path(object_key)
+        if path is None:
+            raise ValueError(f"Invalid object key {object_key!r}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".part")
+        with open(partial, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+        os.replace(partial, path)
+
+    # Multipart uploads keep each part as a file under .multipart/<upload id>/
+    # and concatenate them on completion.
+
+    def _parts_dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload id {upload_id!r}")
+        return self.root / ".multipart" / upload_id
+
+    def create_multipart(self, object_key: str, content_type: Optional[str] = None) -> str:
+        if self.path(object_key) is None:
+            raise ValueError(f"Invalid object key {object_key!r}")
+        upload_id = secrets.token_hex(16)
+        self._parts_dir(upload_id).mkdir(parents=True)
+        return upload_id
+
+    def upload_part(self, object_key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        part = self._parts_dir(upload_id) / f"{part_number:05d}"
+        partial = part.with_suffix(".part")
+        with open(partial, "wb") as out:
+            out.write(data)
+        os.replace(partial, part)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart(self, object_key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        parts_dir = self._parts_dir(upload_id)
+        path = self.path(object_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".part")
+        with open(partial, "wb") as out:
+            for number, _etag in sorted(parts):
+                with open(parts_dir / f"{number:05d}", "rb") as part:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+        os.replace(partial, path)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    def abort_multipart(self, object_key: str, upload_id: str) -> None:
+        shutil.rmtree(self._parts_dir(upload_id), ignore_errors=True)
+
+
+BACKENDS = {"r2": R2Backend, "local": LocalBackend}
+
+
+class _StorageState:
+    def __init__(self, cfg):
+        name = cfg.get("STORAGE_BACKEND", "r2")
+        factory = BACKENDS.get(name) or import_string(name.replace(":", "."))
+        self.backend: StorageBackend = factory(cfg)
+        self.url_cache = LRUCache(int(cfg.get("SIGNED_URL_CACHE_SIZE", 4096)))
+        self.meta_cache = LRUCache(int(cfg.get("MEDIA_META_CACHE_SIZE", 4096)))
+        self.meta_pool = ThreadPoolExecutor(
+            max_workers=int(cfg.get("MEDIA_META_WORKERS", 8)),
+            thread_name_prefix="media-head",
+        )
+
+
+def _state() -> _StorageState:
+    app = current_app._get_current_object()
+    state = app.extensions.get(_EXTENSION_KEY)
+    if state is None:
+        with _init_lock:
+            state = app.extensions.get(_EXTENSION_KEY)
+            if state is None:
+                state = app.extensions[_EXTENSION_KEY] = _StorageState(app.config)
+    return state
+
+
+def storage_backend() -> StorageBackend:
+    """The configured backend of the current app (STORAGE_BACKEND)."""
+    return _state().backend
+
+
+def is_external_key(object_key: str) -> bool:
+    return object_key.startswith("http://") or object_key.startswith("https://")
+
+
+def r2_client():
+    """Return the S3-compatible client of the R2 backend, built once per app."""
+    backend = storage_backend()
+    if not isinstance(backend, R2Backend):
+        raise RuntimeError(f"STORAGE_BACKEND is {backend.name!r}, not an S3-compatible store")
+    return backend.client
 
 
 def signed_url(object_key: str, expires_in: Optional[int] = None) -> Optional[str]:
@@ -28,27 +354,104 @@ def signed_url(object_key: str, expires_in: Optional[int] = None) -> Optional[st
     Generate a time-limited signed URL for secure media delivery.
     If a full URL is provided (http/https), return it directly to allow
     external demo assets without R2 credentials.
+
+    URLs are reused from an LRU keyed on (object_key, expiry bucket). Buckets
+    are `expiry - SIGNED_URL_REUSE_MARGIN` seconds wide, so a cached URL
+    always has at least the margin left when it is handed out.
     """
     if not object_key:
         return None
 
-    if object_key.startswith("http://") or object_key.startswith("https://"):
+    if is_external_key(object_key):
         return object_key
 
     cfg = current_app.config
     expiry = expires_in or cfg.get("SIGNED_URL_EXPIRATION", 900)
+    margin = min(int(cfg.get("SIGNED_URL_REUSE_MARGIN", 180)), expiry - 1)
+    window = max(expiry - margin, 1)
 
-    try:
-        client = r2_client()
-        return client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": cfg.get("R2_BUCKET_NAME"), "Key": object_key},
-            ExpiresIn=expiry,
-        )
-    except (BotoCoreError, NoCredentialsError) as exc:
-        logger.warning("Signed URL generation failed: %s", exc)
+    now = time.time()
+    bucket = int(now // window)
+    key = (object_key, expiry, bucket)
+    state = _state()
+
+    cached = state.url_cache.get(key, now)
+    if cached is not None:
+        return cached
+
+    url = state.backend.presign(object_key, expiry)
+    if url is None:
         return None
 
+    state.url_cache.set(key, url, expires_at=(bucket + 1) * window)
+    return url
+
+
+def signed_url_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the presigned URL cache of the current app."""
+    return _state().url_cache.stats()
+
+
+def media_meta_many(object_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch metadata for many objects at once.
+
+    Cached entries (including misses) are answered from a TTL cache; the rest
+    are HEADed concurrently on a bounded per-app thread pool. External
+    http(s) keys and empty keys map to an empty dict, and so do lookups still
+    running after MEDIA_META_WAIT seconds; those fill the cache when they
+    finish.
+    """
+    cfg = current_app.config
+    state = _state()
+    now = time.time()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for key in dict.fromkeys(object_keys):
+        if not key or is_external_key(key):
+            results[key] = {}
+            continue
+        cached = state.meta_cache.get(key, now)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.append(key)
+
+    if not pending:
+        return results
+
+    backend = state.backend
+    ttl = int(cfg.get("MEDIA_META_TTL", 300))
+    negative_ttl = int(cfg.get("MEDIA_META_NEGATIVE_TTL", 60))
+
+    # Transient failures are remembered briefly too, so a flaky endpoint
+    # cannot turn every page view into a burst of timeouts.
+    transient_ttl = min(negative_ttl, 10)
+
+    def lookup(key: str) -> Dict[str, Any]:
+        meta, definitive = backend.head(key)
+        lifetime = ttl if meta else negative_ttl if definitive else transient_ttl
+        state.meta_cache.set(key, meta, expires_at=time.time() + lifetime)
+        return meta
+
+    # Placeholder answers for concurrent requests and for lookups that fail
+    # or outlive the wait; finished lookups overwrite them.
+    for key in pending:
+        state.meta_cache.set(key, {}, expires_at=now + transient_ttl)
+    futures = {key: state.meta_pool.submit(lookup, key) for key in pending}
+    done, not_done = wait(futures.values(), timeout=float(cfg.get("MEDIA_META_WAIT", 3)))
+    if not_done:
+        logger.warning("Media metadata: %d of %d lookups still running", len(not_done), len(futures))
+    for key, future in futures.items():
+        if future in done and future.exception() is None:
+            results[key] = future.result()
+        else:
+            if future in done:
+                logger.warning("Media metadata lookup for %s failed: %s", key, future.exception())
+            results[key] = {}
+    return results
+
 
 def media_meta(object_key: str) -> Dict[str, Any]:
     """
@@ -56,14 +459,4 @@ def media_meta(object_key: str) -> Dict[str, Any]:
     """
     if not object_key:
         return {}
-    try:
-        client = r2_client()
-        head = client.head_object(Bucket=current_app.config["R2_BUCKET_NAME"], Key=object_key)
-        return {
-            "size": head.get("ContentLength"),
-            "content_type": head.get("ContentType"),
-            "last_modified": head.get("LastModified"),
-        }
-    except Exception as exc:  # noqa: BLE001
-        logger.debug("Failed to fetch media metadata for %s: %s", object_key, exc)
-        return {}
+    return media_meta_many([object_key]).get(object_key, {})
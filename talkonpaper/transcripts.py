@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context, url_for
+from flask.cli import with_appcontext
+from flask_login import current_user
+from sqlalchemy import and_, delete, event, exists, insert, inspect, or_, select, update
+
+from .extensions import db
+from .models import TRANSCRIPT_EXCERPT_LENGTH, Talk, TranscriptSegment
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, page_size
+from .routes import can_access_talk
+from .storage import LRUCache
+
+transcripts_bp = Blueprint("transcripts", __name__)
+
+_EXTENSION_KEY = "talkonpaper.transcripts"
+_table = TranscriptSegment.__table__
+
+# (start_ms, end_ms, text)
+Segment = Tuple[int, int, str]
+
+# Estimated cues aim for about two caption lines each.
+SEGMENT_CHARS = 240
+# Reading pace assumed when a talk has no duration.
+_CHARS_PER_SECOND = 15
+
+_TIMESTAMP = r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{3})"
+_CUE_TIMING = re.compile(rf"^\s*{_TIMESTAMP}\s*-->\s*{_TIMESTAMP}")
+_CUE_TAG = re.compile(r"<[^>]+>")
+_SENTENCE_END = (".", "!", "?", "…")
+
+
+# --- parsing and segmentation ----------------------------------------------
+
+
+def _ms(hours: Optional[str], minutes: str, seconds: str, millis: str) -> int:
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis)
+
+
+def parse_cues(raw: str) -> Optional[List[Segment]]:
+    """Cues from WebVTT or SRT text, or None when `raw` carries no timings."""
+    cues: List[Tuple[int, int, List[str]]] = []
+    current: Optional[List[str]] = None
+    for line in raw.splitlines():
+        timing = _CUE_TIMING.match(line)
+        if timing:
+            current = []
+            cues.append((_ms(*timing.groups()[:4]), _ms(*timing.groups()[4:]), current))
+        elif not line.strip():
+            current = None
+        elif current is not None:
+            current.append(_CUE_TAG.sub("", line).strip())
+    segments = [(start, max(start, end), " ".join(lines)) for start, end, lines in cues if any(lines)]
+    return segments or None
+
+
+def estimate_segments(text: str, duration_seconds: int) -> List[Segment]:
+    """
+    Cut untimed text into cues of about SEGMENT_CHARS, preferring sentence
+    ends, and spread them over the talk in proportion to their length.
+    """
+    chunks: List[str] = []
+    words: List[str] = []
+    length = 0
+    for word in text.split():
+        words.append(word)
+        length += len(word) + 1
+        if length >= 2 * SEGMENT_CHARS or (length >= SEGMENT_CHARS and word.endswith(_SENTENCE_END)):
+            chunks.append(" ".join(words))
+            words, length = [], 0
+    if words:
+        chunks.append(" ".join(words))
+
+    total = sum(len(chunk) for chunk in chunks) or 1
+    duration_ms = duration_seconds * 1000 if duration_seconds else total * 1000 // _CHARS_PER_SECOND
+    segments, offset = [], 0
+    for chunk in chunks:
+        start = offset * duration_ms // total
+        offset += len(chunk)
+        segments.append((start, offset * duration_ms // total, chunk))
+    return segments
+
+
+def excerpt(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    if len(text) <= TRANSCRIPT_EXCERPT_LENGTH:
+        return text
+    return text[:TRANSCRIPT_EXCERPT_LENGTH].rstrip() + "…"
+
+
+def prepare_transcript(raw: Optional[str], duration_seconds: int) -> Tuple[Optional[str], Optional[str], List[Segment]]:
+    """
+    (plain text, excerpt, segments) for a transcript as submitted. WebVTT or
+    SRT keeps its cue timings and is stored as plain text for search; other
+    text gets estimated timings.
+    """
+    if not raw or not raw.strip():
+        return None, None, []
+    cues = parse_cues(raw)
+    if cues:
+        plain = " ".join(text for _, _, text in cues)
+        return plain, excerpt(plain), cues
+    plain = raw.strip()
+    return plain, excerpt(plain), estimate_segments(plain, duration_seconds or 0)
+
+
+def write_segments(conn, by_talk: Dict[int, List[Segment]]) -> None:
+    """Replace the stored segments of the given talks."""
+    talk_ids = list(by_talk)
+    for start in range(0, len(talk_ids), 500):
+        conn.execute(delete(_table).where(_table.c.talk_id.in_(talk_ids[start : start + 500])))
+    rows = [
+        {"talk_id": talk_id, "start_ms": start_ms, "end_ms": end_ms, "text": text}
+        for talk_id, segments in by_talk.items()
+        for start_ms, end_ms, text in segments
+    ]
+    if rows:
+        conn.execute(insert(_table), rows)
+
+
+# --- ORM writes -------------------------------------------------------------
+
+
+def _prepare_on_write(_mapper, _connection, talk: Talk) -> None:
+    state = inspect(talk)
+    # An unloaded (deferred) transcript has no history, so unrelated edits cost nothing.
+    if state.persistent and not state.attrs.transcript_text.history.has_changes():
+        return
+    plain, short, segments = prepare_transcript(talk.transcript_text, talk.duration_seconds)
+    talk.transcript_text = plain
+    talk.transcript_excerpt = short
+    if segments or state.persistent:
+        state.info["transcript_segments"] = segments
+
+
+def _store_segments(_mapper, connection, talk: Talk) -> None:
+    segments = inspect(talk).info.pop("transcript_segments", None)
+    if segments is not None:
+        write_segments(connection, {talk.id: segments})
+
+
+event.listen(Talk, "before_insert", _prepare_on_write)
+event.listen(Talk, "before_update", _prepare_on_write)
+event.listen(Talk, "after_insert", _store_segments)
+event.listen(Talk, "after_update", _store_segments)
+
+
+# --- bulk writes ------------------------------------------------------------
+
+
+def sync_transcripts(talk_ids: Iterable[int], batch_size: int = 500) -> int:
+    """
+    Re-derive excerpts and segments for talks written with Core or bulk
+    UPDATEs, which skip the mapper events. The caller commits.
+    """
+    talk_ids = list(talk_ids)
+    synced = 0
+    for start in range(0, len(talk_ids), batch_size):
+        rows = db.session.execute(
+            select(Talk.id, Talk.transcript_text, Talk.duration_seconds).where(
+                Talk.id.in_(talk_ids[start : start + batch_size])
+            )
+        ).all()
+        by_talk, excerpts, rewritten = {}, [], []
+        for talk_id, raw, duration in rows:
+            plain, short, segments = prepare_transcript(raw, duration)
+            by_talk[talk_id] = segments
+            excerpts.append({"id": talk_id, "transcript_excerpt": short})
+            if plain != raw:
+                rewritten.append({"id": talk_id, "transcript_text": plain})
+        write_segments(db.session.connection(), by_talk)
+        if excerpts:
+            db.session.execute(update(Talk), excerpts)
+        if rewritten:
+            db.session.execute(update(Talk), rewritten)
+        synced += len(rows)
+    return synced
+
+
+def segment_missing_transcripts(batch_size: int = 500) -> int:
+    """Build segments and excerpts for talks that have a transcript but no segments."""
+    # Talks with segments are skipped: their text no longer carries cue timings to rebuild from.
+    stmt = (
+        select(Talk.id)
+        .where(Talk.transcript_text.is_not(None), ~exists().where(_table.c.talk_id == Talk.id))
+        .order_by(Talk.id)
+    )
+    talk_ids = list(db.session.execute(stmt).scalars())
+    synced = 0
+    for start in range(0, len(talk_ids), batch_size):
+        synced += sync_transcripts(talk_ids[start : start + batch_size], batch_size)
+        db.session.commit()
+    return synced
+
+
+@click.command("transcript-segments")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@with_appcontext
+def transcript_segments_command(batch_size: int) -> None:
+    """Build transcript segments and excerpts for talks that lack them."""
+    click.echo(f"Segmented {segment_missing_transcripts(batch_size)} transcripts.")
+
+
+# --- WebVTT -----------------------------------------------------------------
+
+
+def _vtt_time(ms: int) -> str:
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def to_webvtt(segments: Iterable[Segment]) -> bytes:
+    lines = ["WEBVTT", ""]
+    for number, (start_ms, end_ms, text) in enumerate(segments, start=1):
+        lines += [str(number), f"{_vtt_time(start_ms)} --> {_vtt_time(end_ms)}", text.replace("-->", "->"), ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def _captions_cache() -> LRUCache:
+    app = current_app._get_current_object()
+    cache = app.extensions.get(_EXTENSION_KEY)
+    if cache is None:
+        cache = app.extensions.setdefault(_EXTENSION_KEY, LRUCache(int(app.config.get("CAPTIONS_CACHE_SIZE", 256))))
+    return cache
+
+
+# --- endpoints --------------------------------------------------------------
+
+
+def _segment_query(talk_id: int):
+    return (
+        select(_table.c.id, _table.c.start_ms, _table.c.end_ms, _table.c.text)
+        .where(_table.c.talk_id == talk_id)
+        .order_by(_table.c.start_ms, _table.c.id)
+    )
+
+
+def _after(stmt, token: Optional[str]):
+    if not token:
+        return stmt
+    try:
+        start_ms, segment_id = decode_cursor(token, 2)
+    except InvalidCursor:
+        abort(400)
+    if not all(type(value) is int for value in (start_ms, segment_id)):
+        abort(400)
+    return stmt.where(
+        or_(_table.c.start_ms > start_ms, and_(_table.c.start_ms == start_ms, _table.c.id > segment_id))
+    )
+
+
+def _segment_json(row, talk_url: str) -> Dict:
+    return {
+        "id": row.id,
+        "start_ms": row.start_ms,
+        "end_ms": row.end_ms,
+        "text": row.text,
+        # Media fragment the talk page (and browsers) seek to.
+        "url": f"{talk_url}#t={row.start_ms / 1000:g}",
+    }
+
+
+def _segments_page(talk, talk_url: str) -> Response:
+    stmt = _after(_segment_query(talk.id), request.args.get("after"))
+    query = request.args.get("q", "").strip()
+    if query:
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        stmt = stmt.where(_table.c.text.ilike(pattern, escape="\\"))
+    per_page = page_size("TRANSCRIPT_PAGE_SIZE")
+    rows = db.session.execute(stmt.limit(per_page + 1)).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    return jsonify(
+        {
+            "talk": talk.slug,
+            "query": query or None,
+            "segments": [_segment_json(row, talk_url) for row in rows],
+            "next": encode_cursor([rows[-1].start_ms, rows[-1].id]) if more else None,
+        }
+    )
+
+
+def _segments_stream(talk, talk_url: str) -> Response:
+    stmt = _after(_segment_query(talk.id), request.args.get("after"))
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=500))
+        for row in result:
+            yield json.dumps(_segment_json(row, talk_url)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _captions(talk) -> Response:
+    cache = _captions_cache()
+    cached = cache.get(talk.id)
+    if cached is None or cached[0] != talk.updated_at:
+        rows = db.session.execute(_segment_query(talk.id)).all()
+        body = to_webvtt((row.start_ms, row.end_ms, row.text) for row in rows)
+        cached = (talk.updated_at, body, hashlib.sha256(body).hexdigest()[:32])
+        cache.set(talk.id, cached, time.time() + 86400)
+    response = Response(cached[1], mimetype="text/vtt")
+    response.set_etag(cached[2])
+    return response
+
+
+@transcripts_bp.route("/talks/<slug>/transcript.<fmt>")
+def talk_transcript(slug: str, fmt: str):
+    """
+    Transcript segments as paged JSON (`?after=` cursor, `?q=` to find the
+    timestamps where a phrase is said), streamed NDJSON, or WebVTT captions.
+    """
+    talk = db.session.execute(
+        select(Talk.id, Talk.slug, Talk.access_level, Talk.updated_at).where(Talk.slug == slug)
+    ).first()
+    if talk is None or fmt not in ("json", "ndjson", "vtt"):
+        abort(404)
+    # The full transcript is gated like the full video; the page excerpt is not.
+    has_access, _ = can_access_talk(talk, current_user)
+    if not has_access:
+        abort(403)
+
+    talk_url = url_for("main.talk_detail", slug=talk.slug)
+    if fmt == "json":
+        response = _segments_page(talk, talk_url)
+    elif fmt == "ndjson":
+        response = _segments_stream(talk, talk_url)
+    else:
+        response = _captions(talk)
+    scope = "public" if talk.access_level == "public" else "private"
+    response.headers["Cache-Control"] = f"{scope}, max-age={int(current_app.config.get('TRANSCRIPT_MAX_AGE', 300))}"
+    return response.make_conditional(request) if fmt == "vtt" else response
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Column, inspect, text
+
+from .extensions import db
+from .models import Paper, Speaker, Talk
+from .slugs import assign_missing_slugs
+from .transcripts import segment_missing_transcripts
+
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables since the first release, in the order they
+# were introduced: (column, extra DDL, backfill run once right after adding it).
+# create_all() only creates missing tables, so these need ALTER TABLE. SQLite
+# cannot add a NOT NULL column without a default; those are added nullable
+# and backfilled before their indexes are built.
+_COLUMNS: List[Tuple[Column, str, Optional[Callable[[], object]]]] = [
+    # Re-checked with `flask verify-papers --status pending`.
+    (Paper.__table__.c.verification_status, "NOT NULL DEFAULT 'pending'", None),
+    (Paper.__table__.c.verification_method, "", None),
+    (Paper.__table__.c.verified_at, "", None),
+    (Talk.__table__.c.slug, "", assign_missing_slugs),
+    (Talk.__table__.c.transcript_excerpt, "", segment_missing_transcripts),
+    (Speaker.__table__.c.photo_object_key, "", None),
+    (Speaker.__table__.c.photo_version, "NOT NULL DEFAULT 0", None),
+    (Talk.__table__.c.thumbnail_version, "NOT NULL DEFAULT 0", None),
+]
+
+
+def upgrade_schema(app) -> None:
+    """
+    Bring a database created by an older release up to the models: add the
+    missing columns, backfill them, then create any missing indexes. Safe to
+    run on every start; on a current database it only inspects the schema.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = inspect(engine)
+        added = []
+        with engine.begin() as conn:
+            for column, extra, backfill in _COLUMNS:
+                table = column.table.name
+                if column.name in {info["name"] for info in inspector.get_columns(table)}:
+                    continue
+                ddl = f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                conn.execute(text(f"{ddl} {extra}".rstrip()))
+                logger.info("Added column %s.%s", table, column.name)
+                added.append((column, backfill))
+
+        for column, backfill in added:
+            if backfill is not None:
+                backfill()
+                db.session.commit()
+
+        # Last, so unique indexes are built over backfilled values.
+        inspector = inspect(engine)
+        for table in db.metadata.sorted_tables:
+            present = {info["name"] for info in inspector.get_columns(table.name)}
+            for index in table.indexes:
+                if all(column.name in present for column in index.columns):
+                    index.create(engine, checkfirst=True)
+                else:
+                    logger.warning("Skipping index %s: %s lacks some of its columns", index.name, table.name)
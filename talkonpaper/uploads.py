@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import logging
+import math
+import secrets
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import IO, Deque, Dict, Optional, Tuple
+
+import click
+from flask import Blueprint, Response, abort, current_app, request, url_for
+from flask.cli import with_appcontext
+from sqlalchemy import or_, select, update
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.utils import secure_filename
+
+from .admin import admin_required
+from .extensions import db
+from .models import MediaUpload, MediaUploadPart
+from .storage import storage_backend
+
+logger = logging.getLogger(__name__)
+
+uploads_bp = Blueprint("uploads", __name__, url_prefix="/admin/uploads")
+
+_EXTENSION_KEY = "talkonpaper.uploads"
+TUS_VERSION = "1.0.0"
+# S3 (and R2) multipart limits.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10_000
+
+
+def _pool() -> ThreadPoolExecutor:
+    app = current_app._get_current_object()
+    pool = app.extensions.get(_EXTENSION_KEY)
+    if pool is None:
+        pool = app.extensions.setdefault(
+            _EXTENSION_KEY,
+            ThreadPoolExecutor(max_workers=int(app.config.get("UPLOAD_PART_WORKERS", 4)), thread_name_prefix="upload-part"),
+        )
+    return pool
+
+
+def _parse_metadata(header: str) -> Dict[str, str]:
+    """tus Upload-Metadata: comma-separated "key base64(value)" pairs."""
+    metadata = {}
+    for item in header.split(","):
+        key, _, value = item.strip().partition(" ")
+        if not key:
+            continue
+        try:
+            metadata[key] = base64.b64decode(value).decode("utf-8") if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            abort(400, "Upload-Metadata values must be base64")
+    return metadata
+
+
+def _headers(upload: MediaUpload) -> Dict[str, str]:
+    headers = {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.total_size),
+        "Upload-Part-Size": str(upload.part_size),
+        "Cache-Control": "no-store",
+    }
+    if upload.status == "completed":
+        headers["Upload-Object-Key"] = upload.object_key
+    return headers
+
+
+@uploads_bp.after_request
+def _tus_resumable(response: Response) -> Response:
+    response.headers["Tus-Resumable"] = TUS_VERSION
+    return response
+
+
+def _get_upload(upload_id: str) -> MediaUpload:
+    upload = db.session.get(MediaUpload, upload_id)
+    if upload is None:
+        abort(404)
+    if upload.status == "aborted":
+        abort(410)
+    return upload
+
+
+# --- creation, status, termination -----------------------------------------
+
+
+@uploads_bp.route("", methods=["POST"])
+@admin_required
+def create_upload():
+    """tus creation: Upload-Length plus optional filename/filetype metadata."""
+    length = request.headers.get("Upload-Length", "")
+    if not length.isdigit() or int(length) == 0:
+        abort(400, "Upload-Length must be a positive integer")
+    total_size = int(length)
+    if total_size > int(current_app.config.get("UPLOAD_MAX_SIZE", 0)):
+        abort(413)
+
+    metadata = _parse_metadata(request.headers.get("Upload-Metadata", ""))
+    filename = secure_filename(metadata.get("filename", "")) or "upload.bin"
+    upload_id = secrets.token_hex(16)
+    object_key = f"{current_app.config.get('UPLOAD_KEY_PREFIX', 'uploads')}/{datetime.utcnow():%Y/%m}/{upload_id}/{filename}"
+    content_type = metadata.get("filetype") or None
+    # Parts must be at least the S3 minimum and few enough to stay under 10k.
+    part_size = max(int(current_app.config.get("UPLOAD_PART_SIZE", MIN_PART_SIZE)), MIN_PART_SIZE)
+    part_size = max(part_size, math.ceil(total_size / MAX_PARTS))
+
+    upload = MediaUpload(
+        id=upload_id,
+        object_key=object_key,
+        filename=filename,
+        content_type=content_type,
+        total_size=total_size,
+        part_size=part_size,
+        backend_upload_id=storage_backend().create_multipart(object_key, content_type),
+    )
+    db.session.add(upload)
+    db.session.commit()
+    location = url_for("uploads.upload_status", upload_id=upload_id)
+    return Response(status=201, headers={**_headers(upload), "Location": location})
+
+
+@uploads_bp.route("/<upload_id>", methods=["HEAD"])
+@admin_required
+def upload_status(upload_id: str):
+    return Response(status=200, headers=_headers(_get_upload(upload_id)))
+
+
+@uploads_bp.route("/<upload_id>", methods=["DELETE"])
+@admin_required
+def abort_upload(upload_id: str):
+    """tus termination: abort the multipart upload and forget its parts."""
+    upload = _get_upload(upload_id)
+    if upload.status == "completed":
+        abort(409)
+    storage_backend().abort_multipart(upload.object_key, upload.backend_upload_id)
+    upload.status = "aborted"
+    MediaUploadPart.query.filter_by(upload_id=upload.id).delete()
+    db.session.commit()
+    return Response(status=204)
+
+
+# --- receiving data ---------------------------------------------------------
+
+
+def _lock(upload_id: str) -> bool:
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(MediaUpload)
+        .where(
+            MediaUpload.id == upload_id,
+            MediaUpload.status == "uploading",
+            or_(MediaUpload.locked_until.is_(None), MediaUpload.locked_until < now),
+        )
+        .values(locked_until=now + timedelta(seconds=int(current_app.config.get("UPLOAD_LOCK_TIMEOUT", 120))))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _read_exact(stream: IO[bytes], size: int) -> bytes:
+    """Up to `size` bytes; fewer only when the client stopped sending."""
+    chunks, remaining = [], size
+    try:
+        while remaining:
+            chunk = stream.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    except ClientDisconnected:
+        pass
+    return b"".join(chunks)
+
+
+def _settle(upload: MediaUpload, number: int, size: int, future: Future) -> None:
+    """Record a finished part and move the resume offset past it."""
+    etag = future.result()
+    db.session.merge(MediaUploadPart(upload_id=upload.id, part_number=number, size=size, etag=etag))
+    upload.offset += size
+    upload.locked_until = datetime.utcnow() + timedelta(seconds=int(current_app.config.get("UPLOAD_LOCK_TIMEOUT", 120)))
+    db.session.commit()
+
+
+def _receive(upload: MediaUpload, stream: IO[bytes]) -> Optional[Exception]:
+    """
+    Cut the request body into parts and upload them on the worker pool while
+    the next part is still arriving. At most UPLOAD_PART_WORKERS parts are in
+    memory; offsets are committed in part order as uploads finish. A trailing
+    piece shorter than a part (the client stopped mid-part) is dropped and
+    re-sent on resume.
+    """
+    backend = storage_backend()
+    pool = _pool()
+    max_in_flight = int(current_app.config.get("UPLOAD_PART_WORKERS", 4))
+    in_flight: Deque[Tuple[int, int, Future]] = deque()
+    position = upload.offset
+    error: Optional[Exception] = None
+
+    while position < upload.total_size:
+        size = min(upload.part_size, upload.total_size - position)
+        data = _read_exact(stream, size)
+        if len(data) < size:
+            break
+        number = position // upload.part_size + 1
+        future = pool.submit(backend.upload_part, upload.object_key, upload.backend_upload_id, number, data)
+        in_flight.append((number, size, future))
+        position += size
+        del data
+        while len(in_flight) >= max_in_flight:
+            try:
+                _settle(upload, *in_flight.popleft())
+            except Exception as exc:  # storage errors come in many types
+                error = exc
+                break
+        if error:
+            break
+
+    for number, size, future in in_flight:
+        if error:
+            # Parts past a failed one are re-sent anyway; just let them finish.
+            future.exception()
+            continue
+        try:
+            _settle(upload, number, size, future)
+        except Exception as exc:
+            error = exc
+    return error
+
+
+def _complete(upload: MediaUpload) -> None:
+    parts = db.session.execute(
+        select(MediaUploadPart.part_number, MediaUploadPart.etag)
+        .where(MediaUploadPart.upload_id == upload.id)
+        .order_by(MediaUploadPart.part_number)
+    ).all()
+    storage_backend().complete_multipart(upload.object_key, upload.backend_upload_id, [tuple(part) for part in parts])
+    upload.status = "completed"
+    upload.completed_at = datetime.utcnow()
+    db.session.commit()
+
+
+@uploads_bp.route("/<upload_id>", methods=["PATCH"])
+@admin_required
+def upload_chunk(upload_id: str):
+    """tus PATCH: append bytes at Upload-Offset; answers with the new offset."""
+    upload = _get_upload(upload_id)
+    if request.mimetype != "application/offset+octet-stream":
+        abort(415)
+    if request.headers.get("Upload-Offset") != str(upload.offset):
+        return Response(status=409, headers=_headers(upload))
+    if not _lock(upload_id):
+        # Another request is writing to this upload (or it just completed).
+        return Response(status=423 if upload.status == "uploading" else 409, headers=_headers(upload))
+
+    db.session.refresh(upload)
+    try:
+        error = _receive(upload, request.stream)
+        if error is None and upload.offset == upload.total_size:
+            _complete(upload)
+    except Exception as exc:
+        error = exc
+    finally:
+        db.session.rollback()
+        upload.locked_until = None
+        db.session.commit()
+
+    if error is not None:
+        logger.warning("Upload %s stopped at %s/%s: %s", upload_id, upload.offset, upload.total_size, error)
+        return Response(status=502, headers=_headers(upload))
+    return Response(status=204, headers=_headers(upload))
+
+
+# --- housekeeping -----------------------------------------------------------
+
+
+@click.command("uploads-expire")
+@click.option("--days", type=int, default=7, show_default=True, help="Abort uploads idle for this long.")
+@with_appcontext
+def uploads_expire_command(days: int) -> None:
+    """Abort stale multipart uploads so the store can free their parts."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    stale = MediaUpload.query.filter(MediaUpload.status == "uploading", MediaUpload.updated_at < cutoff).all()
+    backend = storage_backend()
+    for upload in stale:
+        try:
+            backend.abort_multipart(upload.object_key, upload.backend_upload_id)
+        except Exception as exc:
+            click.echo(f"  {upload.id}: {exc}", err=True)
+            continue
+        upload.status = "aborted"
+        MediaUploadPart.query.filter_by(upload_id=upload.id).delete()
+        db.session.commit()
+    click.echo(f"Aborted {len(stale)} stale uploads.")
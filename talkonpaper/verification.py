@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect, select, update
+from werkzeug.utils import import_string
+
+from .caching import LISTING_PAPERS, invalidate
+from .extensions import db
+from .models import DOI_RE, URL_RE, Paper
+
+
+def classify_reference(reference: str) -> Tuple[str, str]:
+    """(status, method) from the reference format alone; no network."""
+    reference = (reference or "").strip()
+    if DOI_RE.match(reference):
+        return "verified", "doi_format"
+    if URL_RE.match(reference):
+        return "verified", "url_format"
+    return "needs_review", "format"
+
+
+def verification_fields(reference: str, now: Optional[datetime] = None) -> Dict:
+    """Column values for Core inserts/updates that bypass the mapper events."""
+    status, method = classify_reference(reference)
+    return {
+        "verification_status": status,
+        "verification_method": method,
+        "verified_at": (now or datetime.utcnow()) if status == "verified" else None,
+    }
+
+
+@event.listens_for(Paper, "before_insert")
+def _verify_on_insert(_mapper, _connection, paper: Paper) -> None:
+    for key, value in verification_fields(paper.doi_or_url).items():
+        setattr(paper, key, value)
+
+
+@event.listens_for(Paper, "before_update")
+def _verify_on_update(_mapper, _connection, paper: Paper) -> None:
+    if inspect(paper).attrs.doi_or_url.history.has_changes():
+        for key, value in verification_fields(paper.doi_or_url).items():
+            setattr(paper, key, value)
+
+
+# --- resolvers --------------------------------------------------------------
+
+
+class Resolver:
+    """
+    Confirms that a reference exists. `resolve` runs on worker threads and
+    must not touch the database; it returns True (exists), False (does not
+    exist) or None (could not tell, e.g. a timeout).
+    """
+
+    method = "resolver"
+
+    def resolve(self, reference: str) -> Optional[bool]:
+        raise NotImplementedError
+
+
+class StubResolver(Resolver):
+    """Offline resolver for tests and local runs: trusts well-formed references."""
+
+    method = "stub"
+
+    def __init__(self, known: Optional[Dict[str, bool]] = None, **_options):
+        self.known = known or {}
+
+    def resolve(self, reference: str) -> Optional[bool]:
+        if reference in self.known:
+            return self.known[reference]
+        return classify_reference(reference)[0] == "verified"
+
+
+class DoiRegistryResolver(Resolver):
+    """
+    Looks DOIs up in the doi.org handle API and probes URLs with HEAD.
+    """
+
+    method = "doi_registry"
+    handle_api = "https://doi.org/api/handles/"
+
+    def __init__(self, timeout: float = 10.0, **_options):
+        self.timeout = timeout
+
+    def resolve(self, reference: str) -> Optional[bool]:
+        reference = reference.strip()
+        if DOI_RE.match(reference):
+            return self._lookup_doi(reference)
+        if URL_RE.match(reference):
+            return self._probe_url(reference)
+        return False
+
+    def _lookup_doi(self, doi: str) -> Optional[bool]:
+        url = self.handle_api + urllib.parse.quote(doi, safe="/")
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except urllib.error.HTTPError as exc:
+            return False if exc.code == 404 else None
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        # 1 = handle found, 100 = handle not found.
+        return {1: True, 100: False}.get(payload.get("responseCode"))
+
+    def _probe_url(self, url: str) -> Optional[bool]:
+        request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "TalkOnPaper verifier"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return True
+        except urllib.error.HTTPError as exc:
+            if exc.code in (404, 410):
+                return False
+            # Many publishers reject HEAD or bots; that is not proof of absence.
+            return None
+        except (urllib.error.URLError, OSError):
+            return None
+
+
+RESOLVERS = {"stub": StubResolver, "doi_registry": DoiRegistryResolver}
+
+
+def get_resolver(name: Optional[str] = None) -> Resolver:
+    """A resolver by short name or "package.module:Class" import path."""
+    name = name or current_app.config.get("VERIFICATION_RESOLVER", "stub")
+    factory = RESOLVERS.get(name) or import_string(name.replace(":", "."))
+    return factory(timeout=float(current_app.config.get("VERIFICATION_TIMEOUT", 10)))
+
+
+# --- batch re-verification --------------------------------------------------
+
+
+def _candidates(statuses: Optional[List[str]], batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+    last_id = 0
+    while True:
+        stmt = select(Paper.id, Paper.doi_or_url).where(Paper.id > last_id)
+        if statuses:
+            stmt = stmt.where(Paper.verification_status.in_(statuses))
+        rows = db.session.execute(stmt.order_by(Paper.id).limit(batch_size)).all()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        last_id = rows[-1][0]
+
+
+def reverify_papers(
+    resolver: Resolver,
+    statuses: Optional[List[str]] = None,
+    workers: int = 8,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """
+    Re-check papers through `resolver` on a thread pool, one batch at a
+    time, and write the outcomes back with a bulk UPDATE per batch. Papers
+    the resolver cannot decide on keep their current status.
+    """
+    counts = {"checked": 0, "verified": 0, "needs_review": 0, "unknown": 0}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as pool:
+        for batch in _candidates(statuses, batch_size):
+            outcomes = list(pool.map(lambda row: resolver.resolve(row[1]), batch))
+            now = datetime.utcnow()
+            changes = []
+            for (paper_id, _reference), outcome in zip(batch, outcomes):
+                counts["checked"] += 1
+                if outcome is None:
+                    counts["unknown"] += 1
+                    continue
+                status = "verified" if outcome else "needs_review"
+                counts[status] += 1
+                changes.append(
+                    {
+                        "id": paper_id,
+                        "verification_status": status,
+                        "verification_method": resolver.method,
+                        "verified_at": now if outcome else None,
+                    }
+                )
+            if changes:
+                db.session.execute(update(Paper), changes)
+                db.session.commit()
+                # Bulk UPDATEs skip the session hooks that drop cached pages.
+                invalidate(LISTING_PAPERS, *(f"paper:{change['id']}" for change in changes))
+    return counts
+
+
+@click.command("verify-papers")
+@click.option("--resolver", "resolver_name", default=None, help='"stub", "doi_registry" or "module:Class".')
+@click.option(
+    "--status",
+    "statuses",
+    multiple=True,
+    type=click.Choice(["pending", "verified", "needs_review"]),
+    help="Only re-check papers in these states (default: all).",
+)
+@click.option("--workers", type=int, default=None)
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@with_appcontext
+def verify_papers_command(resolver_name, statuses, workers, batch_size) -> None:
+    """Re-verify paper references in parallel through a resolver."""
+    resolver = get_resolver(resolver_name)
+    counts = reverify_papers(
+        resolver,
+        statuses=list(statuses) or None,
+        workers=workers or int(current_app.config.get("VERIFICATION_WORKERS", 8)),
+        batch_size=batch_size,
+    )
+    click.echo(
+        f"Checked {counts['checked']} papers with {resolver.method}: {counts['verified']} verified, "
+        f"{counts['needs_review']} need review, {counts['unknown']} undecided."
+    )
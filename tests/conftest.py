@@ -0,0 +1,32 @@
+import pytest
+
+from talkonpaper import create_app
+from talkonpaper.extensions import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on a throwaway SQLite database with every on-disk path under tmp_path."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "RATELIMIT_ENABLED": False,
+            "STORAGE_BACKEND": "local",
+            "LOCAL_MEDIA_ROOT": str(tmp_path / "media"),
+            "SITEMAP_DIR": str(tmp_path / "sitemaps"),
+            "IMAGE_CACHE_DIR": str(tmp_path / "image_cache"),
+            "STATIC_EXPORT_DIR": str(tmp_path / "static_export"),
+            "CONTACT_EXPORT_PATH": str(tmp_path / "contact_submissions.jsonl"),
+        }
+    )
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
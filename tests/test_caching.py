@@ -0,0 +1,33 @@
+from talkonpaper import create_app
+from talkonpaper.extensions import db
+from talkonpaper.models import Speaker
+
+
+def test_a_write_in_one_worker_drops_the_page_in_another(app, client):
+    # A second app on the same database stands in for another worker process.
+    other = create_app({**app.config, "TESTING": True})
+    other_client = other.test_client()
+    db.session.add(Speaker(full_name="Ada Lovelace", affiliation="Analytical Engines"))
+    db.session.commit()
+
+    assert other_client.get("/speakers").headers["X-Page-Cache"] == "miss"
+    assert other_client.get("/speakers").headers["X-Page-Cache"] == "hit"
+
+    db.session.add(Speaker(full_name="Grace Hopper", affiliation="Navy"))
+    db.session.commit()
+
+    response = other_client.get("/speakers")
+    assert response.headers["X-Page-Cache"] == "miss"
+    assert b"Grace Hopper" in response.data
+    assert other_client.get("/speakers").headers["X-Page-Cache"] == "hit"
+
+
+def test_unrelated_writes_keep_the_page(app, client):
+    db.session.add(Speaker(full_name="Ada Lovelace", affiliation="Analytical Engines"))
+    db.session.commit()
+    assert client.get("/papers").headers["X-Page-Cache"] == "miss"
+
+    speaker = Speaker.query.one()
+    speaker.bio_short = "Wrote the first program."
+    db.session.commit()
+    assert client.get("/papers").headers["X-Page-Cache"] == "hit"
@@ -0,0 +1,35 @@
+from talkonpaper.extensions import db
+from talkonpaper.images import image_url
+from talkonpaper.models import Speaker
+from talkonpaper.storage import LocalBackend
+
+
+def test_a_new_photo_key_bumps_the_version_and_the_urls(app):
+    speaker = Speaker(full_name="Ada Lovelace", affiliation="Analytical Engines", photo_object_key="speakers/1/a.jpg")
+    db.session.add(speaker)
+    db.session.commit()
+    assert speaker.photo_version == 0
+    with app.test_request_context():
+        before = image_url(speaker.photo_object_key, 320, version=speaker.photo_version)
+
+    speaker.bio_short = "Wrote the first program."
+    db.session.commit()
+    assert speaker.photo_version == 0
+
+    speaker.photo_object_key = "speakers/1/b.jpg"
+    db.session.commit()
+    assert speaker.photo_version == 1
+    with app.test_request_context():
+        assert image_url(speaker.photo_object_key, 320, version=1) != before
+
+
+def test_rendering_never_asks_storage(app, client, monkeypatch):
+    def fail(self, object_key):
+        raise AssertionError(f"HEAD {object_key} while rendering")
+
+    monkeypatch.setattr(LocalBackend, "head", fail)
+    db.session.add(Speaker(full_name="Ada Lovelace", affiliation="Analytical Engines", photo_object_key="speakers/1/a.jpg"))
+    db.session.commit()
+    response = client.get("/speakers")
+    assert response.status_code == 200
+    assert b"/img/" in response.data
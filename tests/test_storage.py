@@ -0,0 +1,133 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from talkonpaper import storage
+from talkonpaper.storage import StorageBackend, media_meta_many, signed_url, signed_url_cache_stats
+
+
+class FakeBackend(StorageBackend):
+    """
+    Counts presigns and HEADs; objects listed in `objects` exist, "flaky/"
+    keys time out and "slow/" keys answer once `release` is set.
+    """
+
+    name = "fake"
+
+    def __init__(self, cfg):
+        self.presigned = []
+        self.headed = []
+        self.objects = {"talks/1/video.mp4": 1234, "slow/a.mp4": 99}
+        self.release = threading.Event()
+
+    def presign(self, object_key, expires_in):
+        self.presigned.append((object_key, expires_in))
+        return f"https://media.test/{object_key}?n={len(self.presigned)}&expires_in={expires_in}"
+
+    def head(self, object_key):
+        self.headed.append(object_key)
+        if object_key.startswith("slow/"):
+            self.release.wait(5)
+        if object_key.startswith("flaky/"):
+            return {}, False
+        if object_key not in self.objects:
+            return {}, True
+        modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        return {"size": self.objects[object_key], "content_type": "video/mp4", "last_modified": modified}, True
+
+
+@pytest.fixture
+def backend(app, monkeypatch):
+    monkeypatch.setitem(storage.BACKENDS, "fake", FakeBackend)
+    app.config.update(STORAGE_BACKEND="fake", SIGNED_URL_EXPIRATION=900, SIGNED_URL_REUSE_MARGIN=180)
+    return storage.storage_backend()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Pins storage.time.time(); returns a setter."""
+    now = {"t": 720.0 * 1000}
+    monkeypatch.setattr(storage.time, "time", lambda: now["t"])
+
+    def set_time(value):
+        now["t"] = value
+
+    return set_time
+
+
+def test_signed_url_is_reused_within_its_expiry_bucket(backend, clock):
+    # 900s URLs with a 180s margin fall into 720s buckets.
+    start = 720.0 * 1000
+    clock(start)
+    first = signed_url("talks/1/video.mp4")
+    clock(start + 719)
+    assert signed_url("talks/1/video.mp4") == first
+    assert len(backend.presigned) == 1
+    assert signed_url_cache_stats()["hits"] == 1
+
+
+def test_signed_url_is_renewed_before_the_margin_runs_out(backend, clock):
+    start = 720.0 * 1000
+    clock(start)
+    first = signed_url("talks/1/video.mp4")
+    # The first URL expires at start + 900; the next bucket starts with 180s still left on it.
+    clock(start + 720)
+    second = signed_url("talks/1/video.mp4")
+    assert second != first
+    assert backend.presigned == [("talks/1/video.mp4", 900), ("talks/1/video.mp4", 900)]
+
+
+def test_signed_url_caches_per_expiry(backend, clock):
+    clock(720.0 * 1000)
+    short = signed_url("talks/1/video.mp4", expires_in=60)
+    assert signed_url("talks/1/video.mp4") != short
+    assert signed_url("talks/1/video.mp4", expires_in=60) == short
+    assert [expires for _key, expires in backend.presigned] == [60, 900]
+
+
+def test_signed_url_passes_external_urls_through(backend):
+    assert signed_url("https://cdn.test/clip.mp4") == "https://cdn.test/clip.mp4"
+    assert signed_url("") is None
+    assert backend.presigned == []
+
+
+def test_media_meta_many_caches_hits_and_misses(backend, app):
+    app.config.update(MEDIA_META_TTL=300, MEDIA_META_NEGATIVE_TTL=60)
+    keys = ["talks/1/video.mp4", "talks/2/missing.mp4", "https://cdn.test/a.mp4", "", "talks/1/video.mp4"]
+    first = media_meta_many(keys)
+    assert first["talks/1/video.mp4"]["size"] == 1234
+    assert first["talks/2/missing.mp4"] == {}
+    assert first["https://cdn.test/a.mp4"] == {}
+    assert first[""] == {}
+    assert sorted(backend.headed) == ["talks/1/video.mp4", "talks/2/missing.mp4"]
+
+    assert media_meta_many(keys) == first
+    assert len(backend.headed) == 2
+
+
+def test_media_meta_many_retries_transient_failures_sooner(backend, app, clock):
+    app.config.update(MEDIA_META_TTL=300, MEDIA_META_NEGATIVE_TTL=60)
+    start = 720.0 * 1000
+    clock(start)
+    media_meta_many(["flaky/a.mp4", "talks/2/missing.mp4"])
+    clock(start + 11)
+    media_meta_many(["flaky/a.mp4", "talks/2/missing.mp4"])
+    assert backend.headed.count("flaky/a.mp4") == 2
+    assert backend.headed.count("talks/2/missing.mp4") == 1
+
+
+def test_media_meta_many_stops_waiting_for_slow_lookups(backend, app):
+    app.config.update(MEDIA_META_WAIT=0.05)
+    first = media_meta_many(["slow/a.mp4", "talks/1/video.mp4"])
+    assert first["slow/a.mp4"] == {}
+    assert first["talks/1/video.mp4"]["size"] == 1234
+
+    # The late answer lands in the cache without a second HEAD.
+    backend.release.set()
+    deadline = time.monotonic() + 5
+    while not media_meta_many(["slow/a.mp4"])["slow/a.mp4"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert media_meta_many(["slow/a.mp4"])["slow/a.mp4"]["size"] == 99
+    assert backend.headed.count("slow/a.mp4") == 1
@@ -0,0 +1,84 @@
+import base64
+
+import pytest
+
+from talkonpaper.models import MediaUpload
+from talkonpaper.storage import storage_backend
+from talkonpaper.uploads import MIN_PART_SIZE
+
+PATCH_HEADERS = {"Tus-Resumable": "1.0.0", "Content-Type": "application/offset+octet-stream"}
+
+
+@pytest.fixture
+def admin(app, client):
+    app.config["UPLOAD_PART_SIZE"] = MIN_PART_SIZE
+    with client.session_transaction() as session:
+        session["admin_authed"] = True
+    return client
+
+
+@pytest.fixture
+def payload():
+    # Two full parts and a short last one.
+    return (bytes(range(256)) * (MIN_PART_SIZE // 256 + 1))[:MIN_PART_SIZE] * 2 + b"tail" * 1000
+
+
+def _create(client, size: int) -> str:
+    filename = base64.b64encode(b"keynote.mp4").decode("ascii")
+    response = client.post(
+        "/admin/uploads",
+        headers={"Tus-Resumable": "1.0.0", "Upload-Length": str(size), "Upload-Metadata": f"filename {filename}"},
+    )
+    assert response.status_code == 201
+    assert response.headers["Upload-Offset"] == "0"
+    return response.headers["Location"]
+
+
+def _patch(client, location: str, offset: int, body: bytes):
+    return client.patch(location, data=body, headers={**PATCH_HEADERS, "Upload-Offset": str(offset)})
+
+
+def test_patch_at_the_wrong_offset_is_rejected_then_resumed(admin, payload):
+    location = _create(admin, len(payload))
+
+    response = _patch(admin, location, 100, payload[100:])
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "0"
+
+    # The connection drops mid-way through the second part: only whole parts count.
+    response = _patch(admin, location, 0, payload[: MIN_PART_SIZE + 1000])
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == str(MIN_PART_SIZE)
+
+    # A client that missed that answer retries from 0 and is told where to resume.
+    response = _patch(admin, location, 0, payload)
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == str(MIN_PART_SIZE)
+    assert admin.head(location).headers["Upload-Offset"] == str(MIN_PART_SIZE)
+
+    response = _patch(admin, location, MIN_PART_SIZE, payload[MIN_PART_SIZE:])
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == str(len(payload))
+    object_key = response.headers["Upload-Object-Key"]
+    assert object_key.endswith("/keynote.mp4")
+
+    upload = MediaUpload.query.one()
+    assert (upload.status, upload.offset, upload.locked_until) == ("completed", len(payload), None)
+    with storage_backend().open(object_key) as stored:
+        assert stored.read() == payload
+
+    # Nothing more can be appended once the upload is complete.
+    assert _patch(admin, location, len(payload), b"more").status_code == 409
+
+
+def test_patch_needs_the_tus_content_type(admin, payload):
+    location = _create(admin, len(payload))
+    response = admin.patch(location, data=payload, headers={"Upload-Offset": "0", "Content-Type": "application/octet-stream"})
+    assert response.status_code == 415
+    assert admin.head(location).headers["Upload-Offset"] == "0"
+
+
+def test_uploads_need_an_admin(client):
+    response = client.post("/admin/uploads", headers={"Tus-Resumable": "1.0.0", "Upload-Length": "10"})
+    assert response.status_code == 302
+    assert MediaUpload.query.count() == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from talkonpaper.extensions import db
+from talkonpaper.models import Paper
+from talkonpaper.verification import StubResolver, classify_reference, get_resolver, reverify_papers, verification_fields
+
+
+@pytest.mark.parametrize(
+    "reference, expected",
+    [
+        ("10.1038/s41586-020-2649-2", ("verified", "doi_format")),
+        ("  10.1145/3290605.3300233 ", ("verified", "doi_format")),
+        ("https://arxiv.org/abs/2106.09685", ("verified", "url_format")),
+        ("HTTP://example.org/paper", ("verified", "url_format")),
+        ("doi:10.1038/nature12373", ("needs_review", "format")),
+        ("10.12/too-short-prefix", ("needs_review", "format")),
+        ("ftp://example.org/paper.pdf", ("needs_review", "format")),
+        ("", ("needs_review", "format")),
+        (None, ("needs_review", "format")),
+    ],
+)
+def test_classify_reference(reference, expected):
+    assert classify_reference(reference) == expected
+
+
+def test_verification_fields_stamp_only_verified_references():
+    assert verification_fields("10.1038/nature12373")["verified_at"] is not None
+    fields = verification_fields("see the proceedings")
+    assert fields == {"verification_status": "needs_review", "verification_method": "format", "verified_at": None}
+
+
+def test_stub_resolver_follows_the_format_unless_told_otherwise():
+    resolver = StubResolver(known={"10.1038/retracted": False, "internal report 7": True})
+    assert resolver.resolve("10.1038/nature12373") is True
+    assert resolver.resolve("https://example.org/paper") is True
+    assert resolver.resolve("not a reference") is False
+    assert resolver.resolve("10.1038/retracted") is False
+    assert resolver.resolve("internal report 7") is True
+
+
+def test_get_resolver_defaults_to_the_stub(app):
+    assert isinstance(get_resolver(), StubResolver)
+    assert isinstance(get_resolver("stub"), StubResolver)
+
+
+def _paper(reference: str, year: int = 2020) -> Paper:
+    return Paper(title=f"On {reference}", abstract="-", authors="A. Author", doi_or_url=reference, publication_year=year)
+
+
+def test_reverify_papers_with_the_stub_resolver(app):
+    good, bad, unknown = _paper("10.1038/nature12373"), _paper("10.1038/retracted"), _paper("https://example.org/x")
+    db.session.add_all([good, bad, unknown])
+    db.session.commit()
+    # Written through the ORM, so all three were classified from the format on insert.
+    assert [p.verification_status for p in (good, bad, unknown)] == ["verified", "verified", "verified"]
+
+    class Undecided(StubResolver):
+        def resolve(self, reference):
+            return None if reference.startswith("https://") else super().resolve(reference)
+
+    counts = reverify_papers(Undecided(known={"10.1038/retracted": False}), workers=2, batch_size=2)
+    assert counts == {"checked": 3, "verified": 1, "needs_review": 1, "unknown": 1}
+
+    db.session.expire_all()
+    assert (good.verification_status, good.verification_method) == ("verified", "stub")
+    assert (bad.verification_status, bad.verified_at) == ("needs_review", None)
+    # Papers the resolver cannot decide on keep their status and method.
+    assert (unknown.verification_status, unknown.verification_method) == ("verified", "url_format")
+
+
+def test_reverify_papers_filters_by_status(app):
+    db.session.add(_paper("10.1038/nature12373"))
+    db.session.commit()
+    counts = reverify_papers(StubResolver(), statuses=["needs_review"], workers=1)
+    assert counts["checked"] == 0